@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from fnmatch import fnmatch
+from pathlib import Path
+
+from analysis.cache import ResultCache
+from analysis.calibration import analysis_calibration
+from analysis.contact_angle import AnalysisError, measure
+from analysis.image_io import image_size, load_grayscale
+from camera.sequence_file import frame_path, frame_timestamp, is_sequence_file, open_sequence
+from storage.naming import parse_capture_name
+
+IMAGE_PATTERNS = ('*.jpeg', '*.jpg', '*.png', '*.bmp', '*.yuv', '*.rgb', '*.rgba', '*.bgr', '*.bgra', '*.seq')
+RESULT_FIELDS = ['path', 'name', 'timestamp', 'left_angle', 'right_angle', 'angle', 'confidence', 'bond',
+                 'surface_tension', 'error', 'seconds']
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def find_images(directory, patterns=IMAGE_PATTERNS, recursive=True):
+    # lazy walk, no directory is ever held in memory as a whole
+    stack = [Path(directory)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(Path(entry.path))
+                elif any(fnmatch(entry.name, pattern) for pattern in patterns):
+                    yield Path(entry.path)
+
+
+def expand_sequences(paths):
+    # every frame of a sequence file is analysed on its own, addressed as <sequence file>#<index>
+    for path in paths:
+        if not is_sequence_file(path):
+            yield path
+            continue
+        try:
+            frames = len(open_sequence(path))
+        except OSError:
+            # reported as the error of the file
+            yield path
+            continue
+        for index in range(frames):
+            yield frame_path(path, index)
+
+
+_caches = {}
+
+
+def process_cache(cache_path):
+    # one connection per worker process, opened on first use
+    if cache_path not in _caches:
+        _caches[cache_path] = ResultCache(cache_path)
+    return _caches[cache_path]
+
+
+def analyse_image(path, parameters, cache_path=None, calibration=None):
+    start = time.perf_counter()
+    parsed = parse_capture_name(path)
+    timestamp = frame_timestamp(path)
+    if parsed and timestamp:
+        parsed = (parsed[0], timestamp)
+    row = {'path': f'{path}',
+           'name': parsed[0] if parsed else '',
+           'timestamp': parsed[1].isoformat() if parsed else '',
+           'left_angle': None, 'right_angle': None, 'angle': None, 'confidence': None,
+           'bond': None, 'surface_tension': None, 'error': ''}
+    try:
+        if calibration is not None:
+            # scaled to the resolution of the picture, explicit parameters win
+            parameters = {**analysis_calibration(calibration, image_size(path)), **parameters}
+        if cache_path is not None:
+            result = process_cache(cache_path).measure(path, **parameters)
+        else:
+            result = measure(load_grayscale(path), **parameters)
+    except (AnalysisError, OSError) as error:
+        row['error'] = f'{error}'
+    else:
+        row.update(left_angle=round(result.left_angle, 3),
+                   right_angle=round(result.right_angle, 3),
+                   angle=round(result.angle, 3),
+                   confidence=round(result.confidence, 4))
+        if result.fit:
+            row['bond'] = round(result.fit['bond'], 5)
+            if result.fit['surface_tension'] is not None:
+                row['surface_tension'] = round(result.fit['surface_tension'] * 1000, 3)  # mN/m
+    row['seconds'] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def analyse_all(paths, parameters, jobs, cache_path=None, calibration=None):
+    # Only a few images per worker are in flight at any time, so memory stays flat no matter how many
+    # paths the (lazy) iterable yields. Rows come back in completion order.
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        for path in paths:
+            pending.add(executor.submit(analyse_image, path, parameters, cache_path, calibration))
+            if len(pending) >= 2 * jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+class ResultWriter:
+    # One row per image, flushed immediately so the output can be followed while the batch is running
+    def __init__(self, output, output_format, fields=RESULT_FIELDS):
+        self.output = output
+        self.output_format = output_format
+        if output_format == 'csv':
+            self._csv = csv.DictWriter(output, fieldnames=fields)
+            self._csv.writeheader()
+
+    def write(self, row):
+        if self.output_format == 'csv':
+            self._csv.writerow(row)
+        else:
+            self.output.write(json.dumps(row) + '\n')
+        self.output.flush()
+
+
+class Progress:
+    INTERVAL = 0.5
+
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.start = time.perf_counter()
+        self.count = 0
+        self.failed = 0
+        self._shown = 0.0
+
+    def update(self, row, force=False):
+        self.count += 1
+        self.failed += bool(row['error'])
+        now = time.perf_counter()
+        if force or now - self._shown >= self.INTERVAL:
+            self._shown = now
+            self.show()
+
+    def show(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.count / elapsed if elapsed else 0.0
+        self.stream.write(f'\r{self.count} images, {self.failed} failed, {rate:.1f} images/s')
+        self.stream.flush()
+
+    def finish(self):
+        self.show()
+        self.stream.write('\n')
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from analysis.contact_angle import ENGINE_VERSION, AnalysisError, ContactAngleResult, analysis_parameters, measure
+from analysis.image_io import load_grayscale
+from camera.sequence_file import open_sequence, sequence_frame
+
+DEFAULT_CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'), 'ContactAngleSystem',
+                          'analysis.sqlite')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT, contour BLOB, size INTEGER, last_used REAL);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+INSERT OR IGNORE INTO meta VALUES ('total_size', 0);
+INSERT OR IGNORE INTO meta VALUES ('max_bytes', {max_bytes});
+'''
+
+
+def as_tuples(value):
+    # JSON turns the point tuples of a result into lists
+    return tuple(as_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+class ResultCache:
+    # Analysis results keyed by image content hash, analysis parameters and engine version, evicted least
+    # recently used first once the stored results exceed max_bytes. Failed analyses are cached as well.
+    # The size limit is stored with the cache, max_bytes=None keeps the stored one.
+    MAX_BYTES = 256 * 1024 ** 2
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # shared by the GUI threads and used by several batch processes at once
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f'{self.path}', timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA.format(max_bytes=self.MAX_BYTES))
+        if max_bytes is not None:
+            self._db.execute("UPDATE meta SET value = ? WHERE name = 'max_bytes'", (int(max_bytes),))
+        self.max_bytes = self._db.execute("SELECT value FROM meta WHERE name = 'max_bytes'").fetchone()[0]
+
+    def digest(self, path):
+        # the content hash is remembered per (size, mtime) so unchanged files are not read again. Frames of a
+        # sequence file are hashed on their own, a growing sequence only rehashes the frames that are measured.
+        frame = sequence_frame(path)
+        stat = os.stat(frame[0] if frame else path)
+        path = f'{Path(frame[0]).resolve()}#{frame[1]}' if frame else f'{Path(path).resolve()}'
+        with self._lock:
+            row = self._db.execute('SELECT size, mtime_ns, digest FROM files WHERE path = ?', (path,)).fetchone()
+        if row and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        content_hash = hashlib.blake2b(digest_size=20)
+        if frame:
+            content_hash.update(open_sequence(frame[0]).read(frame[1]))
+        else:
+            with open(path, 'rb') as image_file:
+                for chunk in iter(lambda: image_file.read(1024 * 1024), b''):
+                    content_hash.update(chunk)
+        digest = content_hash.hexdigest()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                             (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    def key(self, path, parameters):
+        parameters = json.dumps(analysis_parameters(**parameters), sort_keys=True)
+        return hashlib.blake2b(f'{self.digest(path)}:{parameters}:{ENGINE_VERSION}'.encode(),
+                               digest_size=20).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute('SELECT data, contour FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+        data = json.loads(row[0])
+        if 'error' in data:
+            raise AnalysisError(data['error'])
+        contour = np.frombuffer(row[1], np.float32).reshape(-1, 2)
+        return ContactAngleResult(contour=contour, **{name: as_tuples(value) for name, value in data.items()})
+
+    def put(self, key, result=None, error=None):
+        if result is not None:
+            data = result._asdict()
+            contour = np.ascontiguousarray(data.pop('contour'), np.float32).tobytes()
+        else:
+            data, contour = {'error': f'{error}'}, b''
+        data = json.dumps(data)
+        size = len(data) + len(contour)
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                old = self._db.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+                self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                                 (key, data, contour, size, time.time()))
+                self._db.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'",
+                                 (size - (old[0] if old else 0),))
+                self._evict()
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def _evict(self):
+        total = self._db.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop the least recently used results until a tenth of the budget is free again
+        target = total - int(self.max_bytes * 0.9)
+        freed, keys = 0, []
+        for key, size in self._db.execute('SELECT key, size FROM results ORDER BY last_used'):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._db.executemany('DELETE FROM results WHERE key = ?', keys)
+        self._db.execute("UPDATE meta SET value = value - ? WHERE name = 'total_size'", (freed,))
+
+    def measure(self, path, **parameters):
+        key = self.key(path, parameters)
+        result = self.get(key)
+        if result is not None:
+            return result
+        try:
+            result = measure(load_grayscale(path), **parameters)
+        except AnalysisError as error:
+            self.put(key, error=error)
+            raise
+        self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._db.executescript("DELETE FROM results; DELETE FROM files; "
+                                   "UPDATE meta SET value = 0 WHERE name = 'total_size'; VACUUM;")
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+from collections import deque, namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Pixel scale and lens distortion from a picture of a dot grid target (dark dots of known pitch on a bright
+# background, e.g. printed), taken at the position of the drop. The distortion is radial around the image centre:
+#   corrected = centre + (point - centre) * (1 + k1 * r^2 + k2 * r^4), r = |point - centre| / radius
+# with radius half the image diagonal, so the coefficients do not depend on the resolution. The model is linear in
+# k1 and k2, the dot centres and their lattice positions give all coefficients in one least squares solve.
+# Measurements only correct their contour points; pictures are remapped for display with a lookup table of source
+# pixels that is computed once per calibration and resolution.
+Calibration = namedtuple('Calibration', ['resolution', 'centre', 'radius', 'k1', 'k2', 'pixel_size', 'pitch', 'rms',
+                                         'dots', 'created'])
+
+# dots used for the fit at least, and at most: the neighbour search keeps all distances in memory
+MIN_DOTS = 12
+MAX_DOTS = 2000
+# distance from a predicted lattice position a dot may have, relative to the dot spacing
+LATTICE_TOLERANCE = 0.3
+# resolutions of another aspect ratio (e.g. stretched video port frames) are not corrected
+ASPECT_TOLERANCE = 0.01
+TABLE_DIRECTORY = 'calibration'
+
+
+class CalibrationError(Exception):
+    pass
+
+
+def dark_components(dark):
+    # (area, centre x, centre y, width, height) of the 8-connected dark regions. Runs of dark pixels are found per
+    # row and merged with the overlapping runs of the next row, there are far fewer runs than pixels.
+    steps = np.diff(np.pad(dark, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    rows, starts = np.nonzero(steps == 1)
+    ends = np.nonzero(steps == -1)[1]
+    parents = np.arange(rows.size)
+
+    def root(run):
+        while parents[run] != run:
+            parents[run] = parents[parents[run]]
+            run = parents[run]
+        return run
+
+    row_starts = np.searchsorted(rows, np.arange(dark.shape[0] + 1))
+    for row in range(dark.shape[0] - 1):
+        a, a_end = row_starts[row], row_starts[row + 1]
+        b, b_end = a_end, row_starts[row + 2]
+        while a < a_end and b < b_end:
+            # diagonal neighbours touch as well
+            if starts[a] <= ends[b] and starts[b] <= ends[a]:
+                parents[root(b)] = root(a)
+            if ends[a] < ends[b]:
+                a += 1
+            else:
+                b += 1
+    labels = np.array([root(run) for run in range(rows.size)], np.int64)
+    lengths = (ends - starts).astype(np.float64)
+    area = np.bincount(labels, lengths)
+    components = np.nonzero(area)[0]
+    x = np.bincount(labels, lengths * (starts + ends - 1) / 2)[components] / area[components]
+    y = np.bincount(labels, lengths * rows)[components] / area[components]
+    left = np.full(labels.max(initial=0) + 1, np.iinfo(np.int64).max)
+    np.minimum.at(left, labels, starts)
+    right = np.zeros_like(left)
+    np.maximum.at(right, labels, ends)
+    top = np.full_like(left, np.iinfo(np.int64).max)
+    np.minimum.at(top, labels, rows)
+    bottom = np.zeros_like(left)
+    np.maximum.at(bottom, labels, rows + 1)
+    return (area[components], x, y, (right - left)[components], (bottom - top)[components])
+
+
+def find_dots(gray):
+    # centres of the round dark blobs of about the same size, the rest (target border, dirt, the shadow of the
+    # holder) is left out
+    low, high = np.percentile(gray, (1, 99))
+    if high - low < 32:
+        raise CalibrationError('The target picture has no contrast')
+    area, x, y, width, height = dark_components(gray < (low + high) / 2)
+    round_blobs = ((width >= 3) & (height >= 3) & (np.abs(np.log(width / np.maximum(height, 1))) < 0.5)
+                   & (area / (width * height) > 0.6))
+    inside = (x > width) & (y > height) & (x < gray.shape[1] - width) & (y < gray.shape[0] - height)
+    candidates = round_blobs & inside
+    if candidates.sum() < MIN_DOTS:
+        raise CalibrationError(f'Found {int(candidates.sum())} dots, at least {MIN_DOTS} are needed')
+    median = np.median(area[candidates])
+    dots = candidates & (area > 0.5 * median) & (area < 2 * median)
+    if dots.sum() > MAX_DOTS:
+        raise CalibrationError(f'Found {int(dots.sum())} dots, at most {MAX_DOTS} are supported')
+    return np.column_stack((x[dots], y[dots]))
+
+
+def lattice_positions(points):
+    # integer lattice position (i, j) of every dot and which dots are on the lattice. The lattice is grown from the dot
+    # nearest to the centre of the dots, every step predicts the next dot with the step that led to the current
+    # one, so the lattice may bend with the distortion.
+    distances = np.hypot(*(points[:, None] - points[None]).transpose(2, 0, 1))
+    np.fill_diagonal(distances, np.inf)
+    spacing = float(np.median(distances.min(axis=1)))
+    start = int(np.argmin(np.hypot(*(points - points.mean(axis=0)).T)))
+    neighbours = points[np.argsort(distances[start])[:4]] - points[start]
+    along = neighbours[np.argmax(np.abs(neighbours[:, 0]))]
+    along = along if along[0] > 0 else -along
+    across = neighbours[np.argmin(np.abs(neighbours @ along) / np.hypot(*neighbours.T))]
+    across = across if across[1] > 0 else -across
+    positions = np.zeros((len(points), 2), np.int64)
+    found = np.zeros(len(points), bool)
+    found[start] = True
+    queue = deque([(start, along, across)])
+    while queue:
+        dot, along, across = queue.popleft()
+        for step, (di, dj) in ((along, (1, 0)), (-along, (-1, 0)), (across, (0, 1)), (-across, (0, -1))):
+            offsets = np.hypot(*(points - (points[dot] + step)).T)
+            nearest = int(np.argmin(offsets))
+            if offsets[nearest] > LATTICE_TOLERANCE * spacing or found[nearest]:
+                continue
+            found[nearest] = True
+            positions[nearest] = positions[dot] + (di, dj)
+            measured = points[nearest] - points[dot]
+            if di:
+                queue.append((nearest, measured * di, across))
+            else:
+                queue.append((nearest, along, measured * dj))
+    return positions, found
+
+
+def calibrate(gray, pitch):
+    # Calibration of a grey level picture of the target, pitch is the distance of neighbouring dots in mm
+    if pitch <= 0:
+        raise CalibrationError('The dot pitch has to be positive')
+    height, width = gray.shape
+    centre = ((width - 1) / 2, (height - 1) / 2)
+    radius = math.hypot(width, height) / 2
+    points = find_dots(gray)
+    positions, found = lattice_positions(points)
+    if found.sum() < MIN_DOTS:
+        raise CalibrationError(f'Only {int(found.sum())} dots form a regular grid, at least {MIN_DOTS} are needed')
+    points, positions = points[found], positions[found].astype(np.float64)
+    offsets = points - centre
+    r2 = (offsets ** 2).sum(axis=1) / radius ** 2
+    # unknowns: k1, k2, origin x, x step along i, x step along j, then the same for y
+    count = len(points)
+    matrix = np.zeros((2 * count, 8))
+    for axis in (0, 1):
+        rows = slice(axis * count, (axis + 1) * count)
+        matrix[rows, 0] = offsets[:, axis] * r2
+        matrix[rows, 1] = offsets[:, axis] * r2 ** 2
+        matrix[rows, 2 + 3 * axis] = -1
+        matrix[rows, 3 + 3 * axis] = -positions[:, 0]
+        matrix[rows, 4 + 3 * axis] = -positions[:, 1]
+    target = -np.concatenate((points[:, 0], points[:, 1]))
+    solution = np.linalg.lstsq(matrix, target, rcond=None)[0]
+    residuals = (matrix @ solution - target).reshape(2, count)
+    k1, k2 = float(solution[0]), float(solution[1])
+    steps = np.hypot(solution[[3, 4]], solution[[6, 7]])
+    return Calibration(resolution=(width, height),
+                       centre=centre,
+                       radius=radius,
+                       k1=k1,
+                       k2=k2,
+                       pixel_size=pitch / 1000 / float(steps.mean()),
+                       pitch=pitch,
+                       rms=float(np.sqrt((residuals ** 2).sum(axis=0).mean())),
+                       dots=int(count),
+                       created=datetime.now().isoformat(timespec='seconds'))
+
+
+def calibration_from_dict(data):
+    # None for profiles without a calibration
+    if not data:
+        return None
+    try:
+        return Calibration(**{**data, 'resolution': tuple(data['resolution']), 'centre': tuple(data['centre'])})
+    except (KeyError, TypeError) as error:
+        raise CalibrationError(f'Invalid calibration: {error}')
+
+
+def resolution_scale(calibration, resolution):
+    # factor from calibration pixels to pixels of a picture of the given resolution, None when the picture has
+    # another aspect ratio and the calibration does not apply
+    scale = resolution[0] / calibration.resolution[0]
+    if abs(resolution[1] / calibration.resolution[1] / scale - 1) > ASPECT_TOLERANCE:
+        return None
+    return scale
+
+
+def analysis_calibration(calibration, resolution):
+    # analysis parameters (distortion, pixel_size) for pictures of the given resolution
+    scale = resolution_scale(calibration, resolution) if calibration else None
+    if scale is None:
+        return {}
+    (cx, cy), (width, height) = calibration.centre, resolution
+    return {'distortion': ((width - 1) / 2 + (cx - (calibration.resolution[0] - 1) / 2) * scale,
+                           (height - 1) / 2 + (cy - (calibration.resolution[1] - 1) / 2) * scale,
+                           calibration.radius * scale, calibration.k1, calibration.k2),
+            'pixel_size': calibration.pixel_size / scale}
+
+
+def undistort_points(x, y, distortion):
+    cx, cy, radius, k1, k2 = distortion
+    dx, dy = x - cx, y - cy
+    r2 = (dx * dx + dy * dy) / (radius * radius)
+    factor = 1 + r2 * (k1 + k2 * r2)
+    return cx + dx * factor, cy + dy * factor
+
+
+def distort_points(x, y, distortion, iterations=20):
+    # inverse of undistort_points by fixed point iteration, converges for the few percent of real lenses
+    cx, cy, radius, k1, k2 = distortion
+    ux, uy = x - cx, y - cy
+    dx, dy = ux, uy
+    for _ in range(iterations):
+        r2 = (dx * dx + dy * dy) / (radius * radius)
+        factor = 1 + r2 * (k1 + k2 * r2)
+        dx, dy = ux / factor, uy / factor
+    return cx + dx, cy + dy
+
+
+def remap_table(distortion, resolution):
+    # flat index of the source pixel of every pixel of the corrected picture, nearest neighbour
+    width, height = resolution
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    x, y = distort_points(x, y, distortion)
+    x = np.clip(np.rint(x), 0, width - 1).astype(np.int32)
+    y = np.clip(np.rint(y), 0, height - 1).astype(np.int32)
+    return y * width + x
+
+
+def table_digest(distortion, resolution):
+    data = json.dumps([list(resolution), [round(value, 12) for value in distortion]])
+    return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+
+
+_tables = {}
+
+
+def load_remap_table(calibration, resolution, directory=None):
+    # lookup table for pictures of the given resolution, None when the calibration does not apply. Tables are
+    # computed once (about a second for full HD) and kept in memory; with a directory they are also stored there
+    # and memory mapped in other processes and later sessions. They only depend on the calibration, a missing
+    # table file is computed again.
+    distortion = analysis_calibration(calibration, resolution).get('distortion')
+    if distortion is None:
+        return None
+    resolution = tuple(resolution)
+    digest = table_digest(distortion, resolution)
+    if digest not in _tables:
+        path = Path(directory, TABLE_DIRECTORY, f'{digest}.npy') if directory is not None else None
+        table = None
+        if path is not None and path.exists():
+            table = np.load(path, mmap_mode='r')
+            if table.shape != resolution[::-1]:
+                table = None
+        if table is None:
+            table = remap_table(distortion, resolution)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # written under a temporary name, processes starting at the same time never read half a table
+                with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.npy', delete=False) as table_file:
+                    np.save(table_file, table)
+                os.replace(table_file.name, path)
+        _tables[digest] = table
+    return _tables[digest]
+
+
+def remap(image, table, out=None):
+    # corrected picture as one gather of the table's source pixels, grey level or (height, width, channels)
+    pixels = image.reshape(image.shape[0] * image.shape[1], *image.shape[2:])
+    if out is None:
+        out = np.empty((*table.shape, *image.shape[2:]), image.dtype)
+    np.take(pixels, table, axis=0, out=out)
+    return out
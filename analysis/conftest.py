@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+import pytest
+
+from analysis.young_laplace import integrate_profiles
+
+
+def spherical_cap(angle, contact=200.0, width=1280, height=720, tilt=0.0):
+    # back lit sessile drop: a dark spherical cap with the given contact angle and contact half-width (pixels) on
+    # a dark substrate in front of a bright background, the baseline has the slope tilt. The edges are
+    # anti-aliased so the analysis sees a realistic subpixel contour.
+    baseline = 0.7 * height
+    radius = contact / math.sin(math.radians(angle))
+    centre = -radius * math.cos(math.radians(angle))
+    alpha = math.atan(tilt)
+    y, x = np.ogrid[:height, :width]
+    u = (x - width / 2) * math.cos(alpha) + (y - baseline) * math.sin(alpha)
+    h = (x - width / 2) * math.sin(alpha) - (y - baseline) * math.cos(alpha)
+    drop = np.clip(radius + 0.5 - np.hypot(u, h - centre), 0, 1)
+    substrate = np.clip(y - baseline - tilt * (x - width / 2) + 0.5, 0, 1)
+    return (220 - 190 * np.maximum(drop, substrate)).astype(np.uint8)
+
+
+def young_laplace_drop(bond, angle, apex_radius=100.0, width=1280, height=720):
+    # back lit sessile drop with a Young-Laplace profile of the given Bond number and contact angle, the half-width
+    # of every row is interpolated on the integrated profile
+    x, z, _ = integrate_profiles([bond], np.radians(np.arange(0, angle + 0.05, 0.1)), substeps=4)[0].T
+    baseline = 0.75 * height
+    apex = baseline - z[-1] * apex_radius
+    rows = np.arange(height)[:, None] + 0.5
+    half = np.interp((rows - apex) / apex_radius, z, x, left=-1, right=-1) * apex_radius
+    columns = np.arange(width) + 0.5 - width / 2
+    drop = np.clip(half - np.abs(columns) + 0.5, 0, 1) * ((rows >= apex) & (rows <= baseline))
+    substrate = np.clip(rows - baseline + 0.5, 0, 1)
+    return (220 - 190 * np.maximum(drop, substrate)).astype(np.uint8)
+
+
+@pytest.fixture
+def cap():
+    return spherical_cap
+
+
+@pytest.fixture
+def young_laplace():
+    return young_laplace_drop
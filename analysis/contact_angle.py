@@ -0,0 +1,397 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from analysis.calibration import undistort_points
+from analysis.image_io import rgb_to_grayscale
+from analysis.young_laplace import fit_profile, surface_tension
+
+# bump whenever a change of the algorithm changes results, cached results of older versions are ignored
+ENGINE_VERSION = 3
+
+# Sessile drop, side view, back lit: the drop and the substrate are dark on a bright background.
+DEFAULT_PARAMETERS = {'threshold': None,  # grey value between drop and background, None uses Otsu
+                      'downsample': 4,  # block size of the coarse detection pass
+                      'margin': 0.1,  # part of the image width left and right used to find the baseline
+                      'fit_fraction': 0.2,  # part of the drop height used for the tangent fits
+                      'degree': 2,  # polynomial degree of the tangent fits
+                      'max_asymmetry': 20.0,  # degrees left and right may differ, None accepts any difference
+                      'method': 'tangent',  # 'tangent' fits near the contact points, 'young_laplace' the whole drop
+                      'pixel_size': None,  # metres per pixel, Young-Laplace fits then report the surface tension
+                      'density_difference': 998.0,  # kg/m3 between drop and surrounding medium (water in air)
+                      'distortion': None}  # (centre x, centre y, radius, k1, k2) of the lens, see analysis.calibration
+METHODS = ('tangent', 'young_laplace')
+# below this angle the contour is close to horizontal at the contact points, the tangent is fitted to the height
+# as a function of the position along the baseline instead
+FLAT_ANGLE = 50.0
+# height of the fitted part of the contour in pixels that gives full confidence, lower drops are not measured
+FIT_PIXELS = 8.0
+
+# fit holds the drop shape parameters of Young-Laplace fits (bond, apex_radius, volume in pixels, rms, iterations,
+# surface_tension in N/m or None), None for tangent fits
+ContactAngleResult = namedtuple('ContactAngleResult', ['left_angle', 'right_angle', 'angle', 'confidence',
+                                                       'baseline', 'left_contact', 'right_contact', 'apex',
+                                                       'contour', 'fit'], defaults=(None,))
+
+
+class AnalysisError(Exception):
+    pass
+
+
+def analysis_parameters(**parameters):
+    unknown = set(parameters) - set(DEFAULT_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown analysis parameters: {", ".join(sorted(unknown))}')
+    if parameters.get('method', 'tangent') not in METHODS:
+        raise ValueError(f'Unknown analysis method: {parameters["method"]}')
+    return {**DEFAULT_PARAMETERS, **parameters}
+
+
+def otsu_threshold(image):
+    histogram = np.bincount(image.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(histogram)
+    total = weight[-1]
+    mean = np.cumsum(histogram * levels)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mean[-1] * weight - mean * total) ** 2 / (weight * (total - weight))
+    # dark class is everything <= the returned level, the threshold sits half way to the next level
+    return float(np.argmax(np.nan_to_num(between))) + 0.5
+
+
+def block_mean(image, factor):
+    height, width = image.shape[0] // factor * factor, image.shape[1] // factor * factor
+    blocks = image[:height, :width].reshape(height // factor, factor, width // factor, factor)
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def first_dark_rows(dark):
+    # row index of the first dark pixel of every column, -1 for columns without one
+    rows = dark.argmax(axis=0)
+    return np.where(dark[rows, np.arange(dark.shape[1])], rows, -1)
+
+
+def coarse_detection(small, threshold, margin):
+    dark = small < threshold
+    height, width = dark.shape
+    margin_columns = max(1, int(width * margin))
+    first_dark = first_dark_rows(dark)
+    sides = []
+    for columns in (first_dark[:margin_columns], first_dark[-margin_columns:]):
+        columns = columns[columns >= 0]
+        if columns.size == 0:
+            raise AnalysisError('No substrate found at the image borders')
+        sides.append(float(np.median(columns)))
+    left_x, right_x = (margin_columns - 1) / 2, width - (margin_columns + 1) / 2
+    slope = (sides[1] - sides[0]) / (right_x - left_x)
+    baseline = sides[0] + slope * (np.arange(width) - left_x)
+
+    # drop columns have their first dark pixel clearly above the baseline, the drop is the longest run of them
+    raised = (first_dark >= 0) & (first_dark < baseline - 2)
+    steps = np.diff(np.concatenate(([0], raised.astype(np.int8), [0])))
+    starts, ends = np.nonzero(steps == 1)[0], np.nonzero(steps == -1)[0]
+    if starts.size == 0:
+        raise AnalysisError('No droplet found above the baseline')
+    longest = int(np.argmax(ends - starts))
+    start, end = int(starts[longest]), int(ends[longest]) - 1
+    apex = int(first_dark[start:end + 1].min())
+    return baseline, apex, start, end
+
+
+def first_crossing(band, threshold):
+    # first bright to dark crossing of every row, linearly interpolated between the two pixels
+    dark = band < threshold
+    index = dark.argmax(axis=1)
+    rows = np.nonzero(dark[np.arange(dark.shape[0]), index] & (index > 0))[0]
+    index = index[rows]
+    outer = band[rows, index - 1].astype(np.float32)
+    inner = band[rows, index].astype(np.float32)
+    return rows, index - 1 + (outer - threshold) / np.maximum(outer - inner, 1e-6)
+
+
+def subpixel_edges(band, threshold):
+    left_rows, left = first_crossing(band, threshold)
+    right_rows, right = first_crossing(band[:, ::-1], threshold)
+    rows, left_index, right_index = np.intersect1d(left_rows, right_rows, return_indices=True)
+    return rows, left[left_index], band.shape[1] - 1 - right[right_index]
+
+
+def fit_baseline(gray, threshold, coarse_baseline, factor, drop_start, drop_end, margin, distortion=None):
+    height, width = gray.shape
+    margin_columns = max(2, int(width * margin))
+    step = max(1, factor)
+    columns = np.concatenate((np.arange(0, min(margin_columns, drop_start), step),
+                              np.arange(max(width - margin_columns, drop_end), width, step)))
+    if columns.size < 2:
+        raise AnalysisError('The droplet covers the baseline margins')
+    # search a few coarse blocks around the coarse baseline, column by column
+    centre = np.interp(columns / factor, np.arange(coarse_baseline.size), coarse_baseline) * factor
+    top = int(max(0, centre.min() - 3 * factor))
+    bottom = int(min(height - 1, centre.max() + 4 * factor))
+    # crossings along the rows of the transposed window are the first dark rows of the columns
+    rows, edges = first_crossing(gray[top:bottom, columns].T, threshold)
+    if rows.size < 2:
+        raise AnalysisError('No substrate found at the image borders')
+    x, y = columns[rows].astype(np.float64), edges + top
+    if distortion:
+        x, y = undistort_points(x, y, distortion)
+    slope, intercept = np.polyfit(x, y, 1)
+    residual = np.abs(y - (slope * x + intercept))
+    inliers = residual <= max(1.0, 3 * np.median(residual))
+    if inliers.sum() >= 2:
+        slope, intercept = np.polyfit(x[inliers], y[inliers], 1)
+    return float(slope), float(intercept)
+
+
+def widen_band(gray, threshold, baseline, x0, x1, top):
+    # The coarse pass only sees where the drop rises a few blocks above the baseline, flat drops reach much
+    # further out. The band grows column by column until the edge is back at the baseline.
+    height, width = gray.shape
+    slope, intercept = baseline
+    bottom = int(min(height, max(0.0, slope * (width - 1)) + intercept + 2))
+    if bottom <= top:
+        return x0, x1
+    for columns in (np.arange(x0 - 1, -1, -1), np.arange(x1, width)):
+        if columns.size == 0:
+            continue
+        index, y = first_crossing(gray[top:bottom, columns].T, threshold)
+        raised = np.zeros(columns.size, bool)
+        raised[index] = slope * columns[index] + intercept - (y + top) > 1.0
+        end = int(np.argmin(raised)) if not raised.all() else columns.size
+        if columns[0] < x0:
+            x0 = max(0, x0 - end - 2)
+        else:
+            x1 = min(width, x1 + end + 2)
+    return x0, x1
+
+
+def tangent_fit(u, h, drop_size, fit_fraction, degree):
+    # u as a function of the height above the baseline, the contour can be vertical near the contact point.
+    # The lowest pixels are blurred into the substrate and left out. Small drops get the lowest points that
+    # are enough for a fit, as long as they stay in the lower half of the drop; above that the fit describes
+    # the cap and not the tangent.
+    lowest, fit_height = max(2.0, 0.02 * drop_size), fit_fraction * drop_size
+    selected = (h > lowest) & (h <= fit_height)
+    if selected.sum() < degree + 3:
+        candidates = np.nonzero(h > lowest)[0]
+        if candidates.size < degree + 3:
+            raise AnalysisError('Not enough contour points near the contact points')
+        candidates = candidates[np.argsort(h[candidates])[:degree + 3]]
+        if h[candidates].max() > drop_size / 2:
+            raise AnalysisError('The droplet is too small for the tangent fit')
+        selected = np.zeros(h.shape, bool)
+        selected[candidates] = True
+    coefficients = np.polyfit(h[selected], u[selected], degree)
+    rms = float(np.sqrt(np.mean((np.polyval(coefficients, h[selected]) - u[selected]) ** 2)))
+    contact = float(np.polyval(coefficients, 0.0))
+    slope = float(np.polyval(np.polyder(coefficients), 0.0))
+    return contact, slope, rms, int(selected.sum()), float(h[selected].max())
+
+
+def flat_tangent_fit(d, h, half_width, fit_fraction, degree):
+    # height as a function of the distance d from the outermost drop column towards the apex, one contour point
+    # per column. The contact point is where the fitted height reaches the baseline.
+    lowest = 2.0
+    selected = (h > lowest) & (d <= fit_fraction * half_width)
+    if selected.sum() < degree + 3:
+        raise AnalysisError('Not enough contour points near the contact points')
+    coefficients = np.polyfit(d[selected], h[selected], degree)
+    rms = float(np.sqrt(np.mean((np.polyval(coefficients, d[selected]) - h[selected]) ** 2)))
+    roots = np.roots(coefficients)
+    roots = roots[np.isreal(roots)].real
+    # the baseline crossing next to the outermost fitted column, not the one on the far side of the cap
+    roots = roots[roots <= d[selected].min()]
+    if roots.size == 0:
+        raise AnalysisError('The tangent fit does not reach the baseline')
+    contact = float(roots.max())
+    slope = float(np.polyval(np.polyder(coefficients), contact))
+    if slope <= 0:
+        raise AnalysisError('The tangent fit does not reach the baseline')
+    return contact, math.degrees(math.atan(slope)), rms, int(selected.sum()), float(h[selected].max())
+
+
+def column_profile(u, h, centre, side):
+    # contour points of one side of a flat drop from the apex outwards up to the first column at the baseline,
+    # as distance from the outermost drop column towards the apex and height. side is 1 left, -1 right.
+    outward = (centre - u) * side
+    order = np.argsort(outward[outward >= 0])
+    outward, h = outward[outward >= 0][order], h[outward >= 0][order]
+    at_baseline = np.nonzero(h <= 2.0)[0]
+    end = int(at_baseline[0]) if at_baseline.size else h.size
+    if end == 0:
+        raise AnalysisError('Not enough contour points near the contact points')
+    edge = float(outward[end - 1])
+    return edge, edge - outward[:end], h[:end]
+
+
+def young_laplace_fit(left_u, left_h, right_u, right_h, drop_height, parameters):
+    # both sides of the contour above the baseline, the fit is axisymmetric so both angles are the same
+    left, right = left_h > 0, right_h > 0
+    u = np.concatenate((left_u[left], right_u[right]))
+    h = np.concatenate((left_h[left], right_h[right]))
+    if u.size < 10:
+        raise AnalysisError('Not enough contour points for a Young-Laplace fit')
+    centre = float(np.median((left_u + right_u) / 2))
+    # the contact radius is the width at the baseline, not the widest row: drops above 90° bulge out over it
+    above = np.nonzero(left & right)[0]
+    lowest = above[np.argsort(np.maximum(left_h[above], right_h[above]))[:3]]
+    half_width = float(np.median(right_u[lowest] - left_u[lowest])) / 2
+    try:
+        fit = fit_profile(u, h, centre, drop_height, half_width)
+    except ValueError as error:
+        raise AnalysisError(f'{error}') from None
+    shape = {'bond': fit.bond, 'apex_radius': fit.apex_radius, 'volume': fit.volume, 'rms': fit.rms,
+             'iterations': fit.iterations, 'surface_tension': None}
+    if parameters['pixel_size']:
+        shape['surface_tension'] = surface_tension(fit, parameters['pixel_size'], parameters['density_difference'])
+    return fit, shape, int(u.size)
+
+
+def tangent_fits(gray, threshold, left, right, drop_height, half_width, band, frame, parameters):
+    # (contact u, angle, rms, points, fitted height) of both sides. Flat drops are traced column by column,
+    # the rows only give a few points near their contact points.
+    top, bottom, x0, x1 = band
+    cos_a, sin_a, intercept = frame
+    size, fit_fraction, degree = min(drop_height, half_width), parameters['fit_fraction'], parameters['degree']
+    centre = float(np.median((left[0] + right[0]) / 2))
+    columns = None
+    if drop_height < half_width * math.tan(math.radians(FLAT_ANGLE) / 2):
+        index, y = first_crossing(gray[top:bottom, x0:x1].T, threshold)
+        x, y = (index + x0).astype(np.float64), y + top
+        if parameters['distortion']:
+            x, y = undistort_points(x, y, parameters['distortion'])
+        columns = x * cos_a + (y - intercept) * sin_a, x * sin_a - (y - intercept) * cos_a
+    fits = []
+    for side, (u, h) in ((1, left), (-1, right)):
+        fit = None
+        if columns is not None:
+            try:
+                edge, distance, height = column_profile(*columns, centre, side)
+                contact, angle, rms, points, extent = flat_tangent_fit(distance, height, half_width, fit_fraction,
+                                                                       degree)
+                # a steeper drop (e.g. flattened by gravity) is fitted like the others
+                if cap_angle(drop_height, edge - contact) <= angle < FLAT_ANGLE:
+                    fit = centre - side * (edge - contact), angle, rms, points, extent
+            except AnalysisError:
+                pass
+        if fit is None:
+            contact, slope, rms, points, extent = tangent_fit(u, h, size, fit_fraction, degree)
+            fit = contact, math.degrees(math.atan2(1.0, side * slope)), rms, points, extent
+            if fit[1] < cap_angle(drop_height, side * (centre - contact)):
+                raise AnalysisError('The tangent is flatter than the droplet')
+        fits.append(fit)
+    return fits
+
+
+def cap_angle(drop_height, contact_distance):
+    # Gravity only flattens a drop, it is never flatter at the contact point than the spherical cap of its
+    # height and width. A tangent far below that followed the substrate, e.g. one bent by an uncorrected lens.
+    # The margin leaves room for noisy contours.
+    return 0.7 * 2 * math.degrees(math.atan2(drop_height, contact_distance))
+
+
+def measure(image, **parameters):
+    parameters = analysis_parameters(**parameters)
+    gray = rgb_to_grayscale(image) if image.ndim == 3 else image
+    return detect(gray, parameters)[0]
+
+
+def detect(gray, parameters):
+    # full frame detection, also returns the threshold and grey levels so following frames can reuse them
+    factor = max(1, int(parameters['downsample']))
+
+    # coarse pass on block means: threshold, baseline, drop extent
+    small = block_mean(gray, factor)
+    threshold = parameters['threshold']
+    if threshold is None:
+        threshold = otsu_threshold(np.clip(small, 0, 255).astype(np.uint8))
+    dark, bright = small[small < threshold], small[small >= threshold]
+    if dark.size == 0 or bright.size == 0:
+        raise AnalysisError('The image has no contrast')
+    dark_level, bright_level = float(dark.mean()), float(bright.mean())
+    coarse_baseline, apex, start, end = coarse_detection(small, threshold, parameters['margin'])
+
+    # full resolution pass, only on the band of rows and columns that contains the drop
+    height, width = gray.shape
+    # flat drops only rise above the baseline a few blocks away from the contact points, leave room for that
+    padding = 2 + (end - start) // 8
+    x0, x1 = max(0, (start - padding) * factor), min(width, (end + padding + 1) * factor)
+    baseline = fit_baseline(gray, threshold, coarse_baseline, factor, x0, x1, parameters['margin'],
+                            parameters['distortion'])
+    top = max(0, (apex - 1) * factor)
+    x0, x1 = widen_band(gray, threshold, baseline, x0, x1, top)
+    levels = (dark_level, bright_level)
+    return measure_band(gray, threshold, levels, baseline, x0, x1, top, parameters), threshold, levels
+
+
+def measure_band(gray, threshold, levels, baseline, x0, x1, top, parameters):
+    # contour, tangents and confidence from the columns x0:x1 between row top and the baseline
+    height, width = gray.shape
+    dark_level, bright_level = levels
+    slope, intercept = baseline
+    bottom = int(min(height, max(slope * x0, slope * x1) + intercept + 2))
+    rows, left_x, right_x = subpixel_edges(gray[top:bottom, x0:x1], threshold)
+    y = (rows + top).astype(np.float64)
+    left_x, right_x = left_x + x0, right_x + x0
+    left_y = right_y = y
+    if parameters['distortion']:
+        # only the edge points are corrected, never the picture
+        left_x, left_y = undistort_points(left_x, y, parameters['distortion'])
+        right_x, right_y = undistort_points(right_x, y, parameters['distortion'])
+
+    # baseline frame: u along the baseline, h height above it
+    alpha = math.atan(slope)
+    cos_a, sin_a = math.cos(alpha), math.sin(alpha)
+    left_u, left_h = left_x * cos_a + (left_y - intercept) * sin_a, left_x * sin_a - (left_y - intercept) * cos_a
+    right_u = right_x * cos_a + (right_y - intercept) * sin_a
+    right_h = right_x * sin_a - (right_y - intercept) * cos_a
+    drop_height = float(max(left_h.max(initial=0), right_h.max(initial=0)))
+    if drop_height <= 0:
+        raise AnalysisError('No droplet found above the baseline')
+    if drop_height < FIT_PIXELS:
+        raise AnalysisError(f'The droplet is only {drop_height:.0f} pixels high')
+    # tall drops curve strongly near the contact points, their fit window scales with the width instead
+    half_width = float((right_u - left_u).max()) / 2
+    if parameters['method'] == 'young_laplace':
+        fit, shape, points = young_laplace_fit(left_u, left_h, right_u, right_h, drop_height, parameters)
+        (left_u0, right_u0), left_angle = fit.contact, fit.angle
+        right_angle, left_rms, right_rms, left_points, right_points = left_angle, fit.rms, fit.rms, points, points
+        extent = drop_height
+    else:
+        left, right = tangent_fits(gray, threshold, (left_u, left_h), (right_u, right_h), drop_height, half_width,
+                                   (top, bottom, x0, x1), (cos_a, sin_a, intercept), parameters)
+        left_u0, left_angle, left_rms, left_points, left_extent = left
+        right_u0, right_angle, right_rms, right_points, right_extent = right
+        extent = min(left_extent, right_extent)
+        shape = None
+    if parameters['max_asymmetry'] is not None and abs(left_angle - right_angle) > parameters['max_asymmetry']:
+        raise AnalysisError(f'Left and right contact angles differ by {abs(left_angle - right_angle):.0f}°')
+
+    # confidence: fit quality, left/right agreement, contrast, the number of fitted points and the height of
+    # the fitted part of the contour
+    fit_score = 1 / (1 + max(left_rms, right_rms))
+    symmetry_score = 1 - min(1.0, abs(left_angle - right_angle) / 30)
+    contrast_score = min(1.0, (bright_level - dark_level) / 64)
+    points_score = min(1.0, min(left_points, right_points) / 10)
+    size_score = min(1.0, extent / FIT_PIXELS)
+    confidence = fit_score * symmetry_score * contrast_score * points_score * size_score
+
+    above = (left_h > 0) & (right_h > 0)
+    if not above.any():
+        raise AnalysisError('No droplet found above the baseline')
+    left_x, right_x, left_y, right_y = left_x[above], right_x[above], left_y[above], right_y[above]
+    # left contact point over the apex to the right contact point, rows are sorted top to bottom
+    contour = np.concatenate((np.column_stack((left_x, left_y))[::-1],
+                              np.column_stack((right_x, right_y)))).astype(np.float32)
+    apex = (float(left_x[0] + right_x[0]) / 2, float(left_y[0] + right_y[0]) / 2)
+    return ContactAngleResult(left_angle=left_angle,
+                              right_angle=right_angle,
+                              angle=(left_angle + right_angle) / 2,
+                              confidence=confidence,
+                              baseline=((0.0, intercept), (float(width - 1), slope * (width - 1) + intercept)),
+                              left_contact=(left_u0 * cos_a, intercept + left_u0 * sin_a),
+                              right_contact=(right_u0 * cos_a, intercept + right_u0 * sin_a),
+                              apex=apex,
+                              contour=contour,
+                              fit=shape)
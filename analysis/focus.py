@@ -0,0 +1,87 @@
+import numpy as np
+
+HISTOGRAM_BINS = 256
+# grey levels at or beyond count as clipped
+CLIP_DARK = 2
+CLIP_BRIGHT = 253
+# x, y, width, height relative to the frame
+DEFAULT_ROI = (0.25, 0.25, 0.5, 0.5)
+
+
+class FocusMeter:
+    # Focus and exposure numbers of preview frames for the live assistant: the sharpness is the variance of the
+    # Laplacian inside the region of interest (the droplet edge), the histogram and the share of clipped pixels
+    # are taken on every STEP-th pixel of the whole frame. The preview frames are downscaled by the camera
+    # already, the sharpness uses all of their pixels. RGB frames are converted to luma with integer weights. The
+    # intermediate arrays are allocated for the first frame and reused as long as frame size and region stay the
+    # same.
+    STEP = 2
+
+    def __init__(self, roi=DEFAULT_ROI, step=STEP):
+        self.roi = tuple(roi)
+        self.step = step
+        self._shape = None
+        self._levels = np.arange(HISTOGRAM_BINS)
+
+    def set_roi(self, roi):
+        self.roi = tuple(roi)
+        self._shape = None
+
+    def region(self, shape):
+        # pixel slices of the region, at least 3 x 3 pixels for the Laplacian
+        height, width = shape
+        x, y, w, h = self.roi
+        left, top = min(int(x * width), width - 3), min(int(y * height), height - 3)
+        right, bottom = max(round((x + w) * width), left + 3), max(round((y + h) * height), top + 3)
+        return slice(top, min(bottom, height)), slice(left, min(right, width))
+
+    def _allocate(self, shape):
+        height, width = shape
+        rows, columns = self.region(shape)
+        self._rows, self._columns = rows, columns
+        self._sample = np.empty((-(-height // self.step), -(-width // self.step)), np.uint8)
+        self._region = np.empty((rows.stop - rows.start, columns.stop - columns.start), np.float32)
+        self._laplacian = np.empty((self._region.shape[0] - 2, self._region.shape[1] - 2), np.float32)
+        self._centre = np.empty_like(self._laplacian)
+        self._luma = None
+        self._shape = shape
+
+    def luma(self, rgb):
+        # ITU-R 601 weights scaled to 256, the sums fit into uint16
+        if self._luma is None:
+            self._luma = (np.empty(self._shape, np.uint16), np.empty(self._shape, np.uint16),
+                          np.empty(self._shape, np.uint8))
+        luma, channel, gray = self._luma
+        np.multiply(rgb[..., 0], 77, out=luma, dtype=np.uint16)
+        np.multiply(rgb[..., 1], 150, out=channel, dtype=np.uint16)
+        luma += channel
+        np.multiply(rgb[..., 2], 29, out=channel, dtype=np.uint16)
+        luma += channel
+        np.right_shift(luma, 8, out=gray, casting='unsafe')
+        return gray
+
+    def measure(self, frame):
+        # uint8 grey (height, width) or RGB (height, width, 3) frame, views with a row stride (e.g. of a padded
+        # frame) are fine
+        if frame.shape[:2] != self._shape:
+            self._allocate(frame.shape[:2])
+        gray = self.luma(frame) if frame.ndim == 3 else frame
+        sample = self._sample
+        np.copyto(sample, gray[::self.step, ::self.step])
+        # a new histogram per frame, it is handed to the GUI thread
+        histogram = np.bincount(sample.ravel(), minlength=HISTOGRAM_BINS)
+        total = sample.size
+        region, laplacian, centre = self._region, self._laplacian, self._centre
+        np.copyto(region, gray[self._rows, self._columns])
+        np.add(region[:-2, 1:-1], region[2:, 1:-1], out=laplacian)
+        laplacian += region[1:-1, :-2]
+        laplacian += region[1:-1, 2:]
+        np.multiply(region[1:-1, 1:-1], 4, out=centre)
+        laplacian -= centre
+        laplacian -= laplacian.mean()
+        np.square(laplacian, out=laplacian)
+        return {'sharpness': float(laplacian.mean()),
+                'mean': float(histogram @ self._levels / total),
+                'clipped_dark': float(histogram[:CLIP_DARK + 1].sum() / total),
+                'clipped_bright': float(histogram[CLIP_BRIGHT:].sum() / total),
+                'histogram': histogram}
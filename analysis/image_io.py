@@ -0,0 +1,61 @@
+import numpy as np
+from PyQt5 import QtGui
+
+from camera.encoding import RAW_FORMATS
+from camera.raw_file import is_raw_file, open_raw, raw_luminance, read_raw_header
+from camera.sequence_file import open_sequence, sequence_frame
+
+
+def qimage_to_grayscale(image):
+    image = image.convertToFormat(QtGui.QImage.Format_Grayscale8)
+    ptr = image.constBits()
+    ptr.setsize(image.byteCount())
+    # rows are padded to 32 bit, cut the padding off again
+    array = np.frombuffer(ptr, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return array[:, :image.width()].copy()
+
+
+def load_grayscale(path):
+    frame = sequence_frame(path)
+    if frame is not None:
+        # only this frame is read from the container, raw frames are mapped like raw captures
+        sequence = open_sequence(frame[0])
+        if sequence.format in RAW_FORMATS:
+            return raw_luminance(sequence.raw(frame[1]))
+        image = QtGui.QImage.fromData(sequence.read(frame[1]))
+        if image.isNull():
+            raise OSError(f'Unable to read image: {path}')
+        return qimage_to_grayscale(image)
+    if is_raw_file(path):
+        # memory mapped, the Y plane of yuv captures is used without any copy
+        try:
+            return raw_luminance(open_raw(path))
+        except ValueError as error:
+            raise OSError(f'Unable to read image: {path} ({error})')
+    image = QtGui.QImage(f'{path}')
+    if image.isNull():
+        raise OSError(f'Unable to read image: {path}')
+    return qimage_to_grayscale(image)
+
+
+def image_size(path):
+    # (width, height) from the file header, the pixels are not decoded
+    frame = sequence_frame(path)
+    if frame is not None:
+        return open_sequence(frame[0]).resolution
+    if is_raw_file(path):
+        try:
+            header = read_raw_header(path)[0]
+        except ValueError as error:
+            raise OSError(f'Unable to read image: {path} ({error})')
+        return header['width'], header['height']
+    size = QtGui.QImageReader(f'{path}').size()
+    if not size.isValid():
+        raise OSError(f'Unable to read image: {path}')
+    return size.width(), size.height()
+
+
+def rgb_to_grayscale(frame):
+    # ITU-R 601 luma, same weights as Qt's grayscale conversion
+    weights = np.array([0.299, 0.587, 0.114], np.float32)
+    return (frame[..., :3] @ weights).astype(np.uint8)
@@ -0,0 +1,90 @@
+import itertools
+
+import numpy as np
+import pytest
+from PyQt5 import QtGui
+
+import analysis.cache
+from analysis.cache import ResultCache
+from analysis.contact_angle import AnalysisError
+
+
+def write_png(path, gray):
+    gray = np.ascontiguousarray(gray)
+    image = QtGui.QImage(gray.data, gray.shape[1], gray.shape[0], gray.strides[0], QtGui.QImage.Format_Grayscale8)
+    assert image.save(f'{path}')
+    return path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # a clock that always moves on, results are evicted in a predictable order
+    ticks = itertools.count(1)
+    monkeypatch.setattr(analysis.cache.time, 'time', lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResultCache(tmp_path / 'cache' / 'analysis.sqlite')
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def measurements(monkeypatch):
+    calls = []
+    measure = analysis.cache.measure
+
+    def counted(gray, **parameters):
+        calls.append(parameters)
+        return measure(gray, **parameters)
+    monkeypatch.setattr(analysis.cache, 'measure', counted)
+    return calls
+
+
+def test_hit(tmp_path, cap, cache, measurements):
+    path = write_png(tmp_path / 'drop.png', cap(60, 150, width=640, height=480))
+    measured = cache.measure(path)
+    cached = cache.measure(path)
+    assert len(measurements) == 1
+    assert cached.angle == measured.angle and cached.baseline == measured.baseline
+    np.testing.assert_array_equal(cached.contour, measured.contour.astype(np.float32))
+
+
+def test_miss_on_other_parameters_and_content(tmp_path, cap, cache, measurements):
+    path = write_png(tmp_path / 'drop.png', cap(60, 150, width=640, height=480))
+    cache.measure(path)
+    cache.measure(path, fit_fraction=0.3)
+    assert len(measurements) == 2
+    # the same name with other pixels is hashed again
+    write_png(path, cap(80, 150, width=640, height=480))
+    assert cache.measure(path).angle == pytest.approx(80, abs=1.0)
+    assert len(measurements) == 3
+
+
+def test_failures_are_cached(tmp_path, cache, measurements):
+    path = write_png(tmp_path / 'blank.png', np.full((480, 640), 200, np.uint8))
+    for _ in range(2):
+        with pytest.raises(AnalysisError, match='contrast'):
+            cache.measure(path)
+    assert len(measurements) == 1
+
+
+def test_eviction(tmp_path, clock):
+    # equally large entries, a fourth one does not fit and the least recently used one goes
+    size = len('{"error": ""}') + 100
+    cache = ResultCache(tmp_path / 'analysis.sqlite', max_bytes=3 * size + size // 2)
+    for key in ('first', 'second', 'third'):
+        cache.put(key, error='x' * 100)
+    with pytest.raises(AnalysisError):
+        cache.get('first')
+    cache.put('fourth', error='x' * 100)
+    assert cache.get('second') is None
+    for key in ('first', 'third', 'fourth'):
+        with pytest.raises(AnalysisError):
+            cache.get(key)
+    cache.close()
+    # the limit is stored with the cache
+    reopened = ResultCache(cache.path)
+    assert reopened.max_bytes == 3 * size + size // 2
+    reopened.close()
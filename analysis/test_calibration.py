@@ -0,0 +1,95 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+import analysis.calibration
+from analysis.calibration import (TABLE_DIRECTORY, CalibrationError, analysis_calibration, calibrate,
+                                  calibration_from_dict, distort_points, load_remap_table, remap, undistort_points)
+
+WIDTH, HEIGHT = 960, 540
+DISTORTION = ((WIDTH - 1) / 2, (HEIGHT - 1) / 2, math.hypot(WIDTH, HEIGHT) / 2, -0.06, 0.01)
+
+
+def dot_grid(distortion=DISTORTION, spacing=32.0, rotation=2.0):
+    # picture of a slightly rotated dot grid target through a lens with the given distortion
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float64)
+    x, y = undistort_points(x, y, distortion)
+    angle = math.radians(rotation)
+    u = (x - 450) * math.cos(angle) + (y - 250) * math.sin(angle)
+    v = (y - 250) * math.cos(angle) - (x - 450) * math.sin(angle)
+    du, dv = u - np.round(u / spacing) * spacing, v - np.round(v / spacing) * spacing
+    gray = np.where(du * du + dv * dv < 8 ** 2, 30, 220)
+    return np.clip(gray + np.random.default_rng(1).normal(0, 4, gray.shape), 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    # tables computed by other tests are not reused
+    monkeypatch.setattr(analysis.calibration, '_tables', {})
+
+
+def test_calibrate():
+    calibration = calibrate(dot_grid(), 2.0)
+    assert calibration.resolution == (WIDTH, HEIGHT)
+    assert calibration.k1 == pytest.approx(-0.06, abs=0.002)
+    assert calibration.k2 == pytest.approx(0.01, abs=0.002)
+    assert calibration.pixel_size == pytest.approx(2.0 / 1000 / 32, rel=1e-3)
+    assert calibration.rms < 0.2
+
+
+def test_points_round_trip():
+    x, y = np.meshgrid(np.linspace(0, WIDTH - 1, 17), np.linspace(0, HEIGHT - 1, 9))
+    corrected = undistort_points(x, y, DISTORTION)
+    np.testing.assert_allclose(distort_points(*corrected, DISTORTION), (x, y), atol=1e-6)
+
+
+def test_remapped_grid_is_undistorted(tmp_path, tables):
+    gray = dot_grid()
+    calibration = calibrate(gray, 2.0)
+    corrected = calibrate(remap(gray, load_remap_table(calibration, (WIDTH, HEIGHT), tmp_path)), 2.0)
+    assert abs(corrected.k1) < 0.003 and abs(corrected.k2) < 0.003
+    # colour pictures are remapped the same way
+    table = load_remap_table(calibration, (WIDTH, HEIGHT))
+    np.testing.assert_array_equal(remap(np.dstack([gray] * 3), table)[..., 1], remap(gray, table))
+
+
+def test_remap_table_files(tmp_path, tables):
+    calibration = calibrate(dot_grid(), 2.0)
+    table = load_remap_table(calibration, (WIDTH, HEIGHT), tmp_path)
+    files = list((tmp_path / TABLE_DIRECTORY).glob('*.npy'))
+    assert len(files) == 1
+    # another session maps the stored table
+    analysis.calibration._tables.clear()
+    stored = load_remap_table(calibration, (WIDTH, HEIGHT), tmp_path)
+    assert isinstance(stored, np.memmap)
+    np.testing.assert_array_equal(stored, table)
+    # pictures of another aspect ratio are not corrected
+    assert load_remap_table(calibration, (640, 480), tmp_path) is None
+
+
+def test_scaled_resolution():
+    calibration = calibrate(dot_grid(), 2.0)
+    parameters = analysis_calibration(calibration, (WIDTH // 2, HEIGHT // 2))
+    assert parameters['pixel_size'] == pytest.approx(2 * calibration.pixel_size)
+    assert parameters['distortion'][2] == pytest.approx(calibration.radius / 2)
+    assert parameters['distortion'][3:] == (calibration.k1, calibration.k2)
+    assert analysis_calibration(calibration, (640, 480)) == {}
+    assert analysis_calibration(None, (WIDTH, HEIGHT)) == {}
+
+
+def test_profile_round_trip():
+    # calibrations are stored as JSON in the profiles
+    calibration = calibrate(dot_grid(), 2.0)
+    assert calibration_from_dict(json.loads(json.dumps(calibration._asdict()))) == calibration
+    assert calibration_from_dict(None) is None
+    with pytest.raises(CalibrationError):
+        calibration_from_dict({'k1': 0.1})
+
+
+def test_no_grid():
+    with pytest.raises(CalibrationError):
+        calibrate(np.full((HEIGHT, WIDTH), 200, np.uint8), 2.0)
+    with pytest.raises(CalibrationError):
+        calibrate(dot_grid(), 0)
@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+import pytest
+
+from analysis.calibration import undistort_points
+from analysis.contact_angle import AnalysisError, measure
+
+
+@pytest.mark.parametrize('angle', [10, 15, 20, 30, 45, 50, 55, 60, 70, 90, 110, 120])
+def test_spherical_caps(cap, angle):
+    result = measure(cap(angle))
+    assert result.left_angle == pytest.approx(angle, abs=1.0)
+    assert result.right_angle == pytest.approx(angle, abs=1.0)
+    assert result.confidence > 0.8
+
+
+@pytest.mark.parametrize('angle, contact', [(15, 150), (20, 80), (20, 250), (30, 150), (10, 150)])
+def test_low_drops(cap, angle, contact):
+    # the contact points of flat drops lie far outside the columns where they rise clearly above the baseline
+    result = measure(cap(angle, contact, width=640, height=480))
+    assert result.left_angle == pytest.approx(angle, abs=1.5)
+    assert result.right_angle == pytest.approx(angle, abs=1.5)
+
+
+@pytest.mark.parametrize('angle', [20, 45, 90])
+def test_tilted_baseline(cap, angle):
+    result = measure(cap(angle, tilt=0.01))
+    assert result.left_angle == pytest.approx(angle, abs=1.0)
+    assert result.right_angle == pytest.approx(angle, abs=1.0)
+
+
+def test_noisy_low_drop(cap):
+    rng = np.random.default_rng(0)
+    image = np.clip(cap(15) + rng.normal(0, 4, (720, 1280)), 0, 255).astype(np.uint8)
+    result = measure(image)
+    assert result.angle == pytest.approx(15, abs=1.0)
+
+
+def test_drop_too_low(cap):
+    with pytest.raises(AnalysisError):
+        measure(cap(10, 40, width=640, height=480))
+
+
+def test_asymmetric_drop(cap):
+    # left half of a 50° cap next to the right half of an 80° cap of the same height
+    height = 150
+    image = cap(50, height / math.tan(math.radians(25)))
+    image[:, 640:] = cap(80, height / math.tan(math.radians(40)))[:, 640:]
+    with pytest.raises(AnalysisError, match='differ'):
+        measure(image)
+    result = measure(image, max_asymmetry=None)
+    assert result.left_angle == pytest.approx(50, abs=1.5)
+    assert result.right_angle == pytest.approx(80, abs=1.5)
+    assert result.confidence < 0.5
+
+
+def test_uncorrected_lens_distortion():
+    # a drop photographed through a barrel distorting lens: the bent substrate is no baseline, without the
+    # distortion the drop is not measured at all instead of getting a wrong angle
+    width, height, angle, contact = 1920, 1080, 70, 250.0
+    distortion = ((width - 1) / 2, (height - 1) / 2, math.hypot(width, height) / 2, -0.08, 0.01)
+    y, x = np.mgrid[:height, :width].astype(np.float64)
+    x, y = undistort_points(x, y, distortion)
+    radius = contact / math.sin(math.radians(angle))
+    centre = 800 + radius * math.cos(math.radians(angle))
+    dark = (y > 800) | ((x - 960) ** 2 + (y - centre) ** 2 < radius ** 2)
+    image = np.where(dark, 30, 220).astype(np.uint8)
+    with pytest.raises(AnalysisError):
+        measure(image)
+    assert measure(image, distortion=distortion).angle == pytest.approx(angle, abs=1.0)
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analysis.contact_angle import measure
+from analysis.tracking import DropletTracker, track_frames
+
+
+def spreading_drop(cap, frames=8):
+    # a drop that spreads and drifts sideways a little from frame to frame
+    for index in range(frames):
+        yield np.roll(cap(70 - 3 * index, 120 + 4 * index, width=640, height=480), 2 * index, axis=1)
+
+
+def test_tracker_agrees_with_detection(cap):
+    tracker = DropletTracker()
+    for index, image in enumerate(spreading_drop(cap)):
+        result, tracked = tracker.update(image)
+        detected = measure(image)
+        assert tracked == (index > 0)
+        # the band of a tracked frame may fit the tangent to a few other rows
+        assert result.left_angle == pytest.approx(detected.left_angle, abs=1.0)
+        assert result.right_angle == pytest.approx(detected.right_angle, abs=1.0)
+        assert result.angle == pytest.approx(70 - 3 * index, abs=1.0)
+    assert (tracker.detections, tracker.tracked) == (1, 7)
+
+
+def test_lost_drop_is_detected_again(cap):
+    # a jump further than the tracking band falls back to full frame detection
+    tracker = DropletTracker()
+    tracker.update(cap(60, 100, width=640, height=480))
+    result, tracked = tracker.update(np.roll(cap(60, 100, width=640, height=480), 200, axis=1))
+    assert not tracked
+    assert result.angle == pytest.approx(60, abs=1.0)
+    assert tracker.detections == 2
+
+
+def test_track_frames_rows(cap):
+    start = datetime(2024, 1, 1)
+    frames = [('a.png', start, cap(60, 100, width=640, height=480)),
+              ('b.png', start + timedelta(seconds=0.5), OSError('Unable to read image: b.png')),
+              ('c.png', start + timedelta(seconds=1), cap(60, 100, width=640, height=480))]
+    rows = list(track_frames(frames, {}))
+    assert [row['elapsed'] for row in rows] == [0, 0.5, 1]
+    assert rows[1]['error'] == 'Unable to read image: b.png' and rows[1]['angle'] is None
+    assert rows[0]['angle'] == pytest.approx(60, abs=1.0)
+    # the tracker starts over after a frame that could not be read
+    assert [row['tracked'] for row in rows] == [False, False, False]
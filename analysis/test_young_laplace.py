@@ -0,0 +1,21 @@
+import pytest
+
+from analysis.contact_angle import measure
+
+
+@pytest.mark.parametrize('bond, angle, apex_radius', [(0.5, 60, 150), (2.0, 80, 120), (0.3, 100, 120),
+                                                      (1.0, 120, 100), (1.0, 135, 100), (0.5, 150, 100),
+                                                      (0.1, 170, 80)])
+def test_young_laplace_drops(young_laplace, bond, angle, apex_radius):
+    result = measure(young_laplace(bond, angle, apex_radius), method='young_laplace')
+    assert result.angle == pytest.approx(angle, abs=1.0)
+    assert result.fit['bond'] == pytest.approx(bond, abs=0.1)
+    assert result.fit['apex_radius'] == pytest.approx(apex_radius, rel=0.02)
+
+
+@pytest.mark.parametrize('angle', [45, 90, 150])
+def test_spherical_caps(cap, angle):
+    # a cap is the profile without gravity, the contact of hydrophobic caps lies inside their widest row
+    result = measure(cap(angle, 100), method='young_laplace')
+    assert result.angle == pytest.approx(angle, abs=1.0)
+    assert result.fit['bond'] == pytest.approx(0, abs=0.05)
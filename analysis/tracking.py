@@ -0,0 +1,146 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from analysis.calibration import analysis_calibration
+from analysis.contact_angle import AnalysisError, analysis_parameters, detect, fit_baseline, measure_band
+from analysis.image_io import load_grayscale, rgb_to_grayscale
+from camera.sequence_file import frame_timestamp
+from storage.naming import parse_capture_name
+
+SEQUENCE_FIELDS = ['path', 'timestamp', 'elapsed', 'left_angle', 'right_angle', 'angle', 'confidence', 'tracked',
+                   'error', 'seconds']
+
+
+class DropletTracker:
+    # Full frame detection only for the first frame, every following frame is searched in a band around the
+    # previous contour with the threshold and baseline found before. When the drop leaves the band or the fit
+    # gets unreliable the tracking is lost and the frame is detected from scratch again.
+    BAND = 0.25  # room around the previous contour, relative to the drop width
+    MIN_BAND = 8
+    MIN_CONFIDENCE = 0.2
+
+    def __init__(self, **parameters):
+        self.parameters = analysis_parameters(**parameters)
+        self.previous = None
+        self.threshold = None
+        self.levels = None
+        self.detections = 0
+        self.tracked = 0
+
+    def reset(self):
+        self.previous = None
+
+    def update(self, image):
+        # (result, tracked), raises AnalysisError when the frame does not contain a droplet at all
+        gray = rgb_to_grayscale(image) if image.ndim == 3 else image
+        if self.previous is not None:
+            try:
+                result = self.track(gray)
+            except AnalysisError:
+                result = None
+            if result is not None and result.confidence >= self.MIN_CONFIDENCE:
+                self.previous = result
+                self.tracked += 1
+                return result, True
+        self.previous = None
+        result, self.threshold, self.levels = detect(gray, self.parameters)
+        self.previous = result
+        self.detections += 1
+        return result, False
+
+    def track(self, gray):
+        height, width = gray.shape
+        contour = self.previous.contour
+        left, right = float(contour[:, 0].min()), float(contour[:, 0].max())
+        band = max(self.MIN_BAND, self.BAND * (right - left))
+        x0, x1 = max(0, int(left - band)), min(width, int(right + band) + 1)
+        top = max(0, int(self.previous.apex[1] - band))
+
+        # the baseline barely moves between frames, it is refitted in a narrow window around the previous one
+        (_, y0), (_, y1) = self.previous.baseline
+        slope = (y1 - y0) / (width - 1)
+        factor = max(1, int(self.parameters['downsample']))
+        previous_baseline = (slope * np.arange(0, width, factor) + y0) / factor
+        baseline = fit_baseline(gray, self.threshold, previous_baseline, factor, x0, x1, self.parameters['margin'],
+                                self.parameters['distortion'])
+
+        result = measure_band(gray, self.threshold, self.levels, baseline, x0, x1, top, self.parameters)
+        if (result.contour[:, 0].min() <= x0 + 1 or result.contour[:, 0].max() >= x1 - 2
+                or (top > 0 and result.contour[:, 1].min() <= top + 1)):
+            raise AnalysisError('The droplet left the tracking band')
+        return result
+
+
+def track_frames(frames, parameters, calibration=None):
+    # frames: (path, timestamp, image) in capture order, yields one result row per frame
+    tracker = None
+    first = None
+    for path, timestamp, image in frames:
+        start = time.perf_counter()
+        first = first or timestamp
+        row = {'path': f'{path}',
+               'timestamp': timestamp.isoformat(),
+               'elapsed': round((timestamp - first).total_seconds(), 6),
+               'left_angle': None, 'right_angle': None, 'angle': None, 'confidence': None,
+               'tracked': False, 'error': ''}
+        try:
+            if isinstance(image, Exception):
+                raise image
+            if tracker is None:
+                # the calibration is scaled to the resolution of the frames, explicit parameters win
+                tracker = DropletTracker(**{**analysis_calibration(calibration, image.shape[1::-1]), **parameters})
+            result, tracked = tracker.update(image)
+        except (AnalysisError, OSError) as error:
+            if tracker is not None:
+                tracker.reset()
+            row['error'] = f'{error}'
+        else:
+            row.update(left_angle=round(result.left_angle, 3),
+                       right_angle=round(result.right_angle, 3),
+                       angle=round(result.angle, 3),
+                       confidence=round(result.confidence, 4),
+                       tracked=tracked)
+        row['seconds'] = round(time.perf_counter() - start, 4)
+        yield row
+
+
+def frame_time(path):
+    # frames of a sequence file carry their own timestamps
+    timestamp = frame_timestamp(path)
+    if timestamp is not None:
+        return timestamp
+    parsed = parse_capture_name(path)
+    if parsed:
+        return parsed[1]
+    # files outside the naming scheme are ordered by their modification time
+    return datetime.fromtimestamp(path.stat().st_mtime)
+
+
+def load_frame(path):
+    try:
+        return load_grayscale(path)
+    except OSError as error:
+        return error
+
+
+def sequence_frames(paths, prefetch=4):
+    # decodes the next few images in threads while the current one is measured
+    ordered = sorted((frame_time(path), path) for path in paths)
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = deque()
+        for timestamp, path in ordered:
+            pending.append((path, timestamp, executor.submit(load_frame, path)))
+            if len(pending) > prefetch:
+                path, timestamp, future = pending.popleft()
+                yield path, timestamp, future.result()
+        while pending:
+            path, timestamp, future = pending.popleft()
+            yield path, timestamp, future.result()
+
+
+def analyse_sequence(paths, parameters, prefetch=4, calibration=None):
+    return track_frames(sequence_frames(paths, prefetch), parameters, calibration)
@@ -0,0 +1,281 @@
+import math
+import os
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+# Axisymmetric drop shape analysis. Lengths are in units of the apex radius R0, z points down from the apex and
+# phi is the tangent angle of the profile. A sessile drop profile follows (Bashforth-Adams)
+#   dx/ds = cos(phi), dz/ds = sin(phi), dphi/ds = 2 + bond * z - sin(phi) / x
+# with the Bond number bond = density difference * g * R0^2 / surface tension. phi grows monotonically from the
+# apex to the contact point, so the profiles are integrated over phi and the contact angle is where it stops.
+
+# bump whenever the table layout or the integration changes, a table of another version is never read
+TABLE_VERSION = 1
+TABLE_PATH = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'), 'ContactAngleSystem',
+                  f'young_laplace_v{TABLE_VERSION}.npy')
+# denser towards the sphere (bond = 0), where small drops are; 0.5 degree steps of the tangent angle
+MAX_BOND = 10.0
+BOND_NUMBERS = MAX_BOND * np.linspace(0, 1, 161) ** 2
+TABLE_ANGLES = np.radians(np.arange(0, 180.5, 0.5))
+# integration step of the refinement, the RK4 error stays below 1e-4 R0 up to 170 degrees
+REFINE_STEP = math.radians(2)
+# degrees beyond the warm start's angle the profiles are integrated to at first
+REFINE_RANGE = 15
+# contour points used by the fit and by the warm start, spread evenly over the contour
+FIT_POINTS = 200
+WARM_START_POINTS = 64
+# segments searched on each side of the one at a point's depth
+SEGMENT_WINDOW = 4
+# Levenberg-Marquardt steps tried in one iteration, relative to the current damping
+DAMPINGS = np.array([0.1, 1.0, 10.0, 100.0])
+GRAVITY = 9.80665
+MIN_BOND = 0.01
+
+YoungLaplaceFit = namedtuple('YoungLaplaceFit', ['angle', 'bond', 'apex_radius', 'apex', 'contact', 'volume',
+                                                 'rms', 'iterations', 'profile'])
+
+
+def _derivative(phi, state, bonds):
+    # d(x, z, volume)/dphi, state holds (x, z, volume) of every Bond number
+    x = state[0]
+    ds = 1 / (2 + bonds * state[1] - math.sin(phi) / x)
+    rates = np.outer((math.cos(phi), math.sin(phi), math.pi * math.sin(phi)), ds)
+    rates[2] *= x * x
+    return rates
+
+
+def integrate_profiles(bonds, angles, substeps=2):
+    # (x, z, volume) of all Bond numbers at once at the tangent angles (uniform steps starting at 0), RK4 with
+    # the Bond numbers as the vector dimension. The volume is that of the drop cut off at depth z.
+    bonds = np.asarray(bonds, np.float64)
+    profiles = np.zeros((bonds.size, len(angles), 3))
+    step = (angles[1] - angles[0]) / substeps
+    # the first step is on the apex sphere, the equations are singular at x = 0
+    z = 1 - math.cos(step)
+    state = np.empty((3, bonds.size))
+    state[:] = np.array((math.sin(step), z, math.pi * z * z * (3 - z) / 3))[:, None]
+    for index in range(1, (len(angles) - 1) * substeps + 1):
+        if index > 1:
+            phi = (index - 1) * step
+            k1 = _derivative(phi, state, bonds)
+            k2 = _derivative(phi + step / 2, state + step / 2 * k1, bonds)
+            k3 = _derivative(phi + step / 2, state + step / 2 * k2, bonds)
+            k4 = _derivative(phi + step, state + step * k3, bonds)
+            state = state + step / 6 * (k1 + 2 * (k2 + k3) + k4)
+        if index % substeps == 0:
+            profiles[:, index // substeps] = state.T
+    return profiles
+
+
+_tables = {}
+
+
+def load_table(path=TABLE_PATH):
+    # computed once per machine (about a second), afterwards memory mapped: processes share the pages and
+    # nothing is read that a fit does not touch
+    path = Path(path)
+    if path not in _tables:
+        shape = (BOND_NUMBERS.size, TABLE_ANGLES.size, 3)
+        table = np.load(path, mmap_mode='r') if path.exists() else None
+        if table is None or table.shape != shape:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # written under a temporary name, processes starting at the same time never read half a table
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.npy', delete=False) as table_file:
+                np.save(table_file, integrate_profiles(BOND_NUMBERS, TABLE_ANGLES))
+            os.replace(table_file.name, path)
+            table = np.load(path, mmap_mode='r')
+        _tables[path] = table
+    return _tables[path]
+
+
+def truncate(profile, angles, depth):
+    # (x, z) vertices down to the given depth with the exact end point, and the tangent angle and the
+    # interpolated (x, z, volume) there
+    z = profile[:, 1]
+    end = int(np.searchsorted(z, depth))
+    if end == 0 or end >= z.size:
+        return None, None
+    fraction = (depth - z[end - 1]) / (z[end] - z[end - 1])
+    last = profile[end - 1] + fraction * (profile[end] - profile[end - 1])
+    angle = angles[end - 1] + fraction * (angles[end] - angles[end - 1])
+    return np.vstack((profile[:end, :2], last[:2])), (angle, last)
+
+
+def signed_distances(points, vertices, window=SEGMENT_WINDOW):
+    # distance of every point to the polyline, positive outside the drop (away from the axis). z grows along the
+    # profile, only the segments around the one at the depth of a point can be the closest.
+    starts, directions = vertices[:-1], np.diff(vertices, axis=0)
+    around = np.searchsorted(vertices[:, 1], points[:, 1])[:, None] + np.arange(-window, window)[None]
+    around = np.clip(around, 0, len(starts) - 1)
+    start, direction = starts[around], directions[around]
+    offset = points[:, None, :] - start
+    length = np.maximum((direction ** 2).sum(axis=2), 1e-12)
+    t = np.clip((offset * direction).sum(axis=2) / length, 0, 1)
+    nearest = offset - t[..., None] * direction
+    squared = (nearest ** 2).sum(axis=2)
+    segment = squared.argmin(axis=1)
+    rows = np.arange(len(points))
+    offset, direction = offset[rows, segment], direction[rows, segment]
+    cross = direction[:, 0] * offset[:, 1] - direction[:, 1] * offset[:, 0]
+    return np.sqrt(squared[rows, segment]) * np.where(cross < 0, 1.0, -1.0)
+
+
+def residuals(parameters, profile, angles, u, h):
+    # pixel distances of the measured contour (u along the baseline, h above it) to the model drop
+    centre, height, radius, _ = parameters
+    vertices, _ = truncate(profile, angles, height / radius)
+    if vertices is None:
+        return None
+    points = np.column_stack((np.abs(u - centre), height - h)) / radius
+    return signed_distances(points, vertices) * radius
+
+
+def spread(count, *arrays):
+    if arrays[0].size <= count:
+        return arrays
+    keep = np.linspace(0, arrays[0].size - 1, count).astype(int)
+    return tuple(array[keep] for array in arrays)
+
+
+def table_candidates(table, rows, u, h, centre, height, ratio):
+    # per Bond number: the contact angle (index) with the measured height to width ratio, the apex radius that
+    # gives the measured height, and the mean squared pixel distance of the contour to that profile
+    shape_ratios = table[rows, 1:, 1] / table[rows, 1:, 0]
+    # height to contact radius grows monotonically with the contact angle
+    rows = rows[(shape_ratios[:, 0] <= ratio) & (ratio <= shape_ratios[:, -1])]
+    if rows.size == 0:
+        return rows, rows, rows, rows
+    ends = np.minimum((table[rows, 1:, 1] / table[rows, 1:, 0] < ratio).sum(axis=1), shape_ratios.shape[1] - 1) + 1
+    radii = height / table[rows, ends, 1]
+    # nearest table vertex (every 4th, 2 degrees apart) of the truncated profiles, all candidates at once
+    vertices = table[rows, :ends.max() + 1:4, :2]
+    reachable = np.arange(vertices.shape[1])[None] * 4 <= ends[:, None]
+    points_u = np.abs(u - centre)[None] / radii[:, None]
+    points_h = (height - h)[None] / radii[:, None]
+    squared = ((points_u[..., None] - vertices[:, None, :, 0]) ** 2 +
+               (points_h[..., None] - vertices[:, None, :, 1]) ** 2)
+    squared = np.where(reachable[:, None, :], squared, np.inf).min(axis=2)
+    return rows, ends, radii, squared.mean(axis=1) * radii ** 2
+
+
+def warm_start(table, u, h, centre, height, half_width):
+    # every Bond number of the table has one contact angle with the measured height to width ratio, the one
+    # whose profile is closest to the contour wins: every 4th Bond number first, then the neighbours of the best
+    u, h = spread(WARM_START_POINTS, u, h)
+    ratio = height / half_width
+    rows, ends, radii, errors = table_candidates(table, np.arange(0, len(table), 4), u, h, centre, height, ratio)
+    if rows.size:
+        best = rows[np.argmin(errors)]
+        neighbours = np.arange(max(best - 3, 0), min(best + 4, len(table)))
+    else:
+        # only Bond numbers in between match
+        neighbours = np.arange(len(table))
+    rows, ends, radii, errors = table_candidates(table, neighbours, u, h, centre, height, ratio)
+    if rows.size == 0:
+        raise ValueError('The drop shape is outside the Young-Laplace table')
+    best = int(np.argmin(errors))
+    return np.array([centre, height, radii[best], BOND_NUMBERS[rows[best]]]), TABLE_ANGLES[ends[best]]
+
+
+def fit_profile(u, h, centre, height, half_width, max_iterations=20, table_path=TABLE_PATH):
+    # Young-Laplace fit of a sessile drop contour given in the baseline frame (u along the baseline, h above
+    # it, in pixels). centre, height and half_width are the estimates of the apex position and the contact
+    # radius (the half width at the baseline).
+    u, h = spread(FIT_POINTS, np.asarray(u, np.float64), np.asarray(h, np.float64))
+    parameters, table_angle = warm_start(load_table(table_path), u, h, centre, height, half_width)
+    # The refined angle usually stays within a few degrees of the table's, the profiles are only integrated that
+    # far. A fit that fails or ends at that limit is repeated over all angles.
+    limit = min(math.pi, table_angle + math.radians(REFINE_RANGE))
+    try:
+        fit = refine_profile(u, h, parameters, limit, max_iterations)
+    except ValueError:
+        fit = None
+    if limit < math.pi and (fit is None or math.radians(fit.angle) > limit - REFINE_STEP):
+        fit = refine_profile(u, h, parameters, math.pi, max_iterations)
+    if fit is None:
+        raise ValueError('The profile does not reach the baseline')
+    return fit
+
+
+def refine_profile(u, h, parameters, limit, max_iterations):
+    # Levenberg-Marquardt refines apex position, apex radius and Bond number with the profiles integrated up to
+    # the tangent angle limit; an integration costs the same for one Bond number as for several, so every
+    # iteration integrates the steps of all DAMPINGS together with the finite difference profiles the next
+    # Jacobian needs.
+    angles = np.arange(0, limit + REFINE_STEP / 2, REFINE_STEP)
+    scale = np.array([1.0, 1.0, 1.0, max(parameters[3], 0.01) * 0.01])
+
+    profiles = integrate_profiles([parameters[3], parameters[3] + scale[3]], angles, substeps=1)
+    current = residuals(parameters, profiles[0], angles, u, h)
+    if current is None:
+        raise ValueError('The profile does not reach the baseline')
+    cost, damping, iterations = float(current @ current), 1e-3, 0
+    for iterations in range(1, max_iterations + 1):
+        jacobian = np.empty((current.size, 4))
+        for column in range(4):
+            # backward differences where the forward step runs past the end of the profile, close to 180 degrees
+            for sign in (1, -1):
+                shifted = parameters.copy()
+                shifted[column] += sign * scale[column]
+                if column < 3:
+                    profile = profiles[0]
+                else:
+                    profile = profiles[1] if sign > 0 else integrate_profiles([shifted[3]], angles, substeps=1)[0]
+                shifted_residuals = residuals(shifted, profile, angles, u, h)
+                if shifted_residuals is not None:
+                    break
+            else:
+                raise ValueError('The profile does not reach the baseline')
+            jacobian[:, column] = sign * (shifted_residuals - current) / scale[column]
+        normal = jacobian.T @ jacobian
+        gradient = jacobian.T @ current
+        dampings = damping * DAMPINGS
+        candidates = np.array([parameters + np.linalg.solve(normal + value * np.diag(np.diag(normal) + 1e-12),
+                                                            -gradient) for value in dampings])
+        candidates[:, 2] = np.maximum(candidates[:, 2], 1.0)
+        candidates[:, 3] = np.clip(candidates[:, 3], 0.0, MAX_BOND)
+        trials = integrate_profiles(np.concatenate((candidates[:, 3], candidates[:, 3] + scale[3])), angles,
+                                    substeps=1)
+        trial_residuals = [residuals(candidate, trial, angles, u, h) for candidate, trial in zip(candidates, trials)]
+        costs = [np.inf if values is None else float(values @ values) for values in trial_residuals]
+        best = int(np.argmin(costs))
+        if costs[best] >= cost:
+            # no step improves, try larger dampings unless they are already large enough to stall
+            damping = dampings[-1] * 10
+            if damping > 1e6:
+                break
+            continue
+        change = cost - costs[best]
+        step = candidates[best] - parameters
+        parameters, current, cost = candidates[best], trial_residuals[best], costs[best]
+        profiles = trials[[best, best + len(candidates)]]
+        damping = max(dampings[best], 1e-7)
+        if change < 1e-6 * cost or np.all(np.abs(step) < 1e-4 * np.abs(parameters) + 1e-9):
+            break
+
+    centre, height, radius, bond = parameters
+    vertices, (angle, end) = truncate(profiles[0], angles, height / radius)
+    # left contact point over the apex to the right contact point, in the baseline frame
+    side_u, side_h = vertices[:, 0] * radius, height - vertices[:, 1] * radius
+    profile = np.concatenate((np.column_stack((centre - side_u[::-1], side_h[::-1])),
+                              np.column_stack((centre + side_u[1:], side_h[1:]))))
+    return YoungLaplaceFit(angle=math.degrees(angle),
+                           bond=float(bond),
+                           apex_radius=float(radius),
+                           apex=(float(centre), float(height)),
+                           contact=(float(centre - end[0] * radius), float(centre + end[0] * radius)),
+                           volume=float(end[2] * radius ** 3),
+                           rms=float(np.sqrt(cost / current.size)),
+                           iterations=iterations,
+                           profile=profile)
+
+
+def surface_tension(fit, pixel_size, density_difference):
+    # in N/m from the Bond number and the apex radius in metres. Below MIN_BOND the drop is indistinguishable from
+    # a spherical cap in the fit and the Bond number is noise.
+    if fit.bond < MIN_BOND:
+        return None
+    return density_difference * GRAVITY * (fit.apex_radius * pixel_size) ** 2 / fit.bond
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from analysis.batch import (IMAGE_PATTERNS, Progress, ResultWriter, analyse_all, available_cores, expand_sequences,
+                            find_images)
+from analysis.cache import DEFAULT_CACHE_PATH, ResultCache
+from analysis.calibration import CalibrationError, calibration_from_dict
+from analysis.contact_angle import DEFAULT_PARAMETERS, METHODS
+from analysis.tracking import SEQUENCE_FIELDS, analyse_sequence
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Measure the contact angles of all pictures in a directory')
+    parser.add_argument('directory', type=Path)
+    parser.add_argument('-o', '--output', type=Path, help='result file, .csv or .jsonl (default: csv on stdout)')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help='output format, default from the file suffix')
+    parser.add_argument('-j', '--jobs', type=int, default=available_cores(), help='worker processes')
+    parser.add_argument('-g', '--glob', action='append', dest='patterns',
+                        help=f'file name pattern, can be repeated (default: {" ".join(IMAGE_PATTERNS)})')
+    parser.add_argument('--no-recursive', action='store_false', dest='recursive')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no progress output')
+    parser.add_argument('--sequence', action='store_true',
+                        help='track one droplet through a burst in capture order and write angle over time '
+                             '(single process, no cache)')
+
+    cache = parser.add_argument_group('result cache')
+    cache.add_argument('--cache', type=Path, default=DEFAULT_CACHE_PATH, help=f'default: {DEFAULT_CACHE_PATH}')
+    cache.add_argument('--cache-size', type=int, default=ResultCache.MAX_BYTES // 1024 ** 2, help='in MB')
+    cache.add_argument('--no-cache', action='store_true', help='always analyse, neither read nor write the cache')
+    cache.add_argument('--clear-cache', action='store_true', help='drop all cached results before starting')
+
+    analysis = parser.add_argument_group('analysis parameters')
+    analysis.add_argument('--threshold', type=float)
+    analysis.add_argument('--downsample', type=int)
+    analysis.add_argument('--margin', type=float)
+    analysis.add_argument('--fit-fraction', type=float)
+    analysis.add_argument('--degree', type=int)
+    analysis.add_argument('--method', choices=METHODS,
+                          help='tangent fits at the contact points or a Young-Laplace fit of the whole drop '
+                               '(default: tangent)')
+    analysis.add_argument('--pixel-size', type=float,
+                          help='metres per pixel, Young-Laplace fits then report the surface tension in mN/m')
+    analysis.add_argument('--density-difference', type=float,
+                          help=f'kg/m3 between drop and surrounding medium '
+                               f'(default: {DEFAULT_PARAMETERS["density_difference"]:g})')
+    analysis.add_argument('--calibration', type=Path, metavar='PROFILE',
+                          help='profile file (.json) with a calibration: contours are corrected for the lens '
+                               'distortion and the pixel size is taken from it')
+    return parser.parse_args(argv[1:])
+
+
+def load_calibration(path):
+    try:
+        with open(path, 'r') as profile_file:
+            calibration = calibration_from_dict(json.load(profile_file).get('calibration'))
+    except (OSError, ValueError, AttributeError, CalibrationError) as error:
+        raise CalibrationError(f'Unable to read the calibration of {path}: {error}')
+    if calibration is None:
+        raise CalibrationError(f'The profile {path} has no calibration')
+    return calibration
+
+
+def main():
+    args = parse_args(sys.argv)
+    try:
+        calibration = load_calibration(args.calibration) if args.calibration else None
+    except CalibrationError as error:
+        sys.exit(f'{error}')
+    parameters = {key: getattr(args, key) for key in ('threshold', 'downsample', 'margin', 'fit_fraction', 'degree',
+                                                      'method', 'pixel_size', 'density_difference')
+                  if getattr(args, key) is not None}
+    output_format = args.format or ('jsonl' if args.output and args.output.suffix == '.jsonl' else 'csv')
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    progress = Progress() if not args.quiet else None
+    cache_path = None
+    if not args.no_cache and not args.sequence:
+        # create (or clear) the cache once before the workers open it, this also applies the size limit
+        cache = ResultCache(args.cache, max_bytes=args.cache_size * 1024 ** 2)
+        if args.clear_cache:
+            cache.clear()
+        cache.close()
+        cache_path = args.cache
+    try:
+        images = expand_sequences(find_images(args.directory, args.patterns or IMAGE_PATTERNS, args.recursive))
+        if args.sequence:
+            writer = ResultWriter(output, output_format, SEQUENCE_FIELDS)
+            rows = analyse_sequence(images, parameters, calibration=calibration)
+        else:
+            writer = ResultWriter(output, output_format)
+            rows = analyse_all(images, parameters, max(1, args.jobs), cache_path, calibration)
+        for row in rows:
+            writer.write(row)
+            if progress:
+                progress.update(row)
+    finally:
+        if progress:
+            progress.finish()
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
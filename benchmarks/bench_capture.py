@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# Capture latency benchmark, drives UI.take_pic end-to-end with the simulated camera.
+# Run from the repository root: python -m benchmarks.bench_capture --shots 20
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import QtCore, QtWidgets  # noqa: E402
+
+from camera.simulated import SOURCE_DIRECTORY, SimulatedCamera  # noqa: E402
+from gui.loadui import UI  # noqa: E402
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark the take_pic round trip on a simulated camera')
+    parser.add_argument('--shots', type=int, default=10)
+    parser.add_argument('--format', default='jpeg')
+    parser.add_argument('--framerate', type=float, default=30, help='simulated sensor frame rate')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated capture latency in seconds')
+    parser.add_argument('--settle', type=float, default=0.0,
+                        help='upper bound of the exposure settle wait before each capture in seconds')
+    parser.add_argument('--source', type=Path, default=SOURCE_DIRECTORY,
+                        help='pictures the simulated camera replays, a single picture is a static scene')
+    parser.add_argument('--resolution', default='1920x1080')
+    return parser.parse_args(argv)
+
+
+def summary(values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
+    return f'mean {statistics.mean(values) * 1000:8.1f} ms  ' \
+           f'p50 {statistics.median(values) * 1000:8.1f} ms  ' \
+           f'p95 {p95 * 1000:8.1f} ms  ' \
+           f'max {values[-1] * 1000:8.1f} ms'
+
+
+def take_pic_blocking(ui):
+    loop = QtCore.QEventLoop()
+    ui.worker.finished.connect(loop.quit)
+    start = time.perf_counter()
+    ui.take_pic()
+    loop.exec_()
+    ui.worker.finished.disconnect(loop.quit)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    app = QtWidgets.QApplication(sys.argv[:1])
+    resolution = tuple(int(value) for value in args.resolution.split('x'))
+    cam = SimulatedCamera(args.source, framerate=args.framerate, latency=args.latency, resolution=resolution)
+
+    with tempfile.TemporaryDirectory() as base_directory:
+        ui = UI(cam=cam, base_directory=base_directory)
+        ui.pic_format = args.format
+        ui.worker.settle_time = args.settle
+        stages = {}
+        settled = []
+        ui.worker.TIMINGS.connect(lambda timings: [stages.setdefault(stage, []).append(timings[stage])
+                                                   for stage in ('settle', 'capture', 'queue', 'total')],
+                                  QtCore.Qt.DirectConnection)
+        ui.worker.TIMINGS.connect(lambda timings: settled.append(timings['settled']), QtCore.Qt.DirectConnection)
+        pipeline_stages = {}
+        ui.PIPELINE_DONE.connect(lambda timings: [pipeline_stages.setdefault(stage, []).append(timings[stage])
+                                                  for stage in ('wait', 'encode', 'write', 'chown', 'total')],
+                                 QtCore.Qt.DirectConnection)
+        round_trips = []
+        start = time.perf_counter()
+        for _ in range(args.shots):
+            round_trips.append(take_pic_blocking(ui))
+        camera_elapsed = time.perf_counter() - start
+        # wait until the pipeline has written everything
+        ui.pipeline.close(wait=True)
+        elapsed = time.perf_counter() - start
+        app.processEvents()
+
+    print(f'{args.shots} shots, {args.format}, {resolution[0]}x{resolution[1]}, '
+          f'sensor {args.framerate:g} fps, latency {args.latency * 1000:g} ms, settle {args.settle:g} s')
+    print('camera thread')
+    for stage, values in stages.items():
+        print(f'{stage:>10}: {summary(values)}')
+    print(f'{"take_pic":>10}: {summary(round_trips)}')
+    if args.settle:
+        print(f'{"settled":>10}: {sum(settled)} of {args.shots} shots before the {args.settle:g} s timeout')
+    print('capture pipeline')
+    for stage, values in pipeline_stages.items():
+        print(f'{stage:>10}: {summary(values)}')
+    print(f'throughput: {args.shots / camera_elapsed:.2f} shots/s camera, {args.shots / elapsed:.2f} shots/s saved')
+
+
+if __name__ == '__main__':
+    main()
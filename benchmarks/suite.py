@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# Benchmark suite for the operator facing paths: take_pic round trip, picture loading per format and resolution,
+# profile loading, directory listing and analysis per image. Runs on a plain Linux machine with the simulated
+# camera and synthetic drop pictures. Results are written as JSON; against a baseline every case is compared
+# by its fastest sample (scheduling noise only ever adds time) and the exit status is 1 when one got slower than
+# the tolerance allows.
+# Run from the repository root:
+#   python -m benchmarks.suite --save-baseline benchmarks/baseline.json   (on a known good commit)
+#   python -m benchmarks.suite --baseline benchmarks/baseline.json -o results.json
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np  # noqa: E402
+from PyQt5 import QtCore, QtWidgets  # noqa: E402
+
+from analysis.contact_angle import METHODS, measure  # noqa: E402
+from analysis.image_io import load_grayscale  # noqa: E402
+from benchmarks.bench_capture import take_pic_blocking  # noqa: E402
+from camera.encoding import RAW_FORMATS, encode_frame  # noqa: E402
+from camera.raw_file import pack_raw  # noqa: E402
+from camera.simulated import SimulatedCamera  # noqa: E402
+from gui.image_loader import read_image  # noqa: E402
+from gui.loadui import UI  # noqa: E402
+from storage.naming import TIMESTAMP_FORMAT  # noqa: E402
+from storage.picture_index import PictureIndex  # noqa: E402
+
+# bump when cases are renamed or measure something else, baselines of other versions are not compared
+RESULTS_VERSION = 1
+CASES = ('take_pic', 'display_picture', 'profile', 'listing', 'analysis')
+CAPTURE_FORMATS = ('jpeg', 'png', 'rgb')
+DISPLAY_FORMATS = ('jpeg', 'png', 'bmp', 'rgb', 'yuv')
+RESOLUTIONS = ((640, 480), (1920, 1080), (3280, 2464))
+LISTING_SIZES = (1000, 10000, 100000)
+# the quick run leaves out the largest resolution and directory
+QUICK_RESOLUTIONS = RESOLUTIONS[:2]
+QUICK_LISTING_SIZES = LISTING_SIZES[:2]
+# slowdowns smaller than this are timer and scheduling noise
+NOISE_FLOOR = 0.002
+# the simulated camera replays one picture of this size; its frame clock is fast enough that waiting for the next
+# frame does not add jitter to the capture cases
+CAMERA_RESOLUTION = (1920, 1080)
+CAMERA_FRAMERATE = 1000
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark capture, picture loading, profiles, directory listing '
+                                                 'and analysis, optionally against a stored baseline')
+    parser.add_argument('-o', '--output', type=Path, help='result file (default: JSON on stdout)')
+    parser.add_argument('--baseline', type=Path, help='results of an earlier run to compare against')
+    parser.add_argument('--save-baseline', type=Path, help='also write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown before a case fails (default: 0.25)')
+    parser.add_argument('--repeat', type=int, default=10, help='samples per case')
+    parser.add_argument('--quick', action='store_true',
+                        help=f'up to {QUICK_RESOLUTIONS[-1][0]}x{QUICK_RESOLUTIONS[-1][1]} and '
+                             f'{QUICK_LISTING_SIZES[-1]} files')
+    parser.add_argument('--only', action='append', choices=CASES, help='run only these cases, can be repeated')
+    return parser.parse_args(argv)
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return {'count': len(samples),
+            'min': samples[0],
+            'median': statistics.median(samples),
+            'p95': samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+            'mean': statistics.mean(samples),
+            'max': samples[-1]}
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def drop_frame(width, height, angle=70.0):
+    # back lit sessile drop: a dark spherical cap on a dark substrate in front of a bright background, with
+    # anti-aliased edges so the analysis sees a realistic subpixel contour
+    baseline = 0.7 * height
+    radius = 0.2 * width / math.sin(math.radians(angle))
+    centre = baseline + radius * math.cos(math.radians(angle))
+    y, x = np.ogrid[:height, :width]
+    drop = np.clip(radius + 0.5 - np.hypot(x - width / 2, y - centre), 0, 1)
+    substrate = np.clip(y - baseline + 0.5, 0, 1)
+    gray = (220 - 190 * np.maximum(drop, substrate)).astype(np.uint8)
+    return np.repeat(gray[..., None], 3, axis=2)
+
+
+def write_picture(path, frame, pic_format):
+    data = encode_frame(frame, pic_format)
+    if pic_format in RAW_FORMATS:
+        data = pack_raw(data, (frame.shape[1], frame.shape[0]), pic_format)
+    Path(path).write_bytes(data)
+
+
+def wait_for(app, condition):
+    while not condition():
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def bench_take_pic(app, ui, repeat):
+    # camera thread round trip, and until the capture pipeline has written the picture
+    cases = {}
+    ui.worker.settle_time = 0
+    for pic_format in CAPTURE_FORMATS:
+        ui.pic_format = pic_format
+        round_trips, saved = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            round_trips.append(take_pic_blocking(ui))
+            wait_for(app, lambda: ui.pipeline.queue_depth == 0)
+            saved.append(time.perf_counter() - start)
+        cases[f'take_pic.{pic_format}'] = round_trips
+        cases[f'take_pic.{pic_format}.saved'] = saved
+    return cases
+
+
+def show_picture_blocking(ui, path):
+    # display_picture without the file dialog: the screen sized preview from disk to the label
+    loop = QtCore.QEventLoop()
+    failures = []
+    ui.image_loader.LOADED.connect(loop.quit)
+    ui.image_loader.FAILED.connect(lambda path, message: failures.append(message))
+    ui.image_loader.FAILED.connect(loop.quit)
+    ui.image_cache.clear()
+    start = time.perf_counter()
+    ui.show_picture_file(Path(path))
+    loop.exec_()
+    elapsed = time.perf_counter() - start
+    ui.image_loader.LOADED.disconnect(loop.quit)
+    ui.image_loader.FAILED.disconnect()
+    ui.image_loader.FAILED.connect(ui.show_picture_error)
+    if failures:
+        raise OSError(failures[0])
+    return elapsed
+
+
+def bench_display_picture(ui, repeat, directory, resolutions):
+    cases = {}
+    for width, height in resolutions:
+        frame = drop_frame(width, height)
+        for pic_format in DISPLAY_FORMATS:
+            path = Path(directory, f'display_{width}x{height}.{pic_format}')
+            write_picture(path, frame, pic_format)
+            show_picture_blocking(ui, path)
+            cases[f'display_picture.preview.{pic_format}.{width}x{height}'] = [show_picture_blocking(ui, path)
+                                                                               for _ in range(repeat)]
+            # full resolution decode, as when zooming in
+            cases[f'display_picture.full.{pic_format}.{width}x{height}'] = timed(lambda: read_image(path), repeat)
+            path.unlink()
+    return cases
+
+
+def bench_profiles(ui, repeat):
+    # two profiles with different camera settings in the same directory, loaded alternately
+    names = ('benchmark_a', 'benchmark_b')
+    for index, name in enumerate(names):
+        ui.profile_store.save(name, {'brightness': 40 + 20 * index,
+                                     'sharpness': 10 * index,
+                                     'contrast': 5 + 10 * index,
+                                     'saturation': -10 * index,
+                                     'iso': 1 + index,
+                                     'directory': f'{ui.pic_directory}',
+                                     'quality': 80 + 5 * index,
+                                     'filename': f'drop{index}',
+                                     'pic_format': index})
+    ui.set_profile_combobox()
+    load, set_values = [], []
+    for count in range(repeat):
+        ui.profile_name_combobox.setCurrentText(names[count % 2])
+        start = time.perf_counter()
+        ui.load_profile()
+        load.append(time.perf_counter() - start)
+    for count in range(repeat):
+        ui.current_settings = ui.profile_store.get(names[count % 2])
+        start = time.perf_counter()
+        ui.set_values()
+        set_values.append(time.perf_counter() - start)
+    for name in names:
+        ui.profile_store.delete(name)
+    return {'profile.load_profile': load, 'profile.set_values': set_values}
+
+
+def fill_directory(directory, count):
+    # empty files with capture names, listing never reads the content
+    directory.mkdir()
+    start = datetime(2022, 1, 1)
+    for index in range(count):
+        Path(directory, f'drop_{(start + timedelta(seconds=index)).strftime(TIMESTAMP_FORMAT)}.png').touch()
+
+
+def bench_listing(ui, repeat, directory, sizes):
+    cases = {}
+    for count in sizes:
+        pictures = Path(directory, f'listing_{count}')
+        fill_directory(pictures, count)
+        # fewer samples of the large directories, their run time is long enough to average out noise
+        samples = max(3, repeat * LISTING_SIZES[0] // count)
+        # first visit: every file is stat'ed and indexed
+        cold = []
+        for sample in range(samples):
+            index = PictureIndex(Path(directory, f'listing_{count}_{sample}.sqlite'))
+            start = time.perf_counter()
+            index.open_directory(pictures)
+            cold.append(time.perf_counter() - start)
+            index.close()
+        cases[f'listing.index.{count}'] = cold
+        # switching to an indexed directory in the gallery, including sorting and filtering
+        ui.open_gallery(pictures)
+        cases[f'listing.gallery.{count}'] = timed(lambda: ui.open_gallery(pictures), samples)
+    ui.open_gallery(ui.pic_directory)
+    return cases
+
+
+def bench_analysis(repeat, directory, resolutions):
+    cases = {}
+    for width, height in resolutions:
+        path = Path(directory, f'analysis_{width}x{height}.png')
+        write_picture(path, drop_frame(width, height), 'png')
+        cases[f'analysis.load.{width}x{height}'] = timed(lambda: load_grayscale(path), repeat)
+        gray = load_grayscale(path)
+        for method in METHODS:
+            # the first Young-Laplace fit may have to build the profile table
+            measure(gray, method=method)
+            cases[f'analysis.{method}.{width}x{height}'] = timed(lambda: measure(gray, method=method), repeat)
+    return cases
+
+
+def run(args):
+    app = QtWidgets.QApplication(sys.argv[:1])
+    only = set(args.only or CASES)
+    resolutions = QUICK_RESOLUTIONS if args.quick else RESOLUTIONS
+    listing_sizes = QUICK_LISTING_SIZES if args.quick else LISTING_SIZES
+    samples = {}
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory, 'source')
+        source.mkdir()
+        write_picture(Path(source, 'drop.png'), drop_frame(*CAMERA_RESOLUTION), 'png')
+        cam = SimulatedCamera(source, framerate=CAMERA_FRAMERATE, resolution=CAMERA_RESOLUTION)
+        ui = UI(cam=cam, base_directory=Path(directory, 'base'))
+        if 'take_pic' in only:
+            samples.update(bench_take_pic(app, ui, args.repeat))
+        if 'display_picture' in only:
+            samples.update(bench_display_picture(ui, args.repeat, directory, resolutions))
+        if 'profile' in only:
+            samples.update(bench_profiles(ui, args.repeat))
+        if 'listing' in only:
+            samples.update(bench_listing(ui, args.repeat, directory, listing_sizes))
+        if 'analysis' in only:
+            samples.update(bench_analysis(args.repeat, directory, resolutions))
+        ui.close()
+        app.processEvents()
+    return {'version': RESULTS_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'machine': {'platform': platform.platform(),
+                        'processor': platform.machine(),
+                        'python': platform.python_version(),
+                        'cpus': os.cpu_count()},
+            'options': {'repeat': args.repeat, 'quick': args.quick},
+            'cases': {name: summary(values) for name, values in samples.items()}}
+
+
+def compare(results, baseline, tolerance, statistic='min'):
+    # report lines and the names of the cases that got slower than the tolerance allows
+    if baseline.get('version') != RESULTS_VERSION:
+        return [f'Baseline version {baseline.get("version")} does not match {RESULTS_VERSION}, not compared'], []
+    lines, regressions = [], []
+    for name, case in results['cases'].items():
+        previous = baseline['cases'].get(name)
+        if previous is None:
+            lines.append(f'{name:<48} {case[statistic] * 1000:10.2f} ms  (new)')
+            continue
+        ratio = case[statistic] / previous[statistic] if previous[statistic] else math.inf
+        if ratio > 1 + tolerance and case[statistic] - previous[statistic] > NOISE_FLOOR:
+            status = 'SLOWER'
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            status = 'faster'
+        else:
+            status = 'ok'
+        lines.append(f'{name:<48} {case[statistic] * 1000:10.2f} ms  {previous[statistic] * 1000:10.2f} ms  '
+                     f'{ratio:6.2f}x  {status}')
+    # only the groups of cases that ran, --only leaves out the others on purpose
+    groups = {name.split('.')[0] for name in results['cases']}
+    for name in sorted(baseline['cases'].keys() - results['cases'].keys()):
+        if name.split('.')[0] in groups:
+            lines.append(f'{name:<48} not measured')
+    return lines, regressions
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        args.save_baseline.write_text(text)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        lines, regressions = compare(results, baseline, args.tolerance)
+        sys.stderr.write(f'{"case":<48} {"fastest":>13}  {"baseline":>13}\n' + '\n'.join(lines) + '\n')
+        if regressions:
+            sys.stderr.write(f'{len(regressions)} cases more than {args.tolerance:.0%} slower than the baseline: '
+                             f'{", ".join(regressions)}\n')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+# Everything the GUI uses on the camera. picamera.PiCamera already provides all of it, so it is used as is
+# and only the other backends that capture frames derive from this class.
+class CameraBackend(ABC):
+    RESOLUTION = (1920, 1080)
+
+    def __init__(self):
+        self.resolution = self.RESOLUTION
+        self.brightness = 50
+        self.sharpness = 0
+        self.contrast = 0
+        self.saturation = 0
+        self.iso = 0
+        self.preview = None
+
+    @abstractmethod
+    def capture(self, output, format=None, use_video_port=False, resize=None, **options): ...
+
+    def capture_continuous(self, output, format=None, use_video_port=False, **options):
+        # generic fallback, every iteration captures into the same output like picamera does for streams
+        while True:
+            self.capture(output, format, use_video_port, **options)
+            yield output
+
+    @abstractmethod
+    def start_preview(self, **options): ...
+
+    @abstractmethod
+    def stop_preview(self): ...
+
+    @abstractmethod
+    def add_overlay(self, source, size=None, format=None, **options): ...
+
+    @abstractmethod
+    def remove_overlay(self, overlay): ...
+
+    def close(self):
+        pass
+
+
+CAMERA_BACKENDS = ('picamera', 'simulated')
+
+
+def open_camera(backend='picamera', **options):
+    if backend == 'picamera':
+        # imported here so the simulated backend works on machines without picamera
+        from picamera import PiCamera
+        return PiCamera(**options)
+    if backend == 'simulated':
+        from camera.simulated import SimulatedCamera
+        return SimulatedCamera(**options)
+    raise ValueError(f'Unknown camera backend: {backend}')
+
+
+def output_format(output, format=None):
+    # same rule as picamera: an explicit format wins, otherwise use the file extension
+    if format:
+        return 'jpeg' if format == 'jpg' else format
+    if isinstance(output, (str, Path)):
+        suffix = Path(output).suffix.lstrip('.').lower()
+        return 'jpeg' if suffix == 'jpg' else suffix
+    raise ValueError('Unable to determine the format of the output')
@@ -0,0 +1,174 @@
+import io
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from camera.sequence_file import SEQUENCE_FORMAT, SequenceWriter, frame_path
+from storage.naming import BURST_TIMESTAMP_FORMAT, capture_path, capture_timestamp
+from storage.ownership import chown_pi
+
+Frame = namedtuple('Frame', ['index', 'timestamp', 'data', 'format'])
+
+
+class BurstCapture:
+    # Captures a sequence of frames into a bounded queue. The capture loop never waits for the consumer,
+    # a frame that does not fit into the queue is dropped and counted instead. captured and the achieved frame rate
+    # only count the frames that were queued.
+    QUEUE_SIZE = 64
+
+    def __init__(self, cam, frame_queue, frames=10, interval=0.0, pic_format='jpeg', quality=85,
+                 use_video_port=True):
+        self.cam = cam
+        self.frame_queue = frame_queue
+        self.frames = frames
+        self.interval = interval
+        self.pic_format = pic_format
+        self.quality = quality
+        self.use_video_port = use_video_port
+        self.captured = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def requested_fps(self):
+        if self.interval:
+            return 1 / self.interval
+        # "as fast as possible" is bounded by the sensor frame rate
+        return float(self.cam.framerate)
+
+    @property
+    def achieved_fps(self):
+        return self.captured / self.elapsed if self.elapsed else 0.0
+
+    def stats(self):
+        return {'captured': self.captured,
+                'dropped': self.dropped,
+                'requested_fps': self.requested_fps,
+                'achieved_fps': self.achieved_fps}
+
+    def _options(self):
+        if self.pic_format == 'jpeg':
+            return {'quality': self.quality}
+        return {}
+
+    def _put(self, index, data, start):
+        frame = Frame(index, datetime.now(), data, self.pic_format)
+        try:
+            self.frame_queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.captured += 1
+        self.elapsed = time.perf_counter() - start
+
+    def run(self, progress=None):
+        start = time.perf_counter()
+        if self.interval:
+            for index in range(self.frames):
+                # fixed schedule, a late frame is taken immediately instead of shifting all following frames
+                delay = start + index * self.interval - time.perf_counter()
+                if self._stop.wait(max(delay, 0)):
+                    break
+                stream = io.BytesIO()
+                self.cam.capture(stream, format=self.pic_format, use_video_port=self.use_video_port,
+                                 **self._options())
+                self._put(index, stream.getvalue(), start)
+                if progress:
+                    progress(self.stats())
+        else:
+            stream = io.BytesIO()
+            frames = self.cam.capture_continuous(stream, format=self.pic_format, use_video_port=True,
+                                                 **self._options())
+            for index, _ in zip(range(self.frames), frames):
+                self._put(index, stream.getvalue(), start)
+                stream.seek(0)
+                stream.truncate()
+                if progress:
+                    progress(self.stats())
+                if self._stop.is_set():
+                    break
+            frames.close()
+        return self.stats()
+
+
+class FrameWriter(threading.Thread):
+    # Drains the burst queue into the capture pipeline, which writes one file per frame. Waiting for the
+    # pipeline only ever blocks this thread, never the capture loop.
+    def __init__(self, frame_queue, directory, pic_name, pipeline, resolution=None, metadata=None):
+        super().__init__(daemon=True)
+        self.frame_queue = frame_queue
+        self.directory = directory
+        self.pic_name = pic_name
+        self.pipeline = pipeline
+        # resolution and metadata end up in the header of unencoded frames
+        self.resolution = resolution
+        self.metadata = metadata or {}
+        self.written = []
+
+    def finish(self):
+        # blocking put, the sentinel must not be dropped
+        self.frame_queue.put(None)
+
+    def run(self):
+        while True:
+            frame = self.frame_queue.get()
+            if frame is None:
+                break
+            timestamp = frame.timestamp.strftime(BURST_TIMESTAMP_FORMAT)
+            path = capture_path(self.directory, self.pic_name, timestamp, frame.format)
+            metadata = {**self.metadata, 'index': frame.index, 'timestamp': frame.timestamp.isoformat()}
+            self.pipeline.submit(path, data=frame.data, pic_format=frame.format, resolution=self.resolution,
+                                 metadata=metadata)
+            self.written.append(path)
+
+
+class SequenceFrameWriter(threading.Thread):
+    # Drains the burst queue into one sequence container instead of one file per frame: a single file that is
+    # only ever appended to and chowned once. Every frame keeps its timestamp and the camera settings at the time
+    # (settings is a callable). A write error ends the writing but not the draining, so finish() never blocks.
+    def __init__(self, frame_queue, directory, pic_name, pic_format, resolution, metadata=None, settings=None):
+        super().__init__(daemon=True)
+        self.frame_queue = frame_queue
+        self.path = capture_path(directory, pic_name, capture_timestamp(datetime.now()), SEQUENCE_FORMAT)
+        self.pic_format = pic_format
+        self.resolution = resolution
+        self.metadata = metadata or {}
+        self.settings = settings
+        self.written = []
+        self.error = None
+
+    def finish(self):
+        self.frame_queue.put(None)
+
+    def run(self):
+        writer = None
+        while True:
+            frame = self.frame_queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                if writer is None:
+                    writer = SequenceWriter(self.path, frame.format, self.resolution, self.metadata)
+                    chown_pi(self.path)
+                settings = {'camera': self.settings()} if self.settings else None
+                index = writer.append(frame.data, frame.timestamp, settings)
+            except (OSError, ValueError) as error:
+                logging.error(f'Writing {self.path.name} failed: {error}')
+                self.error = error
+                continue
+            self.written.append(frame_path(self.path, index))
+        if writer is not None:
+            try:
+                writer.close()
+            except OSError as error:
+                # the frames are on disk, only the index is missing and readers walk the frames instead
+                logging.error(f'Closing {self.path.name} failed: {error}')
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from camera.service import ServiceError
+from camera.settings import CAMERA_SETTINGS
+from monitoring.metrics import METRICS
+from storage.ownership import PI_GID
+
+logger = logging.getLogger(__name__)
+
+# Control protocol of the capture service, the same commands on two transports:
+#   Unix socket: one JSON object per line, {"command": "capture", "format": "png"} -> {"ok": true, ...}
+#   HTTP:        GET /status, POST /<command> with the arguments as JSON body,
+#                GET /metrics in the Prometheus text format for scraping
+# Neither transport authenticates its clients: the socket is only open to root and the pi group, HTTP only
+# listens on the loopback interface unless told otherwise.
+DEFAULT_SOCKET = Path(tempfile.gettempdir(), 'contact-angle-service.sock')
+DEFAULT_HTTP_HOST = '127.0.0.1'
+
+
+def dispatch(service, command, arguments):
+    # every failure is answered, the connection stays open for the next command
+    try:
+        return {'ok': True, **service.handle(command, arguments)}
+    except (ServiceError, OSError, ValueError) as error:
+        return {'ok': False, 'error': f'{error}'}
+    except Exception as error:
+        # camera and catalogue errors (PiCameraError, sqlite3.Error) and bugs
+        logger.exception('Command %s failed', command)
+        return {'ok': False, 'error': f'{command} failed: {error}'}
+
+
+class SocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                arguments = json.loads(line)
+                command = arguments.pop('command')
+            except (ValueError, KeyError, AttributeError):
+                response = {'ok': False, 'error': 'Expected a JSON object with a command'}
+            else:
+                response = dispatch(self.server.service, command, arguments)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+class SocketServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        self.service = service
+        # a socket file left behind by a service that did not shut down cleanly
+        Path(path).unlink(missing_ok=True)
+        super().__init__(f'{path}', SocketHandler)
+        # the service runs as root, the GUI and scripts of the pi user have to be able to connect as well
+        try:
+            os.chown(path, -1, PI_GID)
+        except PermissionError:
+            # not running as root, the socket already belongs to the current user
+            pass
+        os.chmod(path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        Path(self.server_address).unlink(missing_ok=True)
+
+
+class HTTPHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.strip('/') == 'metrics':
+            body = METRICS.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', f'{len(body)}')
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.respond(self.path.strip('/'), {})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            arguments = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'ok': False, 'error': 'Body is not JSON'})
+            return
+        self.respond(self.path.strip('/'), arguments)
+
+    def respond(self, command, arguments):
+        if command not in self.server.service.COMMANDS:
+            self.send_json(404, {'ok': False, 'error': f'Unknown command: {command}'})
+            return
+        response = dispatch(self.server.service, command, arguments)
+        self.send_json(200 if response['ok'] else 400, response)
+
+    def send_json(self, status, response):
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', f'{len(body)}')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port, service, host=DEFAULT_HTTP_HOST):
+        self.service = service
+        super().__init__((host, port), HTTPHandler)
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+class ServiceClient:
+    # One persistent connection to the Unix socket, calls from several threads take turns
+    def __init__(self, path=DEFAULT_SOCKET, timeout=60):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(f'{self.path}')
+        self._file = self._socket.makefile('rwb')
+
+    def call(self, command, **arguments):
+        request = json.dumps({'command': command, **arguments}, default=str).encode() + b'\n'
+        with self._lock:
+            self._file.write(request)
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise ServiceError('Capture service closed the connection')
+        response = json.loads(line)
+        if not response.pop('ok'):
+            raise ServiceError(response['error'])
+        return response
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+def remote_setting(name):
+    def get(cam):
+        return cam.values[name]
+
+    def set(cam, value):
+        cam.client.call('set_settings', **{name: value})
+        cam.values[name] = value
+
+    return property(get, set)
+
+
+class RemotePreview:
+    def __init__(self, client, window):
+        self._client = client
+        self._window = window
+        self.fullscreen = False
+
+    @property
+    def window(self):
+        return self._window
+
+    @window.setter
+    def window(self, window):
+        self._client.call('move_preview', window=window)
+        self._window = window
+
+
+class RemoteCamera:
+    # The camera of a running capture service. Settings and the preview are forwarded, frames are not: the
+    # service captures and saves the pictures itself (see ServiceClient.call('capture')). Like PiCamera it only
+    # provides what the GUI uses, it is no CameraBackend.
+    brightness = remote_setting('brightness')
+    sharpness = remote_setting('sharpness')
+    contrast = remote_setting('contrast')
+    saturation = remote_setting('saturation')
+    iso = remote_setting('iso')
+
+    def __init__(self, client):
+        self.client = client
+        status = client.call('status')
+        self.values = {name: status['camera'][name] for name in CAMERA_SETTINGS}
+        self.resolution = tuple(status['resolution'])
+        self.preview = None
+
+    def start_preview(self, fullscreen=False, window=None, **options):
+        self.client.call('start_preview', fullscreen=fullscreen, window=window)
+        self.preview = RemotePreview(self.client, window)
+
+    def stop_preview(self):
+        self.client.call('stop_preview')
+        self.preview = None
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+from PyQt5 import QtCore, QtGui
+
+# Software encoders for frames held as (height, width, 3) RGB arrays
+ENCODED_FORMATS = {'jpeg': 'JPEG', 'png': 'PNG', 'bmp': 'BMP'}
+RAW_FORMATS = ('yuv', 'rgb', 'rgba', 'bgr', 'bgra')
+# capture formats in the order profiles refer to them, gif is still encoded by the camera
+PICTURE_FORMATS = ('jpeg', 'png', 'gif', 'bmp', *RAW_FORMATS)
+
+
+def qimage_to_array(image):
+    image = image.convertToFormat(QtGui.QImage.Format_RGB888)
+    ptr = image.constBits()
+    ptr.setsize(image.byteCount())
+    array = np.frombuffer(ptr, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return array[:, :image.width() * 3].reshape(image.height(), image.width(), 3).copy()
+
+
+def array_to_qimage(array):
+    array = np.ascontiguousarray(array)
+    height, width = array.shape[:2]
+    image = QtGui.QImage(array.data, width, height, array.strides[0], QtGui.QImage.Format_RGB888)
+    # QImage does not own the numpy buffer, hand out a deep copy
+    return image.copy()
+
+
+def resize_array(array, size):
+    image = array_to_qimage(array).scaled(size[0], size[1], QtCore.Qt.IgnoreAspectRatio,
+                                          QtCore.Qt.SmoothTransformation)
+    return qimage_to_array(image)
+
+
+def raw_shape(width, height):
+    # picamera pads unencoded captures to a width of 32 and a height of 16 pixels
+    return (width + 31) // 32 * 32, (height + 15) // 16 * 16
+
+
+def encode_raw(frame, fmt):
+    height, width = frame.shape[:2]
+    padded_width, padded_height = raw_shape(width, height)
+    rgb = np.zeros((padded_height, padded_width, 3), np.uint8)
+    rgb[:height, :width] = frame
+    if fmt == 'yuv':
+        rgb = rgb.astype(np.float32)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        y = 0.299 * r + 0.587 * g + 0.114 * b
+        u = -0.169 * r - 0.331 * g + 0.5 * b + 128
+        v = 0.5 * r - 0.419 * g - 0.081 * b + 128
+        # I420: full resolution Y plane followed by 2x2 subsampled U and V planes
+        u = u.reshape(padded_height // 2, 2, padded_width // 2, 2).mean(axis=(1, 3))
+        v = v.reshape(padded_height // 2, 2, padded_width // 2, 2).mean(axis=(1, 3))
+        planes = [np.clip(plane, 0, 255).astype(np.uint8) for plane in (y, u, v)]
+        return b''.join(plane.tobytes() for plane in planes)
+    if fmt.startswith('bgr'):
+        rgb = rgb[..., ::-1]
+    if fmt.endswith('a'):
+        alpha = np.full((padded_height, padded_width, 1), 255, np.uint8)
+        rgb = np.concatenate((rgb, alpha), axis=2)
+    return np.ascontiguousarray(rgb).tobytes()
+
+
+def encode_frame(frame, fmt, quality=85):
+    if fmt in RAW_FORMATS:
+        return encode_raw(frame, fmt)
+    if fmt not in ENCODED_FORMATS:
+        raise ValueError(f'Unsupported format: {fmt}')
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    array_to_qimage(frame).save(buffer, ENCODED_FORMATS[fmt], quality if fmt == 'jpeg' else -1)
+    return bytes(buffer.data())
+
+
+def write_output(output, data):
+    if isinstance(output, (str, Path)):
+        with open(output, 'wb') as output_file:
+            output_file.write(data)
+    elif hasattr(output, 'write'):
+        output.write(data)
+    else:
+        # writable buffer (e.g. a numpy array), like picamera
+        view = memoryview(output).cast('B')
+        view[:len(data)] = data
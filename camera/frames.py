@@ -0,0 +1,135 @@
+import threading
+
+import numpy as np
+
+
+class FrameReader:
+    # One consumer of a FrameRing. Every reader gets the newest frame and counts the frames it never saw itself,
+    # a slot stays untouched by the camera for as long as a reader holds it.
+    def __init__(self, ring):
+        self.ring = ring
+        self.skipped = 0
+        self.slot = None
+        self.sequence = 0
+
+    def acquire(self, timeout=None):
+        # newest frame not seen before as (sequence, view into the slot), None on timeout. The slot of the
+        # previous frame is given back at the same time.
+        ring = self.ring
+        with ring._condition:
+            if not ring._condition.wait_for(lambda: ring.sequence > self.sequence, timeout):
+                return None
+            self.skipped += ring.sequence - self.sequence - 1 if self.sequence else 0
+            self.slot = ring._latest
+            self.sequence = ring.sequence
+            return self.sequence, ring.frames[self.slot]
+
+    def release(self):
+        with self.ring._condition:
+            self.slot = None
+
+
+class FrameRing:
+    # Preallocated frame slots the camera writes into like into a file. The reader always gets the newest
+    # frame, frames that were overwritten before anybody read them are counted as skipped. With three slots
+    # the writer never has to wait: one is being written, one holds the newest frame, one is being read.
+    # Further readers (e.g. the live measurement on the frames of the preview) need one more slot each.
+    def __init__(self, frame_bytes, slots=3):
+        self.frames = np.zeros((slots, frame_bytes), np.uint8)
+        self.sequence = 0
+        self._condition = threading.Condition()
+        self._writing = 0
+        self._offset = 0
+        self._latest = None
+        self.readers = [FrameReader(self)]
+
+    def add_reader(self):
+        with self._condition:
+            # the newest frame and the one being written need a slot besides the ones the readers hold
+            if len(self.readers) + 3 > len(self.frames):
+                raise ValueError(f'{len(self.frames)} slots are not enough for {len(self.readers) + 1} readers')
+            reader = FrameReader(self)
+            self.readers.append(reader)
+            return reader
+
+    def remove_reader(self, reader):
+        with self._condition:
+            self.readers.remove(reader)
+
+    @property
+    def skipped(self):
+        return self.readers[0].skipped
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        end = self._offset + data.nbytes
+        if end > self.frames.shape[1]:
+            raise ValueError('Frame does not fit into the ring buffer slot')
+        self.frames[self._writing, self._offset:end] = data
+        self._offset = end
+        return data.nbytes
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        # the frame written so far is complete
+        with self._condition:
+            self._latest = self._writing
+            self.sequence += 1
+            busy = {self._latest, *(reader.slot for reader in self.readers)}
+            self._writing = next(slot for slot in range(len(self.frames)) if slot not in busy)
+            self._offset = 0
+            self._condition.notify_all()
+
+    def acquire(self, timeout=None):
+        return self.readers[0].acquire(timeout)
+
+    def release(self):
+        self.readers[0].release()
+
+
+class FrameGrabber(threading.Thread):
+    # Streams downscaled frames from the video port into a FrameRing. The splitter port keeps it independent
+    # from the preview and from still captures.
+    def __init__(self, cam, ring, resolution, pic_format='yuv', splitter_port=1):
+        super().__init__(daemon=True)
+        self.cam = cam
+        self.ring = ring
+        self.resolution = resolution
+        self.pic_format = pic_format
+        self.splitter_port = splitter_port
+        self._halt = threading.Event()
+
+    def stop(self):
+        self._halt.set()
+
+    def run(self):
+        frames = self.cam.capture_continuous(self.ring, format=self.pic_format, use_video_port=True,
+                                             resize=self.resolution, splitter_port=self.splitter_port)
+        for _ in frames:
+            self.ring.commit()
+            if self._halt.is_set():
+                break
+        frames.close()
+
+
+def yuv_frame_bytes(width, height):
+    # padded I420 frame: full resolution Y plane plus two quarter resolution chroma planes
+    return width * height * 3 // 2
+
+
+def luminance(frame, resolution, padded):
+    # view of the Y plane of an I420 frame without the padding
+    (width, height), (padded_width, padded_height) = resolution, padded
+    return frame[:padded_width * padded_height].reshape(padded_height, padded_width)[:height, :width]
+
+
+def rgb_frame_bytes(width, height):
+    return width * height * 3
+
+
+def rgb_frame(frame, resolution, padded):
+    # (height, width, 3) view of a padded RGB frame
+    (width, height), (padded_width, padded_height) = resolution, padded
+    return frame[:padded_width * padded_height * 3].reshape(padded_height, padded_width, 3)[:height, :width]
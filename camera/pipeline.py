@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from camera.encoding import RAW_FORMATS, encode_frame, raw_shape
+from camera.raw_file import pack_raw
+from monitoring.metrics import METRICS
+from storage.ownership import chown_pi
+
+logger = logging.getLogger(__name__)
+
+
+def capture_raw(cam, use_video_port=False):
+    # Unencoded RGB capture, the camera is free again as soon as the exposure is read out
+    width, height = cam.resolution
+    padded_width, padded_height = raw_shape(width, height)
+    buffer = np.empty((padded_height, padded_width, 3), np.uint8)
+    cam.capture(buffer, format='rgb', use_video_port=use_video_port)
+    return buffer[:height, :width]
+
+
+class CapturePipeline:
+    # Encodes, writes and chowns captures on a pool of worker threads. At most MAX_PENDING captures are held
+    # in memory, submit() blocks when the pool is that far behind (backpressure on the camera side).
+    WORKERS = 2
+    MAX_PENDING = 4
+
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING, on_done=None):
+        self.on_done = on_done
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='capture-pipeline')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def queue_depth(self):
+        return self.pending
+
+    def submit(self, path, frame=None, data=None, pic_format='jpeg', quality=85, resolution=None, metadata=None):
+        # either a raw frame that still has to be encoded or already encoded data (e.g. burst frames).
+        # Unencoded formats are written with a header, already captured raw data needs its resolution for it.
+        queued = time.perf_counter()
+        self._slots.acquire()
+        with self._lock:
+            self.pending += 1
+        future = self._executor.submit(self._process, path, frame, data, pic_format, quality, resolution, metadata,
+                                       queued)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+        if future.exception() is not None:
+            logger.error('Saving capture failed: %s', future.exception())
+
+    def _process(self, path, frame, data, pic_format, quality, resolution, metadata, queued):
+        start = time.perf_counter()
+        if data is None:
+            data = encode_frame(frame, pic_format, quality)
+            resolution = frame.shape[1], frame.shape[0]
+        if pic_format in RAW_FORMATS:
+            data = pack_raw(data, resolution, pic_format, metadata)
+        encoded = time.perf_counter()
+        with open(path, 'wb') as output_file:
+            output_file.write(data)
+        written = time.perf_counter()
+        chown_pi(path)
+        done = time.perf_counter()
+        timings = {'path': path,
+                   'wait': start - queued,
+                   'encode': encoded - start,
+                   'write': written - encoded,
+                   'chown': done - written,
+                   'total': done - queued,
+                   'queue_depth': self.pending - 1,
+                   'metadata': metadata or {}}
+        for stage in ('wait', 'encode', 'write', 'chown'):
+            METRICS.record(f'capture.{stage}', timings[stage])
+        METRICS.record('capture.saved', timings['total'])
+        if self.on_done:
+            self.on_done(timings)
+        return timings
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
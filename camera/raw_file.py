@@ -0,0 +1,122 @@
+import json
+import struct
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from camera.encoding import RAW_FORMATS, raw_shape
+
+# Unencoded captures as written by picamera (padded to 32x16 pixels) behind a small self describing header:
+#   8 byte magic, little endian uint32 header length, JSON header, zero padding
+# The pixel data starts at a page boundary, so it can be memory mapped and used as numpy views directly.
+RAW_MAGIC = b'CASRAW\x00\x01'
+RAW_VERSION = 1
+PAGE_SIZE = 4096
+CHANNELS = {'yuv': 1, 'rgb': 3, 'bgr': 3, 'rgba': 4, 'bgra': 4}
+
+RawImage = namedtuple('RawImage', ['header', 'data'])
+
+
+def raw_header(resolution, fmt, metadata=None):
+    if fmt not in RAW_FORMATS:
+        raise ValueError(f'Unsupported format: {fmt}')
+    width, height = resolution
+    padded_width, padded_height = raw_shape(width, height)
+    header = {'version': RAW_VERSION,
+              'format': fmt,
+              'width': width,
+              'height': height,
+              'padded_width': padded_width,
+              'padded_height': padded_height,
+              'stride': padded_width * CHANNELS[fmt],
+              'metadata': metadata or {}}
+    if fmt == 'yuv':
+        # I420: Y plane, then the quarter resolution U and V planes with half the stride
+        y_size = padded_width * padded_height
+        header['planes'] = {'y': 0, 'u': y_size, 'v': y_size + y_size // 4}
+        header['size'] = y_size * 3 // 2
+    else:
+        header['size'] = header['stride'] * padded_height
+    return header
+
+
+def pack_raw(payload, resolution, fmt, metadata=None):
+    header = raw_header(resolution, fmt, metadata)
+    if len(payload) != header['size']:
+        raise ValueError(f'Raw {fmt} data of {len(payload)} bytes does not match {resolution}')
+    encoded = json.dumps(header).encode()
+    prefix = RAW_MAGIC + struct.pack('<I', len(encoded)) + encoded
+    return b''.join((prefix, bytes(-len(prefix) % PAGE_SIZE), payload))
+
+
+def read_raw_header(path):
+    # (header, offset of the pixel data)
+    with open(path, 'rb') as raw_file:
+        start = raw_file.read(len(RAW_MAGIC) + 4)
+        if len(start) < len(RAW_MAGIC) + 4 or start[:len(RAW_MAGIC)] != RAW_MAGIC:
+            raise OSError(f'Not a raw capture: {path}')
+        length, = struct.unpack('<I', start[len(RAW_MAGIC):])
+        header = json.loads(raw_file.read(length))
+    if header['version'] > RAW_VERSION:
+        raise OSError(f'Raw capture version {header["version"]} is not supported: {path}')
+    prefix = len(RAW_MAGIC) + 4 + length
+    return header, prefix + -prefix % PAGE_SIZE
+
+
+def is_raw_file(path):
+    return Path(path).suffix[1:].lower() in RAW_FORMATS
+
+
+def open_raw(path):
+    # the data is mapped, not read, pages are only loaded from disk when they are accessed
+    header, offset = read_raw_header(path)
+    data = np.memmap(path, np.uint8, 'r', offset, (header['size'],))
+    return RawImage(header, data)
+
+
+def raw_pixels(raw):
+    # view of the visible pixels: (height, width, channels) for RGB formats, the Y plane for yuv
+    header = raw.header
+    height, width = header['height'], header['width']
+    if header['format'] == 'yuv':
+        plane = raw.data[:header['padded_width'] * header['padded_height']]
+        return plane.reshape(header['padded_height'], header['padded_width'])[:height, :width]
+    channels = CHANNELS[header['format']]
+    pixels = raw.data.reshape(header['padded_height'], header['padded_width'], channels)
+    return pixels[:height, :width]
+
+
+def raw_luminance(raw):
+    # yuv already is luminance plus chroma, the Y plane needs no conversion at all
+    pixels = raw_pixels(raw)
+    if raw.header['format'] == 'yuv':
+        return pixels
+    if raw.header['format'].startswith('bgr'):
+        pixels = pixels[..., 2::-1]
+    weights = np.array([0.299, 0.587, 0.114], np.float32)
+    return (pixels[..., :3] @ weights).astype(np.uint8)
+
+
+def raw_to_rgb(raw):
+    # (height, width, 3) RGB for display, a view where the layout allows it
+    header = raw.header
+    pixels = raw_pixels(raw)
+    if header['format'] == 'rgb':
+        return pixels
+    if header['format'] in ('bgr', 'bgra'):
+        return pixels[..., 2::-1]
+    if header['format'] == 'rgba':
+        return pixels[..., :3]
+    height, width = header['height'], header['width']
+    padded_width, padded_height = header['padded_width'], header['padded_height']
+    chroma_shape = (padded_height // 2, padded_width // 2)
+    planes = header['planes']
+    u = raw.data[planes['u']:planes['v']].reshape(chroma_shape)
+    v = raw.data[planes['v']:].reshape(chroma_shape)
+    # nearest neighbour upsampling of the chroma planes
+    u = u.repeat(2, axis=0).repeat(2, axis=1)[:height, :width].astype(np.float32) - 128
+    v = v.repeat(2, axis=0).repeat(2, axis=1)[:height, :width].astype(np.float32) - 128
+    y = pixels.astype(np.float32)
+    rgb = np.stack((y + 1.402 * v, y - 0.344 * u - 0.714 * v, y + 1.772 * u), axis=2)
+    return np.clip(rgb, 0, 255).astype(np.uint8)
@@ -0,0 +1,282 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from camera.encoding import RAW_FORMATS
+from camera.raw_file import PAGE_SIZE, RawImage, raw_header
+
+# Burst sequences in one appendable file instead of one file per frame, which is slow on the FAT formatted USB
+# sticks (every file is a directory entry, a cluster allocation and a chown):
+#   8 byte magic, little endian uint32 header length, JSON header (format, resolution, burst metadata)
+#   per frame: chunk header (b'FRAM', uint32 JSON length, uint64 data length), JSON (index, timestamp, camera
+#              settings, crc32 of the data), zero padding, data. The data starts at a page boundary, raw frames
+#              are memory mapped like raw captures.
+#   on close:  chunk header (b'INDX', uint32 JSON length, 0), JSON list of the frames, trailer (magic, uint64
+#              offset of the index chunk)
+# A container that was never closed (the program or the power died mid-burst) has no index, its chunks are
+# walked instead and a last frame that was not completely written is left out.
+SEQUENCE_MAGIC = b'CASSEQ\x00\x01'
+TRAILER_MAGIC = b'CASIDX\x00\x01'
+SEQUENCE_VERSION = 1
+SEQUENCE_FORMAT = 'seq'
+FRAME_TAG, INDEX_TAG = b'FRAM', b'INDX'
+CHUNK = struct.Struct('<4sIQ')
+TRAILER = struct.Struct('<8sQ')
+# frames of a container are addressed as <container>#<index>, e.g. in the gallery and the result cache
+FRAME_SEPARATOR = '#'
+
+SequenceFrame = namedtuple('SequenceFrame', ['offset', 'data_offset', 'size', 'timestamp'])
+
+
+def is_sequence_file(path):
+    return f'{path}'.lower().endswith(f'.{SEQUENCE_FORMAT}')
+
+
+def frame_path(path, index):
+    return Path(f'{path}{FRAME_SEPARATOR}{index}')
+
+
+def sequence_frame(path):
+    # (container, frame index) of a frame path, a container on its own stands for its first frame. None for
+    # everything else.
+    container, separator, index = f'{path}'.rpartition(FRAME_SEPARATOR)
+    if separator and is_sequence_file(container) and index.isdigit():
+        return Path(container), int(index)
+    if is_sequence_file(path):
+        return Path(path), 0
+    return None
+
+
+class SequenceReader:
+    # Random access to the frames, only the index (or the chunk headers) is read up front. Reads are positional,
+    # one reader can be shared by several threads.
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._map = None
+        size = os.fstat(self._file.fileno()).st_size
+        start = self._read(len(SEQUENCE_MAGIC) + 4, 0)
+        if len(start) < len(SEQUENCE_MAGIC) + 4 or start[:len(SEQUENCE_MAGIC)] != SEQUENCE_MAGIC:
+            raise OSError(f'Not a sequence file: {path}')
+        length, = struct.unpack('<I', start[len(SEQUENCE_MAGIC):])
+        try:
+            self.header = json.loads(self._read(length, len(start)))
+        except ValueError:
+            raise OSError(f'Damaged sequence header: {path}')
+        if self.header['version'] > SEQUENCE_VERSION:
+            raise OSError(f'Sequence version {self.header["version"]} is not supported: {path}')
+        self.format = self.header['format']
+        self.resolution = tuple(self.header['resolution'])
+        self.metadata = self.header['metadata']
+        self.complete = True
+        index = self._read_index(size)
+        if index is None:
+            self.complete = False
+            index = self._walk(len(start) + length, size)
+        self.frames, self.end = index
+
+    def _read(self, size, offset):
+        return os.pread(self._file.fileno(), size, offset)
+
+    def _chunk(self, offset, file_size):
+        # (tag, JSON, data offset, data length) of the chunk at offset, None where it was not completely written
+        head = self._read(CHUNK.size, offset)
+        if len(head) < CHUNK.size:
+            return None
+        tag, length, data_length = CHUNK.unpack(head)
+        if tag not in (FRAME_TAG, INDEX_TAG) or offset + CHUNK.size + length > file_size:
+            return None
+        try:
+            info = json.loads(self._read(length, offset + CHUNK.size))
+        except ValueError:
+            return None
+        data_offset = offset + CHUNK.size + length
+        if tag == FRAME_TAG:
+            data_offset += -data_offset % PAGE_SIZE
+        if data_offset + data_length > file_size:
+            return None
+        return tag, info, data_offset, data_length
+
+    def _read_index(self, size):
+        if size < TRAILER.size:
+            return None
+        magic, offset = TRAILER.unpack(self._read(TRAILER.size, size - TRAILER.size))
+        chunk = self._chunk(offset, size) if magic == TRAILER_MAGIC and offset < size else None
+        if chunk is None or chunk[0] != INDEX_TAG:
+            return None
+        frames = [SequenceFrame(offset, data_offset, length, datetime.fromisoformat(timestamp))
+                  for offset, data_offset, length, timestamp in chunk[1]]
+        # appending continues where the index starts
+        return frames, offset
+
+    def _walk(self, offset, size):
+        frames = []
+        while True:
+            chunk = self._chunk(offset, size)
+            if chunk is None or chunk[0] != FRAME_TAG:
+                break
+            _, info, data_offset, length = chunk
+            frames.append((SequenceFrame(offset, data_offset, length, datetime.fromisoformat(info['timestamp'])),
+                           info['crc32']))
+            offset = data_offset + length
+        # the data of the last frame may be allocated but not written, e.g. after a power cut on FAT
+        if frames and zlib.crc32(self._read(frames[-1][0].size, frames[-1][0].data_offset)) != frames[-1][1]:
+            frames.pop()
+        end = frames[-1][0].data_offset + frames[-1][0].size if frames else offset
+        return [frame for frame, _ in frames], end
+
+    def _frame(self, index):
+        if not 0 <= index < len(self.frames):
+            raise OSError(f'{self.path} has no frame {index}')
+        return self.frames[index]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def read(self, index):
+        # encoded picture or raw payload of a frame
+        frame = self._frame(index)
+        return self._read(frame.size, frame.data_offset)
+
+    def frame_metadata(self, index):
+        frame = self._frame(index)
+        head = self._read(CHUNK.size, frame.offset)
+        return json.loads(self._read(CHUNK.unpack(head)[1], frame.offset + CHUNK.size))
+
+    def raw(self, index):
+        # memory mapped frame of a raw sequence, pages are only loaded from disk when they are accessed
+        if self.format not in RAW_FORMATS:
+            raise ValueError(f'{self.format} frames are not raw')
+        frame = self._frame(index)
+        if self._map is None or len(self._map) < frame.data_offset + frame.size:
+            self._map = np.memmap(self.path, np.uint8, 'r')
+        return RawImage(raw_header(self.resolution, self.format),
+                        self._map[frame.data_offset:frame.data_offset + frame.size])
+
+    def close(self):
+        self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SequenceWriter:
+    # Appends frames to a new container or to an existing one, e.g. one that was interrupted. Every frame is
+    # handed to the OS as soon as append() returns, so a crash of the program loses nothing; the file is synced
+    # to the disk at most every SYNC_INTERVAL seconds, which bounds what a power cut can take.
+    SYNC_INTERVAL = 1.0
+
+    def __init__(self, path, pic_format, resolution, metadata=None):
+        self.path = Path(path)
+        self.format = pic_format
+        self.resolution = tuple(resolution)
+        self.raw_size = raw_header(self.resolution, pic_format)['size'] if pic_format in RAW_FORMATS else None
+        if self.path.exists() and self.path.stat().st_size:
+            with SequenceReader(self.path) as reader:
+                if (reader.format, reader.resolution) != (pic_format, self.resolution):
+                    raise ValueError(f'{self.path} holds {reader.format} frames of {reader.resolution}')
+                self.frames, end = reader.frames, reader.end
+            self._file = open(self.path, 'r+b')
+            # drops the index and anything after the last complete frame
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self.frames = []
+            self._file = open(self.path, 'wb')
+            header = json.dumps({'version': SEQUENCE_VERSION,
+                                 'format': pic_format,
+                                 'resolution': self.resolution,
+                                 'created': datetime.now().isoformat(),
+                                 'metadata': metadata or {}}).encode()
+            self._file.write(SEQUENCE_MAGIC + struct.pack('<I', len(header)) + header)
+            self._file.flush()
+        self._synced = time.monotonic()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def append(self, data, timestamp, metadata=None):
+        if self.raw_size is not None and len(data) != self.raw_size:
+            raise ValueError(f'Raw {self.format} data of {len(data)} bytes does not match {self.resolution}')
+        index = len(self.frames)
+        info = json.dumps({**(metadata or {}), 'index': index, 'timestamp': timestamp.isoformat(),
+                           'crc32': zlib.crc32(data)}).encode()
+        offset = self._file.tell()
+        prefix = CHUNK.pack(FRAME_TAG, len(info), len(data)) + info
+        padding = -(offset + len(prefix)) % PAGE_SIZE
+        self._file.write(prefix + bytes(padding))
+        self._file.write(data)
+        self._file.flush()
+        self.frames.append(SequenceFrame(offset, offset + len(prefix) + padding, len(data), timestamp))
+        if time.monotonic() - self._synced >= self.SYNC_INTERVAL:
+            os.fsync(self._file.fileno())
+            self._synced = time.monotonic()
+        return index
+
+    def close(self):
+        if self._file.closed:
+            return
+        offset = self._file.tell()
+        index = json.dumps([(frame.offset, frame.data_offset, frame.size, frame.timestamp.isoformat())
+                            for frame in self.frames]).encode()
+        self._file.write(CHUNK.pack(INDEX_TAG, len(index), 0) + index + TRAILER.pack(TRAILER_MAGIC, offset))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_readers = OrderedDict()
+_readers_lock = threading.Lock()
+OPEN_READERS = 8
+
+
+def open_sequence(path):
+    # shared readers of the recently used containers, reopened when a container changed (e.g. a burst that is
+    # still being written). Readers that fall out are closed once nobody uses them anymore.
+    path = Path(path)
+    try:
+        stat = os.stat(path)
+    except OSError as error:
+        raise OSError(f'Unable to read sequence: {path} ({error.strerror})')
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _readers_lock:
+        entry = _readers.get(f'{path}')
+        if entry is not None and entry[0] == key:
+            _readers.move_to_end(f'{path}')
+            return entry[1]
+    reader = SequenceReader(path)
+    with _readers_lock:
+        _readers[f'{path}'] = (key, reader)
+        _readers.move_to_end(f'{path}')
+        while len(_readers) > OPEN_READERS:
+            _readers.popitem(last=False)
+    return reader
+
+
+def frame_timestamp(path):
+    # capture time of a frame path, None for other paths and frames that can not be read
+    frame = sequence_frame(path)
+    if frame is None:
+        return None
+    try:
+        return open_sequence(frame[0]).frames[frame[1]].timestamp
+    except (OSError, IndexError):
+        return None
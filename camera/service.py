@@ -0,0 +1,293 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from camera.burst import BurstCapture, FrameWriter, SequenceFrameWriter
+from camera.encoding import ENCODED_FORMATS, PICTURE_FORMATS, RAW_FORMATS
+from camera.pipeline import CapturePipeline, capture_raw
+from camera.settings import CAMERA_SETTINGS, ISO_VALUES, CameraSettings
+from camera.settle import SettleDetector
+from camera.stacking import STACK_MODES, StackCapture
+from monitoring.metrics import METRICS
+from storage.catalogue import CaptureCatalogue
+from storage.naming import TIMESTAMP_FORMAT, capture_path, capture_timestamp
+from storage.ownership import chown_pi
+from storage.profiles import DEFAULT_PROFILE, DEFAULT_SETTINGS, ProfileStore
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_SETTINGS = ('directory', 'name', 'format', 'quality')
+
+
+class ServiceError(Exception):
+    pass
+
+
+class CaptureService:
+    # Owns the camera for as long as the process runs, so a capture is only the exposure: no camera start,
+    # no GUI and only as much settle time as AGC/AWB actually need. Commands come from the control servers (one
+    # thread per connection), captures take turns on the capture lock and settings changes on the lock of
+    # CameraSettings like in the GUI. Captures go through the same pipeline and catalogue as the ones taken in
+    # the GUI. The service runs as root: clients only choose a directory below the pictures directory and a
+    # file name, never a path.
+    COMMANDS = ('status', 'metrics', 'set_settings', 'load_profile', 'capture', 'burst', 'stack', 'start_preview',
+                'move_preview', 'stop_preview')
+
+    def __init__(self, cam, base_directory, use_video_port=True, pictures_directory=None):
+        self.cam = cam
+        # the video port runs all the time, the still port first has to switch the sensor mode
+        self.use_video_port = use_video_port
+        self.camera_settings = CameraSettings(cam)
+        base_directory = Path(base_directory)
+        pictures = Path(pictures_directory or Path(base_directory, 'pictures'))
+        pictures.mkdir(parents=True, exist_ok=True)
+        # every picture is written below it, symlinks included
+        self.pictures = pictures.resolve()
+        self.profile_store = ProfileStore(Path(base_directory, 'profiles'),
+                                          {**DEFAULT_SETTINGS, 'directory': f'{pictures}'})
+        self.catalogue = CaptureCatalogue(Path(base_directory, 'catalogue.sqlite'))
+        chown_pi(self.catalogue.path)
+        self.pipeline = CapturePipeline(on_done=self.capture_saved)
+        self.session = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.settings = {'directory': pictures,
+                         'name': DEFAULT_SETTINGS['filename'],
+                         'format': PICTURE_FORMATS[DEFAULT_SETTINGS['pic_format']],
+                         'quality': DEFAULT_SETTINGS['quality'],
+                         'profile': DEFAULT_PROFILE}
+        self.started = time.time()
+        self.captures = 0
+        self.last_capture = None
+        self.timestamp = None
+        self._lock = threading.Lock()
+        # settle detection and captures use their own splitter ports, one capture at a time
+        self._capture_lock = threading.Lock()
+
+    def handle(self, command, arguments):
+        if command not in self.COMMANDS:
+            raise ServiceError(f'Unknown command: {command}')
+        try:
+            return getattr(self, command)(**arguments)
+        except TypeError as error:
+            raise ServiceError(f'{command}: {error}')
+
+    def status(self):
+        with self._lock:
+            last_capture = self.last_capture
+        return {'camera': dict(self.camera_settings.applied),
+                'resolution': list(self.cam.resolution),
+                'settings': {**self.settings, 'directory': f'{self.settings["directory"]}'},
+                'session': self.session,
+                'uptime': time.time() - self.started,
+                'captures': self.captures,
+                'last_capture': last_capture,
+                'pipeline': {'pending': self.pipeline.pending,
+                             'completed': self.pipeline.completed,
+                             'failed': self.pipeline.failed}}
+
+    def metrics(self):
+        return {'started': METRICS.started, 'stages': METRICS.snapshot()}
+
+    def set_settings(self, **settings):
+        unknown = set(settings) - set(CAMERA_SETTINGS) - set(CAPTURE_SETTINGS)
+        if unknown:
+            raise ServiceError(f'Unknown settings: {", ".join(sorted(unknown))}')
+        if settings.get('format', self.settings['format']) not in PICTURE_FORMATS:
+            raise ServiceError(f'Unsupported format: {settings["format"]}')
+        settings = self.checked_settings(settings)
+        changes = self.camera_settings.apply(settings)
+        self.settings.update((name, settings[name]) for name in CAPTURE_SETTINGS if name in settings)
+        return {'changed': changes}
+
+    def load_profile(self, name):
+        if name not in self.profile_store:
+            raise ServiceError(f'Unknown profile: {name}')
+        profile = self.profile_store.get(name)
+        settings = {setting: profile[setting] for setting in CAMERA_SETTINGS[:4]}
+        settings['iso'] = ISO_VALUES[profile['iso']]
+        settings['name'] = profile['filename']
+        settings['format'] = PICTURE_FORMATS[profile['pic_format']]
+        settings['quality'] = profile['quality']
+        # like the GUI, an unavailable directory keeps the current one
+        if self.profile_store.directory_available(name):
+            settings['directory'] = profile['directory']
+        result = self.set_settings(**settings)
+        self.settings['profile'] = name
+        return {**result, 'directory': f'{self.settings["directory"]}'}
+
+    def picture_directory(self, directory):
+        # a directory below the pictures directory, relative ones are taken from there
+        resolved = Path(self.pictures, directory).resolve()
+        if resolved != self.pictures and self.pictures not in resolved.parents:
+            raise ServiceError(f'Directory is outside of {self.pictures}: {directory}')
+        if not resolved.is_dir():
+            raise ServiceError(f'Directory not found: {directory}')
+        return resolved
+
+    def checked_settings(self, settings):
+        # capture settings from a client with the directory resolved and the name checked
+        settings = dict(settings)
+        if 'directory' in settings:
+            settings['directory'] = self.picture_directory(settings['directory'])
+        if 'name' in settings:
+            name = f'{settings["name"]}'
+            if not name or name in ('.', '..') or Path(name).name != name or '\\' in name:
+                raise ServiceError(f'Invalid file name: {name}')
+            settings['name'] = name
+        return settings
+
+    def capture_settings(self, settings):
+        # current settings with the ones that only apply to this capture
+        unknown = set(settings) - set(CAPTURE_SETTINGS)
+        if unknown:
+            raise ServiceError(f'Unknown capture settings: {", ".join(sorted(unknown))}')
+        settings = {**self.settings, **self.checked_settings(settings)}
+        if settings['format'] not in PICTURE_FORMATS:
+            raise ServiceError(f'Unsupported format: {settings["format"]}')
+        return settings
+
+    def capture(self, settle=0.0, wait=False, profile=None, session=None, **settings):
+        # capture with the current settings, settings given here only apply to this capture. The response
+        # comes after the exposure, or after the file is written with wait.
+        received = time.perf_counter()
+        settings = self.capture_settings(settings)
+        with self._capture_lock:
+            # settle is the upper bound, the capture goes ahead as soon as AGC/AWB have converged
+            settled = SettleDetector(self.cam, timeout=settle).wait()
+            if settle:
+                METRICS.record('capture.settle', settled.seconds)
+            with self._lock:
+                timestamp = self.timestamp = capture_timestamp(datetime.now(), self.timestamp)
+            path = capture_path(settings['directory'], settings['name'], timestamp, settings['format'])
+            metadata = {'timestamp': timestamp,
+                        'profile': profile or settings['profile'],
+                        'session': session or self.session,
+                        'settings': {'quality': settings['quality']}}
+            start = time.perf_counter()
+            with self.camera_settings.lock:
+                if settings['format'] in ENCODED_FORMATS or settings['format'] in RAW_FORMATS:
+                    frame = capture_raw(self.cam, use_video_port=self.use_video_port)
+                else:
+                    frame = None
+                    self.cam.capture(f'{path}', format=settings['format'])
+                metadata['camera'] = dict(self.camera_settings.applied)
+            captured = time.perf_counter()
+        metadata['timings'] = {'settle': start - received, 'capture': captured - start}
+        if frame is not None:
+            future = self.pipeline.submit(path, frame=frame, pic_format=settings['format'],
+                                          quality=settings['quality'], metadata=metadata)
+        else:
+            chown_pi(path)
+            self.capture_saved({'path': path, 'metadata': metadata})
+            future = None
+        with self._lock:
+            self.captures += 1
+            self.last_capture = f'{path}'
+        METRICS.record('capture.exposure', captured - start)
+        METRICS.record('service.latency', captured - received)
+        response = {'path': f'{path}',
+                    'timestamp': timestamp,
+                    'latency': captured - received,
+                    'settle': settled.seconds,
+                    'settled': settled.settled,
+                    'settle_frames': settled.frames,
+                    'capture': captured - start}
+        if wait and future is not None:
+            timings = future.result()
+            response.update(encode=timings['encode'], write=timings['write'], total=time.perf_counter() - received)
+        return response
+
+    def burst(self, frames=10, interval=0.0, sequence=False, profile=None, session=None, **settings):
+        # sequence=True writes all frames into one sequence container instead of one file per frame
+        settings = self.capture_settings(settings)
+        frame_queue = queue.Queue(BurstCapture.QUEUE_SIZE)
+        with self._capture_lock, self.camera_settings.lock:
+            metadata = {'profile': profile or settings['profile'],
+                        'session': session or self.session,
+                        'camera': dict(self.camera_settings.applied),
+                        'settings': {'quality': settings['quality']}}
+            if sequence:
+                writer = SequenceFrameWriter(frame_queue, settings['directory'], settings['name'],
+                                             settings['format'], tuple(self.cam.resolution), metadata,
+                                             settings=lambda: dict(self.camera_settings.applied))
+            else:
+                writer = FrameWriter(frame_queue, settings['directory'], settings['name'], self.pipeline,
+                                     resolution=tuple(self.cam.resolution), metadata=metadata)
+            writer.start()
+            burst = BurstCapture(self.cam, frame_queue, frames=frames, interval=interval,
+                                 pic_format=settings['format'], quality=settings['quality'])
+            stats = burst.run()
+            writer.finish()
+        writer.join()
+        with self._lock:
+            self.captures += len(writer.written)
+            if writer.written:
+                self.last_capture = f'{writer.written[-1]}'
+        if not sequence:
+            return {**stats, 'paths': [f'{path}' for path in writer.written]}
+        if writer.error is not None:
+            raise ServiceError(f'Writing {writer.path.name} failed: {writer.error}')
+        if writer.written:
+            self.capture_saved({'path': writer.path, 'metadata': metadata})
+        return {**stats, 'path': f'{writer.path}', 'frames': len(writer.written)}
+
+    def stack(self, frames=10, mode='mean', wait=False, profile=None, session=None, **settings):
+        # frames from the video port combined into one low noise picture
+        settings = self.capture_settings(settings)
+        if mode not in STACK_MODES:
+            raise ServiceError(f'Unknown stacking mode: {mode}')
+        if settings['format'] not in ENCODED_FORMATS and settings['format'] not in RAW_FORMATS:
+            raise ServiceError(f'Stacked pictures cannot be saved as {settings["format"]}')
+        with self._lock:
+            timestamp = self.timestamp = capture_timestamp(datetime.now(), self.timestamp)
+        path = capture_path(settings['directory'], settings['name'], timestamp, settings['format'])
+        with self._capture_lock, self.camera_settings.lock:
+            stack = StackCapture(self.cam, frames=frames, mode=mode)
+            frame = stack.run()
+            camera = dict(self.camera_settings.applied)
+        METRICS.record('capture.stack', stack.combine_time)
+        metadata = {'timestamp': timestamp,
+                    'profile': profile or settings['profile'],
+                    'session': session or self.session,
+                    'camera': camera,
+                    'settings': {'quality': settings['quality']},
+                    'stack': {'mode': mode, 'frames': stack.captured},
+                    'timings': {'capture': stack.elapsed}}
+        future = self.pipeline.submit(path, frame=frame, pic_format=settings['format'], quality=settings['quality'],
+                                      metadata=metadata)
+        with self._lock:
+            self.captures += 1
+            self.last_capture = f'{path}'
+        response = {**stack.stats(), 'path': f'{path}'}
+        if wait:
+            timings = future.result()
+            response.update(encode=timings['encode'], write=timings['write'])
+        return response
+
+    def start_preview(self, window=None, fullscreen=False):
+        self.cam.start_preview(fullscreen=fullscreen, window=tuple(window) if window else None)
+        return {}
+
+    def move_preview(self, window):
+        if self.cam.preview:
+            self.cam.preview.window = tuple(window)
+        return {}
+
+    def stop_preview(self):
+        self.cam.stop_preview()
+        return {}
+
+    def capture_saved(self, timings):
+        # called on a pipeline thread
+        try:
+            self.catalogue.record_capture(timings['path'], timings['metadata'], timings)
+        except sqlite3.Error as error:
+            logger.warning('Could not catalogue %s: %s', timings['path'].name, error)
+
+    def close(self):
+        self.pipeline.close(wait=True)
+        self.catalogue.close()
+        self.cam.close()
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from monitoring.metrics import METRICS
+
+CAMERA_SETTINGS = ('brightness', 'sharpness', 'contrast', 'saturation', 'iso')
+# profiles store the position in this list, 0 is automatic
+ISO_VALUES = (0, 100, 200, 320, 400, 500, 640, 800)
+
+
+class CameraSettings:
+    # Remembers what was written to the camera, values that did not change are never written again. Every
+    # property write is a firmware call, a batch is written under the lock so that a capture holding the
+    # lock never sees half of a profile.
+    def __init__(self, cam):
+        self.cam = cam
+        self.lock = threading.Lock()
+        self.applied = {name: getattr(cam, name) for name in CAMERA_SETTINGS}
+        self.writes = 0
+
+    def changes(self, settings):
+        return {name: value for name, value in settings.items()
+                if name in CAMERA_SETTINGS and self.applied[name] != value}
+
+    def apply(self, settings, blocking=True):
+        # the settings that were actually written, None when blocking is off and a capture holds the lock
+        changes = self.changes(settings)
+        if not changes:
+            return changes
+        if not self.lock.acquire(blocking):
+            return None
+        start = time.perf_counter()
+        try:
+            for name, value in changes.items():
+                setattr(self.cam, name, value)
+                self.applied[name] = value
+        finally:
+            self.lock.release()
+        METRICS.record('camera.settings', time.perf_counter() - start)
+        self.writes += len(changes)
+        return changes
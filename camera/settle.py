@@ -0,0 +1,81 @@
+import io
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from camera.encoding import raw_shape
+from camera.frames import luminance
+
+SettleResult = namedtuple('SettleResult', ['seconds', 'settled', 'frames', 'statistics'])
+
+# read from the camera next to every frame, picamera returns Fractions (None where a backend has no AGC/AWB)
+GAIN_ATTRIBUTES = ('analog_gain', 'digital_gain', 'exposure_speed')
+
+
+def frame_statistics(cam, data, resolution):
+    padded = raw_shape(*resolution)
+    frame = np.frombuffer(data, np.uint8)
+    statistics = {'luminance': float(luminance(frame, resolution, padded).mean())}
+    for name in GAIN_ATTRIBUTES:
+        value = getattr(cam, name, None)
+        if value is not None:
+            statistics[name] = float(value)
+    awb_gains = getattr(cam, 'awb_gains', None)
+    if awb_gains is not None:
+        statistics['awb_red'], statistics['awb_blue'] = (float(gain) for gain in awb_gains)
+    return statistics
+
+
+class SettleDetector:
+    # Waits until AGC and AWB have converged instead of sleeping for a fixed time. Small frames are streamed from
+    # the video port and the capture goes ahead as soon as mean luminance and gains have stayed within the
+    # tolerances for STABLE_FRAMES frames in a row; the timeout is the upper bound (the old fixed settle time).
+    RESOLUTION = (160, 120)
+    STABLE_FRAMES = 4
+    LUMINANCE_TOLERANCE = 1.5  # grey levels
+    GAIN_TOLERANCE = 0.02  # relative
+    SPLITTER_PORT = 2
+
+    def __init__(self, cam, timeout=5.0, stable_frames=STABLE_FRAMES, luminance_tolerance=LUMINANCE_TOLERANCE,
+                 gain_tolerance=GAIN_TOLERANCE):
+        self.cam = cam
+        self.timeout = timeout
+        self.stable_frames = stable_frames
+        self.luminance_tolerance = luminance_tolerance
+        self.gain_tolerance = gain_tolerance
+
+    def stable(self, window):
+        for name in window[-1]:
+            values = [statistics.get(name) for statistics in window]
+            if None in values:
+                return False
+            spread = max(values) - min(values)
+            if name == 'luminance':
+                if spread > self.luminance_tolerance:
+                    return False
+            elif spread > self.gain_tolerance * max(abs(value) for value in values):
+                return False
+        return True
+
+    def wait(self):
+        start = time.perf_counter()
+        if self.timeout <= 0:
+            return SettleResult(0.0, False, 0, None)
+        window = deque(maxlen=self.stable_frames)
+        stream = io.BytesIO()
+        frames = self.cam.capture_continuous(stream, format='yuv', use_video_port=True, resize=self.RESOLUTION,
+                                             splitter_port=self.SPLITTER_PORT)
+        try:
+            for count, _ in enumerate(frames, 1):
+                statistics = frame_statistics(self.cam, stream.getvalue(), self.RESOLUTION)
+                stream.seek(0)
+                stream.truncate()
+                window.append(statistics)
+                elapsed = time.perf_counter() - start
+                if len(window) == window.maxlen and self.stable(window):
+                    return SettleResult(elapsed, True, count, statistics)
+                if elapsed >= self.timeout:
+                    return SettleResult(elapsed, False, count, statistics)
+        finally:
+            frames.close()
@@ -0,0 +1,138 @@
+import math
+import time
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+from PyQt5 import QtCore, QtGui
+
+from camera.backend import CameraBackend, output_format
+from camera.encoding import encode_frame, qimage_to_array, resize_array, write_output
+
+SOURCE_DIRECTORY = Path(__file__).resolve().parent.parent / 'pictures'
+SOURCE_PATTERNS = ('*.jpeg', '*.jpg', '*.png', '*.bmp')
+# settings that make the AGC/AWB of the sensor adapt again
+ADJUSTING_SETTINGS = ('brightness', 'contrast', 'saturation', 'iso')
+
+
+class SimulatedPreview:
+    def __init__(self, window):
+        self.window = window
+        self.fullscreen = False
+
+
+class SimulatedOverlay(SimulatedPreview):
+    def __init__(self, source, size, window=None, layer=0):
+        super().__init__(window)
+        self.size = size
+        self.layer = layer
+        self.updates = 0
+        self.update(source)
+
+    def update(self, source):
+        # the renderer copies the buffer, the caller may reuse it right away
+        self.buffer = bytes(memoryview(source).cast('B'))
+        self.updates += 1
+
+
+class SimulatedCamera(CameraBackend):
+    # Replays the pictures of a directory as if they came from a free running sensor. Every capture waits for
+    # the next sensor frame (1 / framerate), still port captures additionally take a fixed latency (mode switch,
+    # exposure), so capture timings behave like on the Pi. The gains approach their target exponentially after
+    # the camera is opened and after every settings change, like AGC/AWB converging. noise adds sensor noise
+    # (standard deviation in grey levels) to every frame.
+    MAX_FRAMES = 32
+
+    def __init__(self, source_directory=SOURCE_DIRECTORY, framerate=30, latency=0.0, resolution=None,
+                 agc_time_constant=0.3, noise=0.0):
+        self.agc_time_constant = agc_time_constant
+        self.noise = noise
+        self._rng = np.random.default_rng()
+        self._adjusted = time.perf_counter()
+        super().__init__()
+        if resolution is not None:
+            self.resolution = tuple(resolution)
+        self.framerate = framerate
+        self.latency = latency
+        self.source_directory = Path(source_directory)
+        self.frame_count = 0
+        self._paths = sorted(path for pattern in SOURCE_PATTERNS for path in self.source_directory.glob(pattern))
+        self._paths = self._paths[:self.MAX_FRAMES]
+        self._frames = {}
+        self._start_time = time.perf_counter()
+        self.overlays = []
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ADJUSTING_SETTINGS:
+            super().__setattr__('_adjusted', time.perf_counter())
+
+    def _converging(self, target):
+        # starts 50 % off the target
+        if not self.agc_time_constant:
+            return Fraction(target).limit_denominator(256)
+        elapsed = time.perf_counter() - self._adjusted
+        return Fraction(target * (1 + 0.5 * math.exp(-elapsed / self.agc_time_constant))).limit_denominator(256)
+
+    @property
+    def analog_gain(self):
+        return self._converging(1 + self.iso / 200 if self.iso else 2.0)
+
+    @property
+    def digital_gain(self):
+        return self._converging(1.0)
+
+    @property
+    def awb_gains(self):
+        return self._converging(1.5), self._converging(1.3)
+
+    def _load_frame(self, index):
+        size = tuple(self.resolution)
+        key = (index, size)
+        if key not in self._frames:
+            if self._paths:
+                image = QtGui.QImage(f'{self._paths[index]}')
+            else:
+                # no pictures to replay, fall back to a flat grey frame
+                image = QtGui.QImage(size[0], size[1], QtGui.QImage.Format_RGB888)
+                image.fill(QtGui.QColor(128, 128, 128))
+            image = image.scaled(size[0], size[1], QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)
+            self._frames[key] = qimage_to_array(image)
+        return self._frames[key]
+
+    def _wait_for_frame(self, use_video_port=False):
+        period = 1 / self.framerate
+        elapsed = time.perf_counter() - self._start_time
+        sensor_frame = int(elapsed / period) + 1
+        time.sleep(sensor_frame * period - elapsed + (0 if use_video_port else self.latency))
+        self.frame_count += 1
+        return self._load_frame(sensor_frame % len(self._paths) if self._paths else 0)
+
+    def capture(self, output, format=None, use_video_port=False, resize=None, **options):
+        fmt = output_format(output, format)
+        frame = self._wait_for_frame(use_video_port)
+        if resize is not None:
+            frame = resize_array(frame, resize)
+        if self.noise:
+            noise = self._rng.standard_normal(frame.shape, np.float32)
+            noise *= self.noise
+            noise += frame
+            frame = np.clip(noise, 0, 255, out=noise).astype(np.uint8)
+        data = encode_frame(frame, fmt, options.get('quality', 85))
+        write_output(output, data)
+
+    def start_preview(self, fullscreen=True, window=None, **options):
+        self.preview = SimulatedPreview(window)
+        self.preview.fullscreen = fullscreen
+        return self.preview
+
+    def stop_preview(self):
+        self.preview = None
+
+    def add_overlay(self, source, size=None, format=None, layer=0, window=None, **options):
+        overlay = SimulatedOverlay(source, size, window, layer)
+        self.overlays.append(overlay)
+        return overlay
+
+    def remove_overlay(self, overlay):
+        self.overlays.remove(overlay)
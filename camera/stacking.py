@@ -0,0 +1,173 @@
+import threading
+import time
+
+import numpy as np
+
+from camera.encoding import raw_shape
+from camera.frames import FrameRing
+
+STACK_MODES = ('mean', 'median', 'sigma')
+# median absolute deviation to standard deviation for normally distributed noise
+MAD_SCALE = 1.4826
+
+
+def sorting_network(n):
+    # comparators (low, high) of Batcher's odd-even merge sort for n inputs: the network of the next power of
+    # two with the comparators into the missing inputs left out (those inputs would be +inf and never move)
+    size = 1
+    while size < n:
+        size *= 2
+    pairs = []
+    p = 1
+    while p < size:
+        k = p
+        while k >= 1:
+            for j in range(k % p, size - k, 2 * k):
+                for i in range(min(k, size - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p):
+                        pairs.append((i + j, i + j + k))
+            k //= 2
+        p *= 2
+    return [(low, high) for low, high in pairs if high < n]
+
+
+def median_network(n):
+    # only the comparators that can still move a value into the middle position(s)
+    needed = {n // 2 - 1, n // 2} if n % 2 == 0 else {n // 2}
+    kept = []
+    for low, high in reversed(sorting_network(n)):
+        if low in needed or high in needed:
+            kept.append((low, high))
+            needed |= {low, high}
+    return kept[::-1]
+
+
+class FrameStack:
+    # Combines frames of the same scene into one low noise frame. The mean is accumulated in place into one
+    # float32 buffer, so its memory does not depend on the number of frames. Median and sigma clipping need all
+    # frames, they are kept in one preallocated uint8 block and combined in strips of CHUNK_ROWS rows that stay
+    # in the CPU cache; the median is a sorting network of np.minimum/np.maximum instead of np.median, which is
+    # about 20 times slower on uint8 frames. Sigma clipping measures the spread with the median absolute
+    # deviation: with the standard deviation a single outlier in 10 frames can never be more than 3 sigma away.
+    CHUNK_ROWS = 16
+    # 200 MB of full HD frames
+    MAX_STORED_FRAMES = 32
+
+    def __init__(self, shape, frames, mode='mean', sigma=3.0):
+        if mode not in STACK_MODES:
+            raise ValueError(f'Unknown stacking mode: {mode}')
+        if mode != 'mean' and frames > self.MAX_STORED_FRAMES:
+            raise ValueError(f'{mode} stacks at most {self.MAX_STORED_FRAMES} frames')
+        self.shape = tuple(shape)
+        self.mode = mode
+        self.sigma = sigma
+        self.count = 0
+        if mode == 'mean':
+            self.sum = np.zeros(self.shape, np.float32)
+        else:
+            self.frames = np.empty((frames, *self.shape), np.uint8)
+
+    def add(self, frame):
+        if self.mode == 'mean':
+            np.add(self.sum, frame, out=self.sum)
+        else:
+            if self.count == len(self.frames):
+                raise ValueError('The stack is full')
+            self.frames[self.count] = frame
+        self.count += 1
+
+    def result(self):
+        if not self.count:
+            raise ValueError('No frames in the stack')
+        if self.mode == 'mean':
+            # the sum is not needed afterwards, round in place
+            np.multiply(self.sum, 1 / self.count, out=self.sum)
+            np.add(self.sum, 0.5, out=self.sum)
+            return self.sum.astype(np.uint8)
+        result = np.empty(self.shape, np.uint8)
+        combine = self._median if self.mode == 'median' else self._sigma_clip
+        for row in range(0, self.shape[0], self.CHUNK_ROWS):
+            rows = slice(row, row + self.CHUNK_ROWS)
+            result[rows] = combine(self.frames[:self.count, rows])
+        return result
+
+    def _median(self, strip):
+        # sorts the strip in place, the frames are not needed afterwards
+        count = len(strip)
+        low = np.empty_like(strip[0])
+        for a, b in median_network(count):
+            np.minimum(strip[a], strip[b], out=low)
+            np.maximum(strip[a], strip[b], out=strip[b])
+            strip[a] = low
+        if count % 2:
+            return strip[count // 2]
+        # rounded mean of the two middle values without overflowing uint8
+        a, b = strip[count // 2 - 1], strip[count // 2]
+        return (a >> 1) + (b >> 1) + ((a | b) & 1)
+
+    def _sigma_clip(self, strip):
+        # mean of the values within sigma (robust) standard deviations of the pixel's median, plus half a grey
+        # level so a noise free pixel keeps all its values. At least half of the values are always kept.
+        median = self._median(strip.copy())
+        deviation = np.maximum(strip, median) - np.minimum(strip, median)
+        limit = self._median(deviation.copy()) * np.float32(self.sigma * MAD_SCALE) + np.float32(0.5)
+        # deviations are integers, comparing against the truncated limit keeps the comparison in uint8
+        kept = deviation <= np.minimum(limit, 255).astype(np.uint8)
+        count = kept.sum(axis=0, dtype=np.uint32)
+        total = (strip * kept).sum(axis=0, dtype=np.uint32)
+        return ((total + count // 2) // count).astype(np.uint8)
+
+
+class StackCapture:
+    # Captures consecutive frames from the video port straight into a FrameStack, the frames are written into
+    # a preallocated ring slot by the camera and never copied into Python objects. Returns the combined frame.
+    def __init__(self, cam, frames=10, mode='mean', sigma=3.0):
+        self.cam = cam
+        self.frames = frames
+        self.width, self.height = cam.resolution
+        self.padded = raw_shape(self.width, self.height)
+        self.stack = FrameStack((self.height, self.width, 3), frames, mode, sigma)
+        self.ring = FrameRing(self.padded[0] * self.padded[1] * 3, slots=2)
+        self.captured = 0
+        self.elapsed = 0.0
+        self.combine_time = 0.0
+        self._halt = threading.Event()
+
+    def stop(self):
+        self._halt.set()
+
+    @property
+    def requested_fps(self):
+        return float(self.cam.framerate)
+
+    @property
+    def achieved_fps(self):
+        return self.captured / self.elapsed if self.elapsed else 0.0
+
+    def stats(self):
+        return {'captured': self.captured,
+                'dropped': 0,
+                'requested_fps': self.requested_fps,
+                'achieved_fps': self.achieved_fps,
+                'mode': self.stack.mode,
+                'combine': self.combine_time}
+
+    def run(self, progress=None):
+        start = time.perf_counter()
+        frames = self.cam.capture_continuous(self.ring, format='rgb', use_video_port=True)
+        for _ in zip(range(self.frames), frames):
+            self.ring.commit()
+            _, frame = self.ring.acquire()
+            self.stack.add(frame.reshape(self.padded[1], self.padded[0], 3)[:self.height, :self.width])
+            self.ring.release()
+            self.captured += 1
+            self.elapsed = time.perf_counter() - start
+            if progress:
+                progress(self.stats())
+            if self._halt.is_set():
+                break
+        frames.close()
+        captured = time.perf_counter()
+        result = self.stack.result()
+        self.combine_time = time.perf_counter() - captured
+        return result
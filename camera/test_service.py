@@ -0,0 +1,89 @@
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+import camera.service
+from camera.backend import open_camera
+from camera.control import ServiceClient, SocketServer, dispatch, serve
+from camera.service import CaptureService
+from camera.settle import SettleResult
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = CaptureService(open_camera('simulated'), tmp_path)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize('settings', [{'directory': '/etc'}, {'directory': '..'}, {'directory': 'sub/../..'},
+                                      {'directory': 'elsewhere'}, {'name': '../escape'}, {'name': '/etc/passwd'},
+                                      {'name': '..'}, {'path': '/etc/passwd'}])
+def test_pictures_stay_below_the_pictures_directory(tmp_path, service, settings):
+    # a symlink out of the pictures directory is resolved before the check
+    os.symlink(tmp_path, tmp_path / 'pictures' / 'elsewhere')
+    response = dispatch(service, 'capture', settings)
+    assert not response['ok']
+    response = dispatch(service, 'set_settings', settings)
+    assert not response['ok']
+    assert service.settings['directory'] == tmp_path / 'pictures'
+
+
+def test_capture_into_subdirectory(tmp_path, service):
+    (tmp_path / 'pictures' / 'sample').mkdir()
+    response = dispatch(service, 'capture', {'directory': 'sample', 'name': 'drop', 'wait': True})
+    assert response['ok']
+    assert os.path.dirname(response['path']) == f'{tmp_path / "pictures" / "sample"}'
+    assert os.path.basename(response['path']).startswith('drop_')
+    assert dispatch(service, 'set_settings', {'directory': f'{tmp_path / "pictures" / "sample"}'})['ok']
+
+
+def test_unexpected_errors_are_answered(tmp_path, service, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError('Camera is not enabled')
+    monkeypatch.setattr(service.cam, 'capture', broken)
+    socket_path = tmp_path / 'service.sock'
+    server = SocketServer(socket_path, service)
+    serve(server)
+    client = ServiceClient(socket_path, timeout=10)
+    try:
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o660
+        assert dispatch(service, 'capture', {'format': 'gif'}) == {'ok': False,
+                                                                   'error': 'capture failed: Camera is not enabled'}
+        # the connection survives the failed command
+        with pytest.raises(Exception, match='Camera is not enabled'):
+            client.call('capture', format='gif')
+        assert client.call('status')['captures'] == 0
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_captures_take_turns(service, monkeypatch):
+    # settle detection and exposure of concurrent clients never overlap, they would share a splitter port
+    active, overlapping = [], []
+
+    class SettleDetector:
+        def __init__(self, cam, timeout):
+            pass
+
+        def wait(self):
+            active.append(None)
+            overlapping.append(len(active) > 1)
+            time.sleep(0.05)
+            active.pop()
+            return SettleResult(0.05, True, 2, None)
+    monkeypatch.setattr(camera.service, 'SettleDetector', SettleDetector)
+    responses = []
+    clients = [threading.Thread(target=lambda: responses.append(dispatch(service, 'capture', {'settle': 1.0})))
+               for _ in range(3)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    assert all(response['ok'] for response in responses)
+    assert overlapping == [False] * 3
@@ -0,0 +1 @@
+# the packages are namespace packages without __init__, the tests import them from the repository root
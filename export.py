@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import argparse
+import sys
+from pathlib import Path
+
+from PyQt5 import QtGui
+
+from camera.encoding import ENCODED_FORMATS, RAW_FORMATS, encode_frame, qimage_to_array
+from camera.raw_file import pack_raw, raw_to_rgb
+from camera.sequence_file import SequenceReader
+from storage.naming import BURST_TIMESTAMP_FORMAT, capture_path, parse_capture_name
+
+
+def frame_range(text):
+    try:
+        return slice(*(int(value) if value else None for value in text.split(':')))
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f'expected START:STOP, got {text}')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Write the frames of sequence files as single pictures, named '
+                                                 'like the pictures of a burst')
+    parser.add_argument('sequences', nargs='+', type=Path)
+    parser.add_argument('-o', '--output', type=Path,
+                        help='directory for the pictures (default: next to every sequence file, in a directory '
+                             'of the same name)')
+    parser.add_argument('--format', choices=(*ENCODED_FORMATS, *RAW_FORMATS),
+                        help='picture format (default: the format of the frames, copied without encoding again)')
+    parser.add_argument('--quality', type=int, default=85, help='JPEG quality when encoding (default: 85)')
+    parser.add_argument('--frames', type=frame_range, help='START:STOP, frame indices like a Python slice')
+    return parser.parse_args(argv[1:])
+
+
+def frame_data(sequence, index, pic_format, quality):
+    # frames in their own format are copied as they are, the others are decoded and encoded again
+    if pic_format == sequence.format:
+        data = sequence.read(index)
+    else:
+        if sequence.format in RAW_FORMATS:
+            frame = raw_to_rgb(sequence.raw(index))
+        else:
+            image = QtGui.QImage.fromData(sequence.read(index))
+            if image.isNull():
+                raise OSError(f'Unable to decode frame {index} of {sequence.path}')
+            frame = qimage_to_array(image)
+        data = encode_frame(frame, pic_format, quality)
+    if pic_format in RAW_FORMATS:
+        metadata = {**sequence.metadata, **sequence.frame_metadata(index)}
+        metadata.pop('crc32')
+        data = pack_raw(data, sequence.resolution, pic_format, metadata)
+    return data
+
+
+def export(path, directory, pic_format=None, quality=85, frames=None):
+    # frames are read one at a time, the sequence is never loaded as a whole
+    parsed = parse_capture_name(path)
+    name = parsed[0] if parsed else path.stem
+    with SequenceReader(path) as sequence:
+        pic_format = pic_format or sequence.format
+        indices = range(len(sequence))[frames or slice(None)]
+        directory.mkdir(parents=True, exist_ok=True)
+        for index in indices:
+            timestamp = sequence.frames[index].timestamp.strftime(BURST_TIMESTAMP_FORMAT)
+            capture_path(directory, name, timestamp, pic_format).write_bytes(
+                frame_data(sequence, index, pic_format, quality))
+        return len(indices), sequence.complete
+
+
+def main():
+    args = parse_args(sys.argv)
+    failed = False
+    for path in args.sequences:
+        directory = args.output or path.with_suffix('')
+        try:
+            count, complete = export(path, directory, args.format, args.quality, args.frames)
+        except (OSError, ValueError) as error:
+            sys.stderr.write(f'{path}: {error}\n')
+            failed = True
+            continue
+        note = '' if complete else ' (the sequence was not closed, recovered from the frame headers)'
+        print(f'{path}: {count} frames written to {directory}{note}')
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+from PyQt5 import QtWidgets
+
+from camera.backend import open_camera
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    # the tests run without a display
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def cam():
+    cam = open_camera('simulated')
+    yield cam
+    cam.close()
@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from analysis.focus import CLIP_BRIGHT, CLIP_DARK, DEFAULT_ROI, HISTOGRAM_BINS, FocusMeter
+from camera.encoding import raw_shape
+from camera.frames import FrameGrabber, FrameRing, luminance, rgb_frame, yuv_frame_bytes
+from monitoring.metrics import METRICS
+
+
+class FocusAssistThread(QtCore.QThread):
+    # Sharpness, histogram and clipping of the newest preview frame, measured off the GUI thread. Like the live
+    # measurement it reads the frames of a running in-window preview, behind the hardware preview it streams its
+    # own from another splitter port. Frames that arrive while a frame is measured are skipped, never queued.
+    STATS = QtCore.pyqtSignal(dict)
+    RESOLUTION = (640, 480)
+    SPLITTER_PORT = 3
+
+    def __init__(self, cam):
+        super().__init__()
+        self.cam = cam
+        self.source = None
+        self.roi = DEFAULT_ROI
+        self._latest = None
+        self._running = False
+
+    def set_source(self, source):
+        # a running FramePreview, None for frames of its own
+        self.source = source
+
+    def set_roi(self, roi):
+        # applies from the next frame on
+        self.roi = tuple(roi)
+
+    def latest(self):
+        # numbers of the newest frame as they are recorded with a capture, None while the assistant is off
+        return self._latest if self.isRunning() else None
+
+    def start(self, priority=QtCore.QThread.InheritPriority):
+        # set before the thread runs, run() must not undo a stop() that comes before it is scheduled
+        self._running = True
+        super().start(priority)
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        self._latest = None
+        if self.source is not None:
+            self._measure_preview(self.source)
+        else:
+            self._measure_own()
+        self._latest = None
+
+    def _measure_preview(self, source):
+        ring, resolution, padded = source.ring, source.RESOLUTION, source.padded
+        if ring is None:
+            return
+        reader = ring.add_reader()
+        try:
+            self._measure(reader, lambda frame: rgb_frame(frame, resolution, padded))
+        finally:
+            ring.remove_reader(reader)
+
+    def _measure_own(self):
+        padded = raw_shape(*self.RESOLUTION)
+        ring = FrameRing(yuv_frame_bytes(*padded))
+        grabber = FrameGrabber(self.cam, ring, self.RESOLUTION, splitter_port=self.SPLITTER_PORT)
+        grabber.start()
+        try:
+            self._measure(ring.readers[0], lambda frame: luminance(frame, self.RESOLUTION, padded))
+        finally:
+            grabber.stop()
+            grabber.join()
+
+    def _measure(self, reader, pixels):
+        meter = FocusMeter(self.roi)
+        measured, shown, fps = 0, time.perf_counter(), 0.0
+        while self._running:
+            frame = reader.acquire(timeout=0.5)
+            if frame is None:
+                continue
+            if meter.roi != self.roi:
+                meter.set_roi(self.roi)
+            try:
+                with METRICS.span('focus.measure'):
+                    stats = meter.measure(pixels(frame[1]))
+            finally:
+                reader.release()
+            measured += 1
+            now = time.perf_counter()
+            if now - shown >= 1.0:
+                fps, measured, shown = measured / (now - shown), 0, now
+            self._latest = {**{key: value for key, value in stats.items() if key != 'histogram'},
+                            'roi': list(meter.roi)}
+            self.STATS.emit({**stats, 'fps': fps, 'skipped': reader.skipped})
+
+
+class HistogramWidget(QtWidgets.QWidget):
+    # Luminance histogram on a square root scale, so a few clipped bins do not flatten the rest. The clipped
+    # levels are marked red.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histogram = None
+        self.setMinimumSize(HISTOGRAM_BINS, 80)
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.black)
+        width, height = self.width(), self.height()
+        scale = width / HISTOGRAM_BINS
+        painter.fillRect(QtCore.QRectF(0, 0, (CLIP_DARK + 1) * scale, height), QtGui.QColor(90, 0, 0))
+        painter.fillRect(QtCore.QRectF(CLIP_BRIGHT * scale, 0, width - CLIP_BRIGHT * scale, height),
+                         QtGui.QColor(90, 0, 0))
+        if self.histogram is not None and self.histogram.any():
+            counts = np.sqrt(self.histogram)
+            heights = counts / counts.max() * (height - 1)
+            points = [QtCore.QPointF(0, height)]
+            for level, value in enumerate(heights):
+                points += [QtCore.QPointF(level * scale, height - value), QtCore.QPointF((level + 1) * scale,
+                                                                                         height - value)]
+            points.append(QtCore.QPointF(width, height))
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.setBrush(QtGui.QColor(220, 220, 220))
+            painter.drawPolygon(QtGui.QPolygonF(points))
+        painter.end()
+
+
+class FocusAssistPanel(QtWidgets.QDockWidget):
+    # Live numbers for focusing on the droplet edge and setting brightness, contrast and ISO while the preview
+    # runs. The sharpness only compares frames of the same scene and settings, the bar shows it relative to the
+    # best frame since the peak was reset: turn the focus ring until the bar is full. The region is dragged in
+    # the in-window preview, behind the hardware preview the last region is used.
+    ROI_CHANGED = QtCore.pyqtSignal(tuple)
+
+    def __init__(self, parent):
+        super().__init__('Focus and exposure', parent)
+        self.setObjectName('focus_dock')
+        self.peak = 0.0
+        self.sharpness_label = QtWidgets.QLabel('-')
+        self.sharpness_bar = QtWidgets.QProgressBar()
+        self.sharpness_bar.setRange(0, 100)
+        self.sharpness_bar.setFormat('%p% of peak')
+        self.reset_peak_button = QtWidgets.QPushButton('Reset peak')
+        self.reset_roi_button = QtWidgets.QPushButton('Reset region')
+        self.exposure_label = QtWidgets.QLabel('-')
+        self.rate_label = QtWidgets.QLabel('-')
+        self.histogram_widget = HistogramWidget()
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(self.reset_peak_button)
+        buttons.addWidget(self.reset_roi_button)
+        buttons.addStretch()
+        form = QtWidgets.QFormLayout()
+        form.addRow('Sharpness', self.sharpness_label)
+        form.addRow('', self.sharpness_bar)
+        form.addRow('Exposure', self.exposure_label)
+        form.addRow('Rate', self.rate_label)
+        widget = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(widget)
+        layout.addLayout(form)
+        layout.addWidget(self.histogram_widget)
+        layout.addLayout(buttons)
+        self.setWidget(widget)
+
+        # connections
+        self.reset_peak_button.clicked.connect(self.reset_peak)
+        self.reset_roi_button.clicked.connect(lambda: self.ROI_CHANGED.emit(DEFAULT_ROI))
+
+    def reset_peak(self):
+        self.peak = 0.0
+        self.sharpness_bar.setValue(0)
+
+    def clear(self):
+        self.reset_peak()
+        for label in (self.sharpness_label, self.exposure_label, self.rate_label):
+            label.setText('-')
+        self.histogram_widget.set_histogram(None)
+
+    def show_stats(self, stats):
+        self.peak = max(self.peak, stats['sharpness'])
+        self.sharpness_label.setText(f'{stats["sharpness"]:.1f} (peak {self.peak:.1f})')
+        self.sharpness_bar.setValue(round(stats['sharpness'] / self.peak * 100) if self.peak else 0)
+        self.exposure_label.setText(f'mean {stats["mean"]:.0f}, clipped {stats["clipped_dark"]:.1%} dark, '
+                                    f'{stats["clipped_bright"]:.1%} bright')
+        self.rate_label.setText(f'{stats["fps"]:.0f} fps, {stats["skipped"]} skipped')
+        self.histogram_widget.set_histogram(stats['histogram'])
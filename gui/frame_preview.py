@@ -0,0 +1,180 @@
+import time
+
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from analysis.calibration import load_remap_table, remap
+from camera.encoding import raw_shape
+from camera.frames import FrameGrabber, FrameRing, rgb_frame_bytes
+from gui.overlay import draw_measurement
+from monitoring.metrics import METRICS
+
+
+class FramePreview(QtWidgets.QWidget):
+    # In-window camera preview instead of the hardware overlay, which is placed in screen coordinates and has to
+    # be taken down whenever the window moves or loses the focus. Downscaled RGB frames from the video port are
+    # written into the slots of a FrameRing, every slot is wrapped into a QImage once, so a frame is painted
+    # straight from the memory the camera wrote it to. Painting runs at FPS off a timer; frames the camera
+    # delivers in between are dropped, never queued. The live measurement reads the same ring (see
+    # LiveMeasureThread.set_source), its latest result is drawn on top of the newest frame. With a calibration the
+    # frames are corrected for the lens distortion into one reused buffer, a single gather per frame. While the
+    # focus assistant runs its region is shown and a new one can be dragged with the mouse.
+    STATS = QtCore.pyqtSignal(dict)
+    ROI_SELECTED = QtCore.pyqtSignal(tuple)
+    RESOLUTION = (960, 540)
+    FPS = 30
+    STATS_INTERVAL = 0.5
+    # the painted slot, the newest frame, the one being written, one for the live measurement and one for the
+    # focus assistant
+    SLOTS = 5
+    # smallest region that can be dragged, relative to the frame
+    MIN_ROI = 0.02
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.padded = raw_shape(*self.RESOLUTION)
+        self.ring = None
+        self.result = None
+        # (x, y, width, height) relative to the frame, None when no region is shown
+        self.roi = None
+        self._drag = None
+        self._grabber = None
+        self._reader = None
+        self._images = []
+        self._image = None
+        self._painted = 0
+        self._shown = 0.0
+        self._table = None
+        self._corrected = None
+        self._corrected_image = None
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.setInterval(round(1000 / self.FPS))
+        self.timer.timeout.connect(self.next_frame)
+
+    @property
+    def running(self):
+        return self._grabber is not None
+
+    def start(self, cam):
+        if self.running:
+            return
+        width, height = self.RESOLUTION
+        self.ring = FrameRing(rgb_frame_bytes(*self.padded), slots=self.SLOTS)
+        self._reader = self.ring.readers[0]
+        # the images do not own their pixels, the ring has to outlive them
+        self._images = [QtGui.QImage(frame.data, width, height, self.padded[0] * 3, QtGui.QImage.Format_RGB888)
+                        for frame in self.ring.frames]
+        self._grabber = FrameGrabber(cam, self.ring, self.RESOLUTION, 'rgb')
+        self._grabber.start()
+        self._painted, self._shown = 0, time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.timer.stop()
+        self._grabber.stop()
+        self._grabber.join()
+        self._grabber = None
+        self._image = None
+        self._images = []
+        self._reader = None
+        self.ring = None
+        self.result = None
+        self.update()
+
+    def set_calibration(self, calibration, table_directory=None):
+        table = load_remap_table(calibration, self.RESOLUTION, table_directory) if calibration else None
+        if table is None:
+            self._table = self._corrected = self._corrected_image = None
+            return
+        width, height = self.RESOLUTION
+        # indices into the padded frames of the ring
+        self._table = table // width * self.padded[0] + table % width
+        self._corrected = np.empty((height, width, 3), np.uint8)
+        self._corrected_image = QtGui.QImage(self._corrected.data, width, height, width * 3,
+                                             QtGui.QImage.Format_RGB888)
+
+    def set_result(self, result):
+        # coordinates in RESOLUTION pixels, drawn with the next frame
+        self.result = result
+
+    def set_roi(self, roi):
+        self.roi = roi
+        self.update()
+
+    def frame_position(self, pos):
+        # widget position relative to the frame, clamped to it
+        target = self.frame_rect()
+        return (min(max((pos.x() - target.x()) / target.width(), 0.0), 1.0),
+                min(max((pos.y() - target.y()) / target.height(), 0.0), 1.0))
+
+    def mousePressEvent(self, event):
+        if self.roi is not None and event.button() == QtCore.Qt.LeftButton:
+            self._drag = (self.frame_position(event.pos()), self.roi)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is not None:
+            (x0, y0), (x1, y1) = self._drag[0], self.frame_position(event.pos())
+            self.set_roi((min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)))
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag is not None and event.button() == QtCore.Qt.LeftButton:
+            previous = self._drag[1]
+            self._drag = None
+            if self.roi[2] < self.MIN_ROI or self.roi[3] < self.MIN_ROI:
+                # a click, not a drag
+                self.set_roi(previous)
+            else:
+                self.ROI_SELECTED.emit(self.roi)
+        super().mouseReleaseEvent(event)
+
+    def next_frame(self):
+        # swaps the painted slot for the newest frame, the previous slot goes back to the camera
+        frame = self._reader.acquire(timeout=0)
+        if frame is not None:
+            if self._table is not None:
+                padded_width, padded_height = self.padded
+                with METRICS.span('preview.undistort'):
+                    remap(frame[1][:padded_width * padded_height * 3].reshape(padded_height, padded_width, 3),
+                          self._table, out=self._corrected)
+                self._image = self._corrected_image
+            else:
+                self._image = self._images[self._reader.slot]
+            self._painted += 1
+            self.update()
+        now = time.perf_counter()
+        if now - self._shown >= self.STATS_INTERVAL:
+            self.STATS.emit({'fps': self._painted / (now - self._shown), 'dropped': self._reader.skipped})
+            self._painted, self._shown = 0, now
+
+    def frame_rect(self):
+        # largest rectangle of the frame's aspect ratio, centred in the widget
+        width, height = self.RESOLUTION
+        scale = min(self.width() / width, self.height() / height)
+        size = QtCore.QSizeF(width * scale, height * scale)
+        return QtCore.QRectF(QtCore.QPointF((self.width() - size.width()) / 2,
+                                            (self.height() - size.height()) / 2), size)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.black)
+        if self._image is not None:
+            target = self.frame_rect()
+            with METRICS.span('preview.paint'):
+                painter.drawImage(target, self._image)
+            if self.result is not None:
+                painter.translate(target.topLeft())
+                draw_measurement(painter, self.result, target.width() / self.RESOLUTION[0])
+                painter.resetTransform()
+            if self.roi is not None:
+                x, y, width, height = self.roi
+                painter.setPen(QtGui.QPen(QtCore.Qt.yellow, 1, QtCore.Qt.DashLine))
+                painter.setBrush(QtCore.Qt.NoBrush)
+                painter.drawRect(QtCore.QRectF(target.x() + x * target.width(), target.y() + y * target.height(),
+                                               width * target.width(), height * target.height()))
+        painter.end()
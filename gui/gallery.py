@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from PyQt5 import QtCore, QtGui
+
+from gui.image_loader import THUMBNAIL
+
+SORT_ORDERS = {'Newest': (lambda picture: picture.timestamp, True),
+               'Oldest': (lambda picture: picture.timestamp, False),
+               'Name': (lambda picture: (picture.name.upper(), picture.timestamp), False)}
+
+
+class GalleryModel(QtCore.QAbstractListModel):
+    # Rows are the pictures of a PictureIndex after filtering and sorting in memory. Thumbnails are only
+    # requested when a view asks for the decoration of a row, i.e. for the rows that are visible.
+    def __init__(self, index, cache, loader):
+        super().__init__()
+        self.picture_index = index
+        self.cache = cache
+        self.loader = loader
+        self.loader.LOADED.connect(self.thumbnail_loaded)
+        self.prefix = ''
+        self.pic_format = ''
+        self.sort_order = 'Newest'
+        # paths from a catalogue query, None shows every picture
+        self.paths = None
+        self.rows = []
+        self.row_of = {}
+        self.placeholder = QtGui.QPixmap(loader.SIZE)
+        self.placeholder.fill(QtCore.Qt.lightGray)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        picture = self.rows[index.row()]
+        if role == QtCore.Qt.DecorationRole:
+            entry = self.cache.get(picture.path, THUMBNAIL, picture.mtime_ns)
+            if entry is None:
+                self.loader.request(picture.path, picture.mtime_ns)
+                return self.placeholder
+            return entry[0]
+        if role == QtCore.Qt.ToolTipRole:
+            timestamp = datetime.fromtimestamp(picture.timestamp)
+            return f'{picture.name}\n{timestamp:%Y-%m-%d %H:%M:%S.%f}\n{picture.size / 1024:.0f} kB'
+        if role == QtCore.Qt.UserRole:
+            return picture.path
+        return None
+
+    def set_filter(self, prefix=None, pic_format=None, sort_order=None):
+        if prefix is not None:
+            self.prefix = prefix
+        if pic_format is not None:
+            self.pic_format = pic_format
+        if sort_order is not None:
+            self.sort_order = sort_order
+        self.refresh()
+
+    def refresh(self):
+        key, reverse = SORT_ORDERS[self.sort_order]
+        prefix = self.prefix.upper()
+        formats = {'jpeg': ('jpeg', 'jpg')}.get(self.pic_format, (self.pic_format,))
+        self.beginResetModel()
+        self.rows = sorted((picture for picture in self.picture_index.pictures.values()
+                            if picture.name.upper().startswith(prefix)
+                            and (not self.pic_format or picture.format in formats)
+                            and (self.paths is None or picture.path in self.paths)), key=key, reverse=reverse)
+        self.row_of = {picture.path: row for row, picture in enumerate(self.rows)}
+        self.endResetModel()
+
+    def thumbnail_loaded(self, path):
+        row = self.row_of.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
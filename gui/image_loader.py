@@ -0,0 +1,261 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from PyQt5 import QtCore, QtGui
+
+from analysis.calibration import load_remap_table, remap
+from camera.encoding import RAW_FORMATS
+from camera.raw_file import is_raw_file, open_raw, raw_to_rgb
+from camera.sequence_file import open_sequence, sequence_frame
+from monitoring.metrics import METRICS
+
+# raw captures Qt can show straight from the mapped file
+RAW_QIMAGE_FORMATS = {'rgb': QtGui.QImage.Format_RGB888,
+                      'bgr': QtGui.QImage.Format_BGR888,
+                      'rgba': QtGui.QImage.Format_RGBA8888,
+                      'bgra': QtGui.QImage.Format_ARGB32}
+
+PREVIEW, FULL, THUMBNAIL = 'preview', 'full', 'thumbnail'
+# damaged or truncated pictures, raw captures and sequence files fail with these while decoding; a loader reports
+# them for the one picture and goes on with the next request
+DECODE_ERRORS = (OSError, ValueError, IndexError, KeyError)
+
+
+def read_raw_image(path, size=None):
+    try:
+        raw = open_raw(path)
+    except ValueError as error:
+        raise OSError(f'Unable to read image: {path} ({error})')
+    return raw_qimage(raw, size)
+
+
+def raw_qimage(raw, size=None):
+    header = raw.header
+    if header['format'] in RAW_QIMAGE_FORMATS:
+        pixels = raw.data
+        image = QtGui.QImage(raw.data.data, header['width'], header['height'], header['stride'],
+                             RAW_QIMAGE_FORMATS[header['format']])
+    else:
+        pixels = np.ascontiguousarray(raw_to_rgb(raw))
+        image = QtGui.QImage(pixels.data, header['width'], header['height'], pixels.strides[0],
+                             QtGui.QImage.Format_RGB888)
+    original = image.size()
+    # the QImage only borrows the mapped pixels, the scaled or copied image owns its memory
+    if size is not None and (image.width() > size.width() or image.height() > size.height()):
+        image = image.scaled(size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+    else:
+        image = image.copy()
+    return image, original
+
+
+def decode_image(reader, path, size=None):
+    original = reader.size()
+    if size is not None and original.isValid():
+        reader.setScaledSize(original.scaled(size, QtCore.Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise OSError(f'Unable to read image: {path} ({reader.errorString()})')
+    if size is not None and (image.width() > size.width() or image.height() > size.height()):
+        image = image.scaled(size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+    return image, original if original.isValid() else image.size()
+
+
+def read_sequence_image(path, size=None):
+    # one frame of a sequence container, the other frames are not touched
+    container, index = sequence_frame(path)
+    sequence = open_sequence(container)
+    if sequence.format in RAW_FORMATS:
+        return raw_qimage(sequence.raw(index), size)
+    buffer = QtCore.QBuffer()
+    buffer.setData(sequence.read(index))
+    buffer.open(QtCore.QIODevice.ReadOnly)
+    return decode_image(QtGui.QImageReader(buffer), path, size)
+
+
+def read_image(path, size=None):
+    # decodes straight to the requested size where the format supports it (JPEG), (image, original size)
+    if sequence_frame(path) is not None:
+        return read_sequence_image(path, size)
+    if is_raw_file(path):
+        return read_raw_image(path, size)
+    return decode_image(QtGui.QImageReader(f'{path}'), path, size)
+
+
+def qimage_pixels(image, writable=False):
+    # (height, width) view of the pixels of a 32 bit image, its rows are never padded
+    bits = image.bits() if writable else image.constBits()
+    bits.setsize(image.byteCount())
+    return np.frombuffer(bits, np.uint32).reshape(image.height(), image.width())
+
+
+def undistort_image(image, calibration, directory=None):
+    # lens distortion corrected copy as one gather of whole pixels, the image itself when the calibration does
+    # not apply to its aspect ratio
+    table = load_remap_table(calibration, (image.width(), image.height()), directory)
+    if table is None:
+        return image
+    source = image.convertToFormat(QtGui.QImage.Format_RGB32)
+    corrected = QtGui.QImage(source.size(), QtGui.QImage.Format_RGB32)
+    remap(qimage_pixels(source), table, out=qimage_pixels(corrected, writable=True))
+    return corrected
+
+
+class ImageCache:
+    # Decoded pictures in two levels (screen sized preview and full resolution), least recently used ones are
+    # dropped once the memory limit is exceeded. The modification time is part of the key, so pictures that
+    # are overwritten are decoded again.
+    MAX_BYTES = 192 * 1024 ** 2
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path, level, modified=None):
+        # callers that already know the modification time save the stat call
+        if modified is None:
+            frame = sequence_frame(path)
+            try:
+                modified = Path(frame[0] if frame else path).stat().st_mtime_ns
+            except OSError:
+                pass
+        return f'{path}', modified, level
+
+    def get(self, path, level, modified=None):
+        # (image, original size) or None
+        key = self.key(path, level, modified)
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is not None:
+                self._images.move_to_end(key)
+            return entry
+
+    def put(self, path, level, image, original, modified=None):
+        key = self.key(path, level, modified)
+        with self._lock:
+            if key in self._images:
+                self.size -= self._images.pop(key)[0].byteCount()
+            self._images[key] = (image, original)
+            self.size += image.byteCount()
+            while self.size > self.max_bytes and len(self._images) > 1:
+                self.size -= self._images.popitem(last=False)[1][0].byteCount()
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size = 0
+
+
+class ImageLoader(QtCore.QThread):
+    # Decodes pictures away from the GUI thread. Only the newest request per level is kept, pictures that
+    # were skipped over while flipping through a directory are never decoded. Previews go first. With a
+    # calibration the pictures are corrected for the lens distortion.
+    LOADED = QtCore.pyqtSignal(str, str, QtGui.QImage, QtCore.QSize)
+    FAILED = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.calibration = None
+        self.table_directory = None
+        self._requests = {}
+        self._condition = threading.Condition()
+        self._running = True
+
+    def request(self, path, level, size=None):
+        with self._condition:
+            self._requests[level] = (path, size)
+            self._condition.notify()
+
+    def set_calibration(self, calibration, table_directory=None):
+        # the cache holds pictures corrected with the previous calibration
+        with self._condition:
+            self.calibration = calibration
+            self.table_directory = table_directory
+            self.cache.clear()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requests or not self._running)
+                if not self._running:
+                    return
+                level = PREVIEW if PREVIEW in self._requests else FULL
+                path, size = self._requests.pop(level)
+                calibration, table_directory = self.calibration, self.table_directory
+            entry = self.cache.get(path, level)
+            if entry is None:
+                try:
+                    with METRICS.span(f'image.load.{level}'):
+                        entry = read_image(path, size if level == PREVIEW else None)
+                    if calibration is not None:
+                        with METRICS.span('image.undistort'):
+                            entry = (undistort_image(entry[0], calibration, table_directory), entry[1])
+                except DECODE_ERRORS as error:
+                    message = error if isinstance(error, OSError) else f'Unable to read image: {path} ({error!r})'
+                    self.FAILED.emit(f'{path}', f'{message}')
+                    continue
+                self.cache.put(path, level, *entry)
+            self.LOADED.emit(f'{path}', level, *entry)
+
+
+class ThumbnailLoader(QtCore.QThread):
+    # Thumbnails for the rows a view actually shows. The most recently requested ones are decoded first and
+    # old requests are dropped, so scrolling quickly through a long gallery does not build up a backlog.
+    # Decoded thumbnails are stored in the picture index as small JPEGs and survive restarts.
+    LOADED = QtCore.pyqtSignal(str)
+    SIZE = QtCore.QSize(80, 60)
+    MAX_PENDING = 128
+
+    def __init__(self, cache, index):
+        super().__init__()
+        self.cache = cache
+        self.index = index
+        self._requests = OrderedDict()
+        self._condition = threading.Condition()
+        self._running = True
+
+    def request(self, path, modified):
+        with self._condition:
+            self._requests.pop(path, None)
+            self._requests[path] = modified
+            while len(self._requests) > self.MAX_PENDING:
+                self._requests.popitem(last=False)
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requests or not self._running)
+                if not self._running:
+                    return
+                path, modified = self._requests.popitem()
+            if self.cache.get(path, THUMBNAIL, modified) is not None:
+                continue
+            image = QtGui.QImage.fromData(self.index.thumbnail(path) or b'')
+            if image.isNull():
+                try:
+                    with METRICS.span('image.load.thumbnail'):
+                        image, _ = read_image(path, self.SIZE)
+                except DECODE_ERRORS:
+                    continue
+                buffer = QtCore.QBuffer()
+                buffer.open(QtCore.QIODevice.WriteOnly)
+                image.save(buffer, 'JPEG', 85)
+                self.index.set_thumbnail(path, bytes(buffer.data()))
+            self.cache.put(path, THUMBNAIL, image, image.size(), modified)
+            self.LOADED.emit(path)
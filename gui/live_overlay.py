@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+from PyQt5 import QtCore, QtGui
+
+from analysis.calibration import analysis_calibration
+from analysis.contact_angle import AnalysisError, measure
+from analysis.image_io import rgb_to_grayscale
+from camera.encoding import raw_shape
+from camera.frames import FrameGrabber, FrameRing, luminance, rgb_frame, yuv_frame_bytes
+from gui.overlay import draw_measurement
+from monitoring.metrics import METRICS
+
+
+class LiveMeasureThread(QtCore.QThread):
+    # Measures the newest low resolution video port frame and draws the result into an overlay layer on top
+    # of the camera preview. When the analysis is slower than the camera, frames are skipped, never queued.
+    # With an in-window preview as source it measures the frames of the preview instead, and the preview draws
+    # the result.
+    RESULT = QtCore.pyqtSignal(object)
+    STATS = QtCore.pyqtSignal(dict)
+    RESOLUTION = (640, 480)
+    OVERLAY_LAYER = 3
+    STATS_INTERVAL = 0.5
+
+    def __init__(self, cam, parameters=None):
+        super().__init__()
+        self.cam = cam
+        self.parameters = parameters or {'downsample': 2}
+        self.window = None
+        self.overlay = None
+        self.source = None
+        # the lens distortion is corrected in the measured contours where it matches the frames' aspect ratio
+        self.calibration = None
+        self._running = False
+
+    def set_source(self, source):
+        # a running FramePreview, None for frames of its own
+        self.source = source
+
+    def set_window(self, window):
+        self.window = window
+        if self.overlay is not None:
+            self.overlay.window = window
+
+    def start(self, priority=QtCore.QThread.InheritPriority):
+        # set before the thread runs, run() must not undo a stop() that comes before it is scheduled
+        self._running = True
+        super().start(priority)
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        if self.source is not None:
+            self._measure_preview(self.source)
+        else:
+            self._measure_overlay()
+
+    def _measure_preview(self, source):
+        ring, resolution, padded = source.ring, source.RESOLUTION, source.padded
+        if ring is None:
+            return
+        reader = ring.add_reader()
+        try:
+            self._measure(reader, lambda frame: rgb_to_grayscale(rgb_frame(frame, resolution, padded)), resolution)
+        finally:
+            ring.remove_reader(reader)
+
+    def _measure_overlay(self):
+        padded = raw_shape(*self.RESOLUTION)
+        ring = FrameRing(yuv_frame_bytes(*padded))
+        grabber = FrameGrabber(self.cam, ring, self.RESOLUTION)
+        # one overlay image for the whole session, the renderer gets a view of its pixels
+        image = QtGui.QImage(padded[0], padded[1], QtGui.QImage.Format_RGBA8888)
+        image.fill(QtCore.Qt.transparent)
+        bits = image.bits()
+        bits.setsize(image.byteCount())
+        pixels = np.frombuffer(bits, np.uint8)
+        self.overlay = self.cam.add_overlay(pixels, size=padded, format='rgba', layer=self.OVERLAY_LAYER,
+                                            fullscreen=False, window=self.window)
+
+        def draw(result):
+            image.fill(QtCore.Qt.transparent)
+            if result is not None:
+                painter = QtGui.QPainter(image)
+                draw_measurement(painter, result)
+                painter.end()
+            self.overlay.update(pixels)
+
+        grabber.start()
+        try:
+            self._measure(ring.readers[0], lambda frame: luminance(frame, self.RESOLUTION, padded), self.RESOLUTION,
+                          draw)
+        finally:
+            grabber.stop()
+            grabber.join()
+            self.cam.remove_overlay(self.overlay)
+            self.overlay = None
+
+    def _measure(self, reader, grayscale, resolution, draw=None):
+        parameters = {**analysis_calibration(self.calibration, resolution), **self.parameters}
+        measured, shown = 0, time.perf_counter()
+        while self._running:
+            frame = reader.acquire(timeout=0.5)
+            if frame is None:
+                continue
+            try:
+                with METRICS.span('analysis.live'):
+                    result = measure(grayscale(frame[1]), **parameters)
+            except AnalysisError:
+                result = None
+            finally:
+                reader.release()
+            if draw is not None:
+                draw(result)
+            self.RESULT.emit(result)
+            measured += 1
+            now = time.perf_counter()
+            if now - shown >= self.STATS_INTERVAL:
+                self.STATS.emit({'fps': measured / (now - shown), 'skipped': reader.skipped})
+                measured, shown = 0, now
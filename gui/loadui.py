@@ -1,66 +1,304 @@
-import json
 import logging
+import queue
+import sqlite3
 # import subprocess
 import sys
 import time
 from datetime import datetime
-from os import chown
 from pathlib import Path
 
-from PyQt5 import QtWidgets, uic, QtCore, QtGui
-from picamera import PiCamera
+from PyQt5 import QtWidgets, QtCore, QtGui
+
+from analysis.cache import ResultCache
+from analysis.calibration import (CalibrationError, analysis_calibration, calibrate, calibration_from_dict,
+                                  load_remap_table)
+from analysis.contact_angle import AnalysisError
+from analysis.image_io import load_grayscale
+from camera.backend import open_camera
+from camera.service import ServiceError
+from camera.burst import BurstCapture, FrameWriter, SequenceFrameWriter
+from camera.encoding import ENCODED_FORMATS, PICTURE_FORMATS, RAW_FORMATS
+from camera.pipeline import CapturePipeline, capture_raw
+from camera.settings import CAMERA_SETTINGS, ISO_VALUES, CameraSettings
+from camera.sequence_file import frame_path, open_sequence, sequence_frame
+from camera.settle import SettleDetector, SettleResult
+from camera.stacking import STACK_MODES, FrameStack, StackCapture
+from storage.catalogue import CaptureCatalogue
+from storage.naming import TIMESTAMP_FORMAT, capture_path, capture_timestamp
+from storage.ownership import chown_pi
+from storage.picture_index import PictureIndex
+from storage.profiles import DEFAULT_PROFILE, DEFAULT_SETTINGS, ProfileError, ProfileStore
+from gui.focus_assist import FocusAssistPanel, FocusAssistThread
+from gui.frame_preview import FramePreview
+from gui.gallery import SORT_ORDERS, GalleryModel
+from gui.image_loader import FULL, PREVIEW, ImageCache, ImageLoader, ThumbnailLoader
+from gui.live_overlay import LiveMeasureThread
+from gui.metrics_panel import MetricsPanel
+from gui.settings_controller import SettingsController
+from gui.startup import StartupProfile
+from gui.ui_loader import load_ui
+from gui.overlay import draw_measurement
+from monitoring.metrics import METRICS
+
+# entries of the burst mode combobox: a file per frame, one sequence file, or all frames stacked into one picture
+BURST_MODES = ('files', 'sequence', *STACK_MODES)
 
 
 # TODO: QSettings benutzen um root -> XOFFSET,YOFFSET und user -> XOFFSET,YOFFSET zu speichern?
 # TODO: Fix setting directory for cam picture
 # TODO: Set Tooltips for all elements (at least for quality)
 # TODO: Fix Shortcuts
-# TODO: Fail safe einbauen für den Fall das man ein profil lädt mit einem unbekannten Pfad
-#  (z.B. nicht mehr vorhandener USB-Stick als Pfad)
 
 class WorkerThread(QtCore.QThread):
     TIMESTAMP = QtCore.pyqtSignal(str)
+    TIMINGS = QtCore.pyqtSignal(dict)
+    FAILED = QtCore.pyqtSignal(str)
+    SETTLE_TIME = 5
 
     def __init__(self, obj):
         # TODO: send data to worker thread through signal, slot not through __init__
         super().__init__()
         self.obj = obj
         self.cam = obj.cam
+        self.service = obj.service
+        self.camera_settings = obj.camera_settings
+        self.pipeline = obj.pipeline
+        self.catalogue = obj.catalogue
         self.pic_directory = Path(obj.pic_directory)
         self.pic_name = Path(obj.pic_name)
         self.pic_format = obj.pic_format
         self.quality = obj.quality
+        self.profile = None
+        self.session = None
+        self.triggered = None
+        self.focus = None
+        self.timestamp = None
+        self.settle_time = self.SETTLE_TIME
         obj.CAMERA_SETTINGS.connect(self.set_settings)
 
+    def metadata(self, timestamp, settle, capture):
+        # stored in the header of raw captures and in the capture catalogue
+        return {'timestamp': timestamp,
+                'profile': self.profile,
+                'session': self.session,
+                'camera': dict(self.camera_settings.applied),
+                'settings': {'quality': self.quality},
+                'focus': self.focus,
+                'timings': {'settle': settle.seconds, 'settled': settle.settled, 'settle_frames': settle.frames,
+                            'capture': capture}}
+
     def set_settings(self, settings):
         self.pic_directory = settings['directory']
         self.pic_name = settings['name']
         self.pic_format = settings['format']
         self.quality = settings['quality']
+        self.profile = settings['profile']
+        self.session = settings['session']
+        self.triggered = settings['triggered']
+        self.focus = settings['focus']
 
     def run(self):
-        # TODO: Replace with QTimer instead of sleep()?
-        #  https://doc.qt.io/qtforpython-5/overviews/timers.html#timers
-        time.sleep(5)
-        timestamp = datetime.now().strftime('%Y_%m_%dT%H_%M_%S')
-        full_path = Path(self.pic_directory, f"{self.pic_name}_{timestamp}.{self.pic_format}")
-        if self.pic_format == 'jpeg':
-            self.cam.capture(f'{full_path}', quality=self.quality, format=f'{self.pic_format}')
+        start = time.perf_counter()
+        METRICS.record('capture.trigger', start - self.triggered)
+        if self.service is None:
+            # AGC/AWB need time after settings changes, settle_time is only the upper bound
+            settle = SettleDetector(self.cam, timeout=self.settle_time).wait()
+        settled = time.perf_counter()
+        timestamp = self.timestamp = capture_timestamp(datetime.now(), self.timestamp)
+        full_path = capture_path(self.pic_directory, self.pic_name, timestamp, self.pic_format)
+        if self.service is not None:
+            # the capture service waits for the exposure to settle, exposes, saves and catalogues the picture. It
+            # names the file itself and only writes below its pictures directory.
+            try:
+                response = self.service.call('capture', directory=self.pic_directory, name=self.pic_name,
+                                             format=self.pic_format, quality=self.quality, profile=self.profile,
+                                             session=self.session, settle=self.settle_time)
+            except (ServiceError, OSError) as error:
+                self.FAILED.emit(f'{error}')
+                return
+            timestamp = response['timestamp']
+            captured = time.perf_counter()
+            settle = SettleResult(response['settle'], response['settled'], response['settle_frames'], None)
+            settled = captured - response['capture']
+        elif self.pic_format in ENCODED_FORMATS or self.pic_format in RAW_FORMATS:
+            # only the exposure happens here, encoding and writing run in the capture pipeline
+            with self.camera_settings.lock:
+                frame = capture_raw(self.cam)
+            captured = time.perf_counter()
+            metadata = self.metadata(timestamp, settle, captured - settled)
+            self.pipeline.submit(full_path, frame=frame, pic_format=self.pic_format, quality=self.quality,
+                                 metadata=metadata)
         else:
-            self.cam.capture(f'{full_path}', format=f'{self.pic_format}')
-        chown(full_path, 1000, 1000)
+            # formats without a software encoder (gif) are still encoded by the camera
+            with self.camera_settings.lock:
+                self.cam.capture(f'{full_path}', format=f'{self.pic_format}')
+            captured = time.perf_counter()
+            chown_pi(full_path)
+            self.catalogue.record_capture(full_path, self.metadata(timestamp, settle, captured - settled))
+        done = time.perf_counter()
+        if self.service is None:
+            METRICS.record('capture.settle', settle.seconds)
+        METRICS.record('capture.exposure', captured - settled)
         self.TIMESTAMP.emit(timestamp)
+        self.TIMINGS.emit({'settle': settle.seconds,
+                           'settled': settle.settled,
+                           'settle_frames': settle.frames,
+                           'capture': captured - settled,
+                           'queue': done - captured,
+                           'total': done - start})
+
+
+class BurstWorkerThread(QtCore.QThread):
+    PROGRESS = QtCore.pyqtSignal(dict)
+
+    def __init__(self, obj):
+        super().__init__()
+        self.cam = obj.cam
+        self.service = obj.service
+        self.camera_settings = obj.camera_settings
+        self.pipeline = obj.pipeline
+        self.catalogue = obj.catalogue
+        self.settings = {}
+        self.burst = None
+        obj.BURST_SETTINGS.connect(self.set_settings)
+
+    def set_settings(self, settings):
+        self.settings = settings
+
+    def run(self):
+        if self.settings['stack']:
+            self.stack()
+            return
+        if self.service is not None:
+            settings = {key: self.settings[key] for key in ('directory', 'name', 'format', 'quality', 'profile',
+                                                            'session', 'frames', 'interval', 'sequence')}
+            try:
+                self.PROGRESS.emit(self.service.call('burst', **settings))
+            except (ServiceError, OSError) as error:
+                logging.error(f'Burst failed: {error}')
+            return
+        # frames only go into memory here, the writer thread puts them on disk in the background
+        frame_queue = queue.Queue(BurstCapture.QUEUE_SIZE)
+        metadata = {'profile': self.settings['profile'],
+                    'session': self.settings['session'],
+                    'camera': dict(self.camera_settings.applied),
+                    'settings': {'quality': self.settings['quality']},
+                    'focus': self.settings['focus']}
+        if self.settings['sequence']:
+            writer = SequenceFrameWriter(frame_queue, self.settings['directory'], self.settings['name'],
+                                         self.settings['format'], tuple(self.cam.resolution), metadata,
+                                         settings=lambda: dict(self.camera_settings.applied))
+        else:
+            writer = FrameWriter(frame_queue, self.settings['directory'], self.settings['name'], self.pipeline,
+                                 resolution=tuple(self.cam.resolution), metadata=metadata)
+        writer.start()
+        self.burst = BurstCapture(self.cam, frame_queue,
+                                  frames=self.settings['frames'],
+                                  interval=self.settings['interval'],
+                                  pic_format=self.settings['format'],
+                                  quality=self.settings['quality'])
+        self.burst.run(progress=self.PROGRESS.emit)
+        writer.finish()
+        if self.settings['sequence']:
+            writer.join()
+            if writer.written:
+                try:
+                    self.catalogue.record_capture(writer.path, metadata)
+                except sqlite3.Error as error:
+                    logging.warning(f'Could not catalogue {writer.path.name}: {error}')
+            self.PROGRESS.emit({**self.burst.stats(), 'path': writer.path, 'frames': len(writer.written)})
+
+    def stack(self):
+        # consecutive frames combined into one low noise picture, the interval does not apply
+        if self.service is not None:
+            settings = {key: self.settings[key] for key in ('directory', 'name', 'format', 'quality', 'profile',
+                                                            'session', 'frames')}
+            try:
+                self.PROGRESS.emit(self.service.call('stack', mode=self.settings['stack'], **settings))
+            except (ServiceError, OSError) as error:
+                logging.error(f'Stacking failed: {error}')
+            return
+        timestamp = capture_timestamp(datetime.now())
+        path = capture_path(self.settings['directory'], self.settings['name'], timestamp, self.settings['format'])
+        self.burst = StackCapture(self.cam, frames=self.settings['frames'], mode=self.settings['stack'])
+        frame = self.burst.run(progress=self.PROGRESS.emit)
+        METRICS.record('capture.stack', self.burst.combine_time)
+        metadata = {'timestamp': timestamp,
+                    'profile': self.settings['profile'],
+                    'session': self.settings['session'],
+                    'camera': dict(self.camera_settings.applied),
+                    'settings': {'quality': self.settings['quality']},
+                    'focus': self.settings['focus'],
+                    'stack': {'mode': self.settings['stack'], 'frames': self.burst.captured},
+                    'timings': {'capture': self.burst.elapsed}}
+        self.pipeline.submit(path, frame=frame, pic_format=self.settings['format'], quality=self.settings['quality'],
+                             metadata=metadata)
+        self.PROGRESS.emit(self.burst.stats())
+
+
+class AnalysisWorkerThread(QtCore.QThread):
+    RESULT = QtCore.pyqtSignal(object)
+    FAILED = QtCore.pyqtSignal(str)
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.path = None
+        self.parameters = {}
+
+    def set_path(self, path, **parameters):
+        self.path = path
+        self.parameters = parameters
+
+    def run(self):
+        try:
+            with METRICS.span('analysis.measure'):
+                result = self.cache.measure(self.path, **self.parameters)
+        except (AnalysisError, OSError) as error:
+            self.FAILED.emit(str(error))
+            return
+        self.RESULT.emit(result)
+
+
+class CameraOpener(QtCore.QThread):
+    # Opening the PiCamera takes seconds, it happens while the window is already shown
+    OPENED = QtCore.pyqtSignal(object, float)
+    FAILED = QtCore.pyqtSignal(str)
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            cam = open_camera(self.backend)
+        except Exception as error:
+            # picamera raises its own exception types, none of them derive from OSError
+            self.FAILED.emit(f'{error}')
+            return
+        self.OPENED.emit(cam, time.perf_counter() - start)
+
+
+class LogSignals(QtCore.QObject):
+    RECORD = QtCore.pyqtSignal(str)
 
 
 class QPlainTextEditLogger(logging.Handler):
+    # Records are logged from every thread, the widget is only touched in the GUI thread (queued signal)
+    MAX_LINES = 2000
+
     def __init__(self, parent):
         super().__init__()
-        self.widget = QtGui.QPlainTextEdit(parent)
+        self.widget = QtWidgets.QPlainTextEdit(parent)
         self.widget.setReadOnly(True)
+        self.widget.setMaximumBlockCount(self.MAX_LINES)
+        self.signals = LogSignals()
+        self.signals.RECORD.connect(self.widget.appendPlainText)
 
     def emit(self, record):
         msg = self.format(record)
-        self.widget.appendPlainText(msg)
+        self.signals.RECORD.emit(msg)
 
     # TODO: add statusbar or logging field with information about what is being done
     # TODO: menu events (File, Help)
@@ -68,126 +306,105 @@ class QPlainTextEditLogger(logging.Handler):
 
 class UI(QtWidgets.QMainWindow):
     CAMERA_SETTINGS = QtCore.pyqtSignal(dict)
+    BURST_SETTINGS = QtCore.pyqtSignal(dict)
     RESIZED = QtCore.pyqtSignal()
     FILE_DELETED = QtCore.pyqtSignal()
+    PIPELINE_DONE = QtCore.pyqtSignal(dict)
+    CAMERA_READY = QtCore.pyqtSignal()
     X_OFFSET = 0
     Y_OFFSET = 0
     PREVIEW_RUNNING = False
     PROGRAM_START_TIME = datetime.now().strftime('%Y_%m_%dT%H_%M_%S')
+    BASE_DIRECTORY = Path('/home/pi/Desktop/ContactAngleSystem')
 
-    def __init__(self):
+    def __init__(self, cam=None, base_directory=None, service=None, camera_backend='picamera', startup=None):
         super().__init__()
+        self.startup = startup if startup is not None else StartupProfile()
 
-        # PiCamera init
-        self.cam = PiCamera()
+        # Camera init, a camera handed in (e.g. the simulated camera) is used right away, otherwise the backend
+        # is opened in the background once the window is up (set_camera). With a capture service client the
+        # camera is a RemoteCamera and the service takes the pictures.
+        self.cam = None
+        self.camera_backend = camera_backend
+        self.service = service
+        self.camera_settings = None
+        self.settings_controller = SettingsController()
 
-        # load the ui file
-        ui_path = Path('/home/pi/Desktop/ContactAngleSystem/scripts/', 'ui', 'main_window.ui')
-        uic.loadUi(ui_path, self)
+        # the widgets of the compiled ui module become attributes, no findChild lookups needed
+        load_ui(self, 'main_window')
+        self.startup.mark('window setup')
 
         # Directories Setup
-        self.paths = {'profiles': Path('/home/pi/Desktop/ContactAngleSystem', 'profiles'),
-                      'pictures': Path('/home/pi/Desktop/ContactAngleSystem', 'pictures')}
+        base_directory = Path(base_directory) if base_directory is not None else self.BASE_DIRECTORY
+        self.paths = {'profiles': Path(base_directory, 'profiles'),
+                      'pictures': Path(base_directory, 'pictures'),
+                      'cache': Path(base_directory, 'cache')}
         for path in self.paths.values():
-            path.mkdir(parents=True, exist_ok=True)
-            chown(path, 1000, 1000)
+            if not path.is_dir():
+                path.mkdir(parents=True)
+                chown_pi(path)
+        self.result_cache = ResultCache(Path(self.paths['cache'], 'analysis.sqlite'))
+        chown_pi(self.result_cache.path)
+        self.catalogue = CaptureCatalogue(Path(base_directory, 'catalogue.sqlite'))
+        chown_pi(self.catalogue.path)
+        # captures are catalogued per GUI session and per loaded profile
+        self.session = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.current_profile = DEFAULT_PROFILE
 
         # Save Cam Settings in dict
-        self.default_settings = {'brightness': 50,
-                                 'sharpness': 0,
-                                 'contrast': 0,
-                                 'saturation': 0,
-                                 'iso': 0,
-                                 'quality': 75,
-                                 'directory': f'{self.paths["pictures"]}',
-                                 'filename': 'foo',
-                                 'pic_format': 0}
-        path = Path(self.paths['profiles'], 'default.json')
-        with open(path, 'w') as f_default:
-            json.dump(self.default_settings, f_default)
-            chown(path, 1000, 1000)
+        self.default_settings = {**DEFAULT_SETTINGS, 'directory': f'{self.paths["pictures"]}'}
+        self.profile_store = ProfileStore(self.paths['profiles'], self.default_settings)
 
         self.current_settings = self.default_settings
+        # pixel size and lens distortion of the loaded profile
+        self.calibration = None
+        self.startup.mark('directories, caches, profiles')
 
         # define our widgets
 
         # Menus #
 
-        self.file_menu = self.findChild(QtWidgets.QMenu, 'menuFile')
-        self.help_menu = self.findChild(QtWidgets.QMenu, 'menuHelp')
+        self.file_menu = self.menuFile
+        self.help_menu = self.menuHelp
 
         # Settings Group #
 
-        self.groupbox_settings = self.findChild(QtWidgets.QWidget, 'settings_groupbox')
+        self.groupbox_settings = self.settings_groupbox
 
         # brightness
-        self.brightness_slider = self.findChild(QtWidgets.QSlider, 'brightness_slider')
-        self.brightness_spinbox = self.findChild(QtWidgets.QSpinBox, 'brightness_spinbox')
-        self.brightness_label = self.findChild(QtWidgets.QLabel, 'brightness_label')
-
-        # brightness connections
         self.brightness_slider.valueChanged[int].connect(self.brightness_spinbox.setValue)
         self.brightness_spinbox.valueChanged[int].connect(self.brightness_slider.setValue)
         self.brightness_slider.valueChanged[int].connect(self.set_brightness)
 
         # sharpness
-        self.sharpness_slider = self.findChild(QtWidgets.QSlider, 'sharpness_slider')
-        self.sharpness_spinbox = self.findChild(QtWidgets.QSpinBox, 'sharpness_spinbox')
-        self.sharpness_label = self.findChild(QtWidgets.QLabel, 'sharpness_label')
-
-        # sharpness connections
         self.sharpness_slider.valueChanged[int].connect(self.sharpness_spinbox.setValue)
         self.sharpness_spinbox.valueChanged[int].connect(self.sharpness_slider.setValue)
         self.sharpness_slider.valueChanged[int].connect(self.set_sharpness)
 
         # contrast
-        self.contrast_slider = self.findChild(QtWidgets.QSlider, 'contrast_slider')
-        self.contrast_spinbox = self.findChild(QtWidgets.QSpinBox, 'contrast_spinbox')
-        self.contrast_label = self.findChild(QtWidgets.QLabel, 'contrast_label')
-
-        # contrast connections
         self.contrast_slider.valueChanged[int].connect(self.contrast_spinbox.setValue)
         self.contrast_spinbox.valueChanged[int].connect(self.contrast_slider.setValue)
         self.contrast_slider.valueChanged[int].connect(self.set_contrast)
 
         # saturation
-        self.saturation_slider = self.findChild(QtWidgets.QSlider, 'saturation_slider')
-        self.saturation_spinbox = self.findChild(QtWidgets.QSpinBox, 'saturation_spinbox')
-        self.saturation_label = self.findChild(QtWidgets.QLabel, 'saturation_label')
-
-        # saturation connections
         self.saturation_slider.valueChanged[int].connect(self.saturation_spinbox.setValue)
         self.saturation_spinbox.valueChanged[int].connect(self.saturation_slider.setValue)
         self.saturation_slider.valueChanged[int].connect(self.set_saturation)
 
         # iso
-        self.iso_label = self.findChild(QtWidgets.QLabel, 'iso_label')
-        self.iso_combobox = self.findChild(QtWidgets.QComboBox, 'iso_combobox')
-        self.iso_combobox.addItem("Auto", 0)
-        self.iso_combobox.addItem("100", 100)
-        self.iso_combobox.addItem("200", 200)
-        self.iso_combobox.addItem("320", 320)
-        self.iso_combobox.addItem("400", 400)
-        self.iso_combobox.addItem("500", 500)
-        self.iso_combobox.addItem("640", 640)
-        self.iso_combobox.addItem("800", 800)
+        for iso in ISO_VALUES:
+            self.iso_combobox.addItem(f'{iso}' if iso else 'Auto', iso)
 
         # iso connections
         self.iso_combobox.currentIndexChanged.connect(self.set_iso)
 
         # quality
-        self.quality_slider = self.findChild(QtWidgets.QSlider, 'quality_slider')
-        self.quality_spinbox = self.findChild(QtWidgets.QSpinBox, 'quality_spinbox')
-        self.quality_label = self.findChild(QtWidgets.QLabel, 'quality_label')
-
-        # quality connections
         self.quality_slider.valueChanged[int].connect(self.quality_spinbox.setValue)
         self.quality_spinbox.valueChanged[int].connect(self.quality_slider.setValue)
         self.quality = 75
         self.quality_slider.valueChanged[int].connect(self.set_quality)
 
         # camera push buttons
-        self.preview_button = self.findChild(QtWidgets.QPushButton, 'preview_button')
         self.preview_button.setCheckable(True)
         self.preview_button.setToolTip('Toggles camera Preview.\nShortcut: "P", "Space"')
         self.preview_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_P), self)
@@ -201,9 +418,8 @@ class UI(QtWidgets.QMainWindow):
         # self.open_dropui_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_D), self)
         # self.open_dropui_shortcut.activated.connect(self.open_dropui)
 
-        self.take_pic_button = self.findChild(QtWidgets.QPushButton, 'pic_button')
+        self.take_pic_button = self.pic_button
         self.take_pic_button.setToolTip('Takes a picture with the current settings.\n Shortcut: "T"')
-        self.load_pic_button = self.findChild(QtWidgets.QPushButton, 'load_pic_button')
         self.load_pic_button.setToolTip('Load a picture to be displayed.\n Shortcut: "L"')
         self.open_picture_dialog = QtWidgets.QFileDialog(self)
         self.open_picture_dialog.setNameFilters(["Images (*.png *.jpeg *.jpg)"])
@@ -213,7 +429,6 @@ class UI(QtWidgets.QMainWindow):
         self.open_picture_dialog.setViewMode(QtWidgets.QFileDialog.Detail)
         # self.open_dropui_button = self.findChild(QtWidgets.QPushButton, 'open_dropui_button')
         # self.open_dropui_button.setToolTip('Opens DropUI Website.\n Shortcut: "D"')
-        self.reset_button = self.findChild(QtWidgets.QPushButton, 'reset_button')
 
         # camera push buttons connections
         self.preview_button.clicked.connect(self.preview)
@@ -223,50 +438,29 @@ class UI(QtWidgets.QMainWindow):
         # self.open_dropui_button.clicked.connect(self.open_dropui)
 
         # set profile names
-        self.profile_name_save_label = self.findChild(QtWidgets.QLabel, 'profile_name_save_label')
-        self.profile_name_load_label = self.findChild(QtWidgets.QLabel, 'profile_name_load_label')
-        self.profile_name_line_edit = self.findChild(QtWidgets.QLineEdit, 'profile_name_line_edit')
         self.profile_name_line_edit.setText('default')
-        self.profile_name_combobox = self.findChild(QtWidgets.QComboBox, 'load_profile_combobox')
+        self.profile_name_combobox = self.load_profile_combobox
 
         # set profile names connections
         self.profile_name_line_edit.returnPressed.connect(self.save_profile)
 
         # save/load profile buttons
-        self.save_profile_button = self.findChild(QtWidgets.QPushButton, 'save_profile_button')
-        self.load_profile_button = self.findChild(QtWidgets.QPushButton, 'load_profile_button')
-        self.delete_profile_button = self.findChild(QtWidgets.QPushButton, 'delete_profile_button')
-
-        # push buttons connections
         self.save_profile_button.clicked.connect(self.save_profile)
         self.load_profile_button.clicked.connect(self.load_profile)
         self.delete_profile_button.clicked.connect(self.delete_profile)
-        self.delete_profile_button.clicked.connect(self.set_profile_combobox)
 
         # picture buttons
-        self.pic_dir_label = self.findChild(QtWidgets.QLabel, 'pic_dir_label')
-        self.pic_dir_line_edit = self.findChild(QtWidgets.QLineEdit, 'pic_dir_line_edit')
         self.pic_dir_line_edit.setText(f"{Path('..', self.paths['pictures'].parent.name, self.paths['pictures'].stem)}")
-        self.pic_name_line_edit = self.findChild(QtWidgets.QLineEdit, 'pic_name_line_edit')
         self.pic_name_line_edit.setText('foo')
-        self.pic_dir_button = self.findChild(QtWidgets.QPushButton, 'pic_dir_button')
         self.open_directory_dialog = QtWidgets.QFileDialog(self)
         self.open_directory_dialog.setWindowTitle('Open picture save directory')
         self.open_directory_dialog.setFileMode(QtWidgets.QFileDialog.Directory)
         self.open_directory_dialog.setOption(QtWidgets.QFileDialog.ShowDirsOnly, True)
         self.open_directory_dialog.setOption(QtWidgets.QFileDialog.DontResolveSymlinks, True)
         self.open_directory_dialog.setViewMode(QtWidgets.QFileDialog.Detail)
-        self.pic_name_label = self.findChild(QtWidgets.QLabel, 'pic_name_label')
-        self.pic_format_combobox = self.findChild(QtWidgets.QComboBox, 'pic_format_combobox')
-        self.pic_format_combobox.addItem('jpeg', True)
-        self.pic_format_combobox.addItem('png', False)
-        self.pic_format_combobox.addItem('gif', False)
-        self.pic_format_combobox.addItem('bmp', False)
-        self.pic_format_combobox.addItem('yuv', False)
-        self.pic_format_combobox.addItem('rgb', False)
-        self.pic_format_combobox.addItem('rgba', False)
-        self.pic_format_combobox.addItem('bgr', False)
-        self.pic_format_combobox.addItem('bgra', False)
+        # the data flags the formats that have a quality setting
+        for pic_format in PICTURE_FORMATS:
+            self.pic_format_combobox.addItem(pic_format, pic_format == 'jpeg')
 
         # init status bar with default values
         full_path = Path(self.paths['pictures'], f'foo_{{timestamp}}.jpg')
@@ -289,7 +483,6 @@ class UI(QtWidgets.QMainWindow):
         # Window Events
         self.RESIZED.connect(self.resize_window)
         self.installEventFilter(self)
-        self.FILE_DELETED.connect(self.set_profile_combobox)
 
         # set UI
         self.set_profile_combobox()
@@ -299,12 +492,99 @@ class UI(QtWidgets.QMainWindow):
         self.pic_format = 'jpeg'
         self.pic_directory = Path(self.paths['pictures'])
         self.timestamp = datetime.now().strftime('%Y_%m_%dT%H_%M_%S')
+        self.pipeline = CapturePipeline(on_done=self.capture_saved)
+        self.pipeline_status_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.pipeline_status_label)
+        self.PIPELINE_DONE.connect(self.set_pipeline_status)
         self.worker = WorkerThread(self)
         self.worker.TIMESTAMP.connect(self.set_timestamp)
+        self.worker.FAILED.connect(self.show_capture_error)
+        self.worker.TIMINGS.connect(self.show_settle_time)
+        self.worker.finished.connect(self.evt_worker_finished)
 
-        # offset sliders
-        self.x_offset_slider = self.findChild(QtWidgets.QSlider, 'x_offset_slider')
-        self.y_offset_slider = self.findChild(QtWidgets.QSlider, 'y_offset_slider')
+        # burst
+        self.burst_button.setToolTip('Takes a burst of pictures through the video port.\n Shortcut: "B"')
+        self.burst_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_B), self)
+        self.burst_shortcut.activated.connect(self.take_burst)
+        self.burst_worker = BurstWorkerThread(self)
+        self.burst_worker.PROGRESS.connect(self.set_burst_status)
+        self.burst_worker.finished.connect(self.evt_worker_finished)
+
+        # burst connections
+        self.burst_button.clicked.connect(self.take_burst)
+
+        # analysis
+        self.displayed_picture = None
+        self.displayed_images = {}
+        self.displayed_size = None
+        self.displayed_result = None
+        self.zoom_center = None
+        self.picture_view = (1.0, (0, 0))
+        self.image_cache = ImageCache()
+        self.image_loader = ImageLoader(self.image_cache)
+        self.image_loader.LOADED.connect(self.show_picture)
+        self.image_loader.FAILED.connect(self.show_picture_error)
+        # frame of a displayed sequence file, only shown for those
+        self.frame_spinbox = QtWidgets.QSpinBox()
+        self.frame_spinbox.setPrefix('Frame ')
+        self.frame_spinbox.setToolTip('Frame of the sequence file')
+        self.frame_spinbox.valueChanged.connect(self.show_sequence_frame)
+        self.statusBar().addPermanentWidget(self.frame_spinbox)
+        self.frame_spinbox.hide()
+        self.image_loader.start()
+        self.measure_button.setToolTip('Measures the contact angles of the displayed picture.\n Shortcut: "M"')
+        self.measure_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_M), self)
+        self.measure_shortcut.activated.connect(self.measure_picture)
+        self.analysis_worker = AnalysisWorkerThread(self.result_cache)
+        self.analysis_worker.RESULT.connect(self.show_measurement)
+        self.analysis_worker.FAILED.connect(self.show_measurement_error)
+        self.analysis_worker.finished.connect(lambda: self.measure_button.setDisabled(False))
+
+        if self.service is not None:
+            self.live_button.setToolTip('Not available while connected to the capture service')
+        self.live_worker = LiveMeasureThread(self.cam)
+        self.live_worker.RESULT.connect(self.show_live_result)
+        self.live_worker.STATS.connect(self.show_live_stats)
+        self.live_stats = ''
+
+        # analysis connections
+        self.measure_button.clicked.connect(self.measure_picture)
+        self.live_button.toggled.connect(self.toggle_live_measure)
+
+        # gallery
+        self.picture_index = PictureIndex(Path(self.paths['cache'], 'pictures.sqlite'))
+        chown_pi(self.picture_index.path)
+        self.thumbnail_cache = ImageCache(32 * 1024 ** 2)
+        self.thumbnail_loader = ThumbnailLoader(self.thumbnail_cache, self.picture_index)
+        self.thumbnail_loader.start()
+        self.gallery_model = GalleryModel(self.picture_index, self.thumbnail_cache, self.thumbnail_loader)
+        self.gallery_format_combobox.addItems(['All', 'jpeg', 'png', 'bmp', 'gif', 'yuv', 'rgb', 'rgba', 'bgr', 'bgra',
+                                               'seq'])
+        self.gallery_sort_combobox.addItems(list(SORT_ORDERS))
+        self.gallery_profile_combobox.addItems(['All profiles', *self.catalogue.profiles()])
+        self.gallery_list_view.setModel(self.gallery_model)
+        self.gallery_list_view.setViewMode(QtWidgets.QListView.IconMode)
+        self.gallery_list_view.setFlow(QtWidgets.QListView.LeftToRight)
+        self.gallery_list_view.setWrapping(False)
+        self.gallery_list_view.setMovement(QtWidgets.QListView.Static)
+        self.gallery_list_view.setUniformItemSizes(True)
+        self.gallery_list_view.setIconSize(ThumbnailLoader.SIZE)
+        # the directory is only listed again after it changed, bursts are collected into one update
+        self.gallery_watcher = QtCore.QFileSystemWatcher()
+        self.gallery_timer = QtCore.QTimer()
+        self.gallery_timer.setSingleShot(True)
+        self.gallery_timer.setInterval(250)
+
+        # gallery connections
+        self.gallery_watcher.directoryChanged.connect(self.gallery_timer.start)
+        self.gallery_timer.timeout.connect(self.sync_gallery)
+        self.gallery_filter_line_edit.textChanged.connect(self.filter_gallery)
+        self.gallery_format_combobox.currentIndexChanged.connect(self.filter_gallery)
+        self.gallery_sort_combobox.currentIndexChanged.connect(self.filter_gallery)
+        self.gallery_profile_combobox.currentIndexChanged.connect(self.filter_gallery)
+        self.gallery_list_view.selectionModel().currentChanged.connect(self.show_gallery_picture)
+        self.open_gallery(self.pic_directory)
+        self.startup.mark('gallery')
 
         # offset slider connections
         self.x_offset_slider.sliderMoved.connect(self.move_preview_x)
@@ -313,14 +593,23 @@ class UI(QtWidgets.QMainWindow):
         self.y_offset_slider.valueChanged.connect(self.move_preview_y)
 
         # preview frame
-        self.preview_frame = self.findChild(QtWidgets.QFrame, 'preview_frame')
         self.preview_pos = (self.preview_frame.geometry().x() + self.X_OFFSET,
                             self.preview_frame.geometry().y() + 85 + self.Y_OFFSET,
                             self.preview_frame.frameGeometry().width(),
                             self.preview_frame.frameGeometry().height())
-        self.picture_label = self.findChild(QtWidgets.QLabel, 'picture_label')
-        self.preview_status = self.findChild(QtWidgets.QLabel, 'preview_status')  # 'Preview:'
-        self.preview_status_info = self.findChild(QtWidgets.QLabel, 'preview_status_info')  # 'On', 'Off'
+        self.picture_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.picture_label.setToolTip('Double click to zoom to full resolution and back')
+        self.picture_label.installEventFilter(self)
+        # in-window preview, on top of the displayed picture while it runs
+        self.frame_preview = FramePreview(self.preview_frame)
+        self.frame_preview.setGeometry(self.picture_label.geometry())
+        self.frame_preview.hide()
+        self.frame_preview.STATS.connect(self.show_preview_stats)
+        self.live_worker.RESULT.connect(self.frame_preview.set_result)
+        self.preview_stats_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.preview_stats_label)
+        self.preview_stats_label.hide()
+        # preview_status: 'Preview:', preview_status_info: 'On', 'Off'
         self.preview_status_info.setAlignment(QtCore.Qt.AlignCenter)
 
         # color palette
@@ -333,6 +622,99 @@ class UI(QtWidgets.QMainWindow):
         # Dropui Link
         # self.link = 'https://www.chemeng.ntua.gr/dropui/9UAJFkq2xlj2Wv7s'
 
+        # log and metrics panel, toggled from the File menu
+        self.log_handler = QPlainTextEditLogger(self)
+        self.log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        logging.getLogger().addHandler(self.log_handler)
+        self.metrics_panel = MetricsPanel(self, self.log_handler.widget)
+        self.metrics_panel.setFloating(True)
+        self.metrics_panel.hide()
+        self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.metrics_panel)
+        self.metrics_action = self.metrics_panel.toggleViewAction()
+        self.metrics_action.setShortcut(QtGui.QKeySequence('Ctrl+M'))
+        self.file_menu.insertAction(self.file_menu.actions()[0] if self.file_menu.actions() else None,
+                                    self.metrics_action)
+        # focus and exposure assistant, measures the preview frames while its panel is open. Docked, a floating
+        # panel takes the focus from the window and that stops the hardware preview.
+        self.focus_worker = FocusAssistThread(self.cam)
+        self.focus_panel = FocusAssistPanel(self)
+        self.focus_panel.hide()
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.focus_panel)
+        self.focus_action = self.focus_panel.toggleViewAction()
+        self.focus_action.setStatusTip('Sharpness, histogram and clipped pixels of the preview, recorded with '
+                                       'every capture')
+        self.file_menu.insertAction(self.metrics_action, self.focus_action)
+        self.focus_worker.STATS.connect(self.focus_panel.show_stats)
+        self.focus_panel.visibilityChanged.connect(self.toggle_focus_assist)
+        self.focus_panel.ROI_CHANGED.connect(self.set_focus_roi)
+        self.frame_preview.ROI_SELECTED.connect(self.set_focus_roi)
+        # measure pictures with a Young-Laplace fit of the whole drop instead of the tangent fits, the live
+        # measurement always uses the tangents
+        self.young_laplace_action = QtWidgets.QAction('Young-Laplace fit', self)
+        self.young_laplace_action.setCheckable(True)
+        self.young_laplace_action.setStatusTip('Fit the whole drop profile when measuring a picture')
+        self.file_menu.insertAction(self.metrics_action, self.young_laplace_action)
+        # paint the preview into the window instead of the hardware overlay, which sits on top of everything at
+        # fixed screen coordinates
+        self.frame_preview_action = QtWidgets.QAction('In-window preview', self)
+        self.frame_preview_action.setCheckable(True)
+        self.frame_preview_action.setStatusTip('Show the camera preview inside the window, with the live '
+                                               'measurement drawn on top')
+        self.frame_preview_action.toggled.connect(self.switch_preview)
+        self.file_menu.insertAction(self.metrics_action, self.frame_preview_action)
+        self.calibrate_action = QtWidgets.QAction('Calibrate from picture...', self)
+        self.calibrate_action.setStatusTip('Measure the pixel size and the lens distortion on the displayed picture '
+                                           'of a dot grid target and store them in the loaded profile')
+        self.calibrate_action.triggered.connect(self.calibrate_profile)
+        self.file_menu.insertAction(self.metrics_action, self.calibrate_action)
+
+        # camera
+        self.camera_widgets = (self.preview_button, self.take_pic_button, self.burst_button, self.live_button)
+        self.camera_opener = None
+        if cam is not None:
+            self.set_camera(cam)
+        else:
+            for widget in self.camera_widgets:
+                widget.setDisabled(True)
+            self.statusBar().showMessage('Opening camera...')
+            self.camera_opener = CameraOpener(self.camera_backend)
+            self.camera_opener.OPENED.connect(self.camera_opened)
+            self.camera_opener.FAILED.connect(self.show_camera_error)
+            self.camera_opener.start()
+        self.startup.mark('widgets')
+
+    def set_camera(self, cam):
+        self.cam = cam
+        self.camera_settings = CameraSettings(cam)
+        for worker in (self.worker, self.burst_worker):
+            worker.cam = cam
+            worker.camera_settings = self.camera_settings
+        self.live_worker.cam = cam
+        self.focus_worker.cam = cam
+        # slider changes made while the camera was opening
+        self.settings_controller.attach(self.camera_settings)
+        for widget in self.camera_widgets:
+            widget.setDisabled(False)
+        if self.service is not None:
+            # the frames stay in the capture service
+            self.live_button.setDisabled(True)
+            self.frame_preview_action.setDisabled(True)
+            self.focus_action.setDisabled(True)
+        self.CAMERA_READY.emit()
+
+    def camera_opened(self, cam, seconds):
+        self.startup.add('camera open', seconds)
+        self.set_camera(cam)
+        self.statusBar().showMessage(f'Camera ready ({seconds:.1f} s)', 3000)
+
+    def show_camera_error(self, message):
+        self.statusBar().clearMessage()
+        msg = QtWidgets.QMessageBox()
+        msg.setIcon(QtWidgets.QMessageBox.Critical)
+        msg.setText(f'Could not open the camera: {message}')
+        msg.setWindowTitle("Error")
+        msg.exec_()
+
     # def open_dropui(self):
     #     subprocess.Popen(['/usr/bin/chromium-browser', '--no-sandbox',self.link])
 
@@ -352,10 +734,11 @@ class UI(QtWidgets.QMainWindow):
 
         if value == 1:
             self.pic_directory = Path(self.open_directory_dialog.selectedFiles()[0])
-            chown(self.pic_directory, 1000, 1000)
+            chown_pi(self.pic_directory)
             string = f"{Path('..', self.pic_directory.parent.name, self.pic_directory.stem)}"
             self.pic_dir_line_edit.setText(string)
             self.set_statusbar()
+            self.open_gallery(self.pic_directory)
         if value == 0:
             return
 
@@ -368,12 +751,233 @@ class UI(QtWidgets.QMainWindow):
 
     def display_picture(self, value):
         if value == 1:
-            path = Path(self.open_picture_dialog.selectedFiles()[0])
-            img = QtGui.QPixmap(f'{path}')
-            self.picture_label.setPixmap(img)
+            self.show_picture_file(Path(self.open_picture_dialog.selectedFiles()[0]))
         if value == 0:
             return
 
+    def show_picture_file(self, path):
+        # the screen sized version comes first, full resolution is only decoded when zooming in
+        frame = sequence_frame(path)
+        if frame is not None:
+            try:
+                frames = len(open_sequence(frame[0]))
+            except OSError as error:
+                self.show_picture_error(f'{path}', f'{error}')
+                return
+            # a sequence file on its own shows its first frame
+            path = frame_path(*frame)
+            with QtCore.QSignalBlocker(self.frame_spinbox):
+                self.frame_spinbox.setRange(0, max(0, frames - 1))
+                self.frame_spinbox.setSuffix(f' of {frames}')
+                self.frame_spinbox.setValue(frame[1])
+        self.frame_spinbox.setVisible(frame is not None)
+        self.displayed_picture = path
+        self.displayed_images = {}
+        self.displayed_size = None
+        self.displayed_result = None
+        self.zoom_center = None
+        self.angle_label.setText('-')
+        entry = self.image_cache.get(path, PREVIEW)
+        if entry is not None:
+            self.show_picture(f'{path}', PREVIEW, *entry)
+        else:
+            self.image_loader.request(path, PREVIEW, self.picture_label.size())
+
+    def show_sequence_frame(self, index):
+        frame = sequence_frame(self.displayed_picture) if self.displayed_picture is not None else None
+        if frame is not None:
+            self.show_picture_file(frame_path(frame[0], index))
+
+    def show_picture(self, path, level, image, size):
+        if path != f'{self.displayed_picture}':
+            return
+        self.displayed_images[level] = image
+        self.displayed_size = size
+        if level == PREVIEW or self.zoom_center is not None:
+            self.render_picture()
+
+    def show_picture_error(self, path, message):
+        if path != f'{self.displayed_picture}':
+            return
+        msg = QtWidgets.QMessageBox()
+        msg.setIcon(QtWidgets.QMessageBox.Critical)
+        msg.setText(message)
+        msg.setWindowTitle("Error")
+        msg.exec_()
+
+    def render_picture(self):
+        if PREVIEW not in self.displayed_images:
+            return
+        size = self.picture_label.size()
+        if self.zoom_center is not None and FULL in self.displayed_images:
+            # 1:1 section of the full resolution picture around the zoom centre
+            image = self.displayed_images[FULL]
+            x = min(max(0, int(self.zoom_center[0] - size.width() / 2)), max(0, image.width() - size.width()))
+            y = min(max(0, int(self.zoom_center[1] - size.height() / 2)), max(0, image.height() - size.height()))
+            view, scale, offset = image.copy(x, y, size.width(), size.height()), 1.0, (x, y)
+        else:
+            view = self.displayed_images[PREVIEW]
+            scale, offset = view.width() / self.displayed_size.width(), (0, 0)
+        pixmap = QtGui.QPixmap.fromImage(view)
+        if self.displayed_result is not None:
+            painter = QtGui.QPainter(pixmap)
+            painter.translate(-offset[0], -offset[1])
+            draw_measurement(painter, self.displayed_result, scale)
+            painter.end()
+        self.picture_label.setPixmap(pixmap)
+        self.picture_view = (scale, offset)
+
+    def toggle_zoom(self, pos):
+        if self.displayed_size is None:
+            return
+        if self.zoom_center is not None:
+            self.zoom_center = None
+            self.render_picture()
+            return
+        # label position -> full resolution picture coordinates
+        scale, (x, y) = self.picture_view
+        pixmap = self.picture_label.pixmap()
+        left = (self.picture_label.width() - pixmap.width()) / 2
+        top = (self.picture_label.height() - pixmap.height()) / 2
+        self.zoom_center = ((pos.x() - left) / scale + x, (pos.y() - top) / scale + y)
+        entry = self.image_cache.get(self.displayed_picture, FULL)
+        if entry is not None:
+            self.show_picture(f'{self.displayed_picture}', FULL, *entry)
+        else:
+            self.statusBar().showMessage('Loading full resolution...', 2000)
+            self.image_loader.request(self.displayed_picture, FULL)
+
+    def open_gallery(self, directory):
+        if self.gallery_watcher.directories():
+            self.gallery_watcher.removePaths(self.gallery_watcher.directories())
+        if Path(directory).is_dir():
+            self.gallery_watcher.addPath(f'{directory}')
+        self.picture_index.open_directory(directory)
+        self.filter_gallery()
+
+    def sync_gallery(self):
+        added, removed, changed = self.picture_index.sync()
+        if added or removed or changed:
+            self.filter_gallery()
+
+    def filter_gallery(self):
+        pic_format = self.gallery_format_combobox.currentText()
+        if self.gallery_profile_combobox.currentIndex() > 0:
+            self.gallery_model.paths = self.catalogue.paths(profile=self.gallery_profile_combobox.currentText())
+        else:
+            self.gallery_model.paths = None
+        self.gallery_model.set_filter(prefix=self.gallery_filter_line_edit.text(),
+                                      pic_format='' if pic_format == 'All' else pic_format,
+                                      sort_order=self.gallery_sort_combobox.currentText())
+        self.gallery_count_label.setText(f'{self.gallery_model.rowCount()} of {len(self.picture_index.pictures)}')
+
+    def show_gallery_picture(self, current):
+        if current.isValid():
+            self.stop_preview()
+            self.show_picture_file(Path(current.data(QtCore.Qt.UserRole)))
+
+    def measure_picture(self):
+        if self.displayed_picture is None:
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Critical)
+            msg.setText('No picture loaded.')
+            msg.setWindowTitle("Error")
+            msg.exec_()
+            return
+        if self.analysis_worker.isRunning():
+            return
+        self.measure_button.setDisabled(True)
+        self.angle_label.setText('Measuring...')
+        parameters = {'method': 'young_laplace' if self.young_laplace_action.isChecked() else 'tangent'}
+        if self.displayed_size is not None:
+            resolution = (self.displayed_size.width(), self.displayed_size.height())
+            parameters.update(analysis_calibration(self.calibration, resolution))
+        self.analysis_worker.set_path(self.displayed_picture, **parameters)
+        self.analysis_worker.start()
+
+    def show_measurement(self, result):
+        if result.fit:
+            self.angle_label.setText(f'{result.angle:.1f}°  Bo {result.fit["bond"]:.3f}  '
+                                     f'({result.confidence:.0%})')
+        else:
+            self.angle_label.setText(f'L {result.left_angle:.1f}°  R {result.right_angle:.1f}°  '
+                                     f'({result.confidence:.0%})')
+        self.displayed_result = result
+        self.render_picture()
+        # the measurement is shown whether or not it can be catalogued
+        try:
+            self.catalogue.record_measurement(self.displayed_picture, result)
+        except sqlite3.Error as error:
+            logging.warning(f'Could not catalogue the measurement of {self.displayed_picture.name}: {error}')
+
+    def toggle_live_measure(self, checked):
+        if checked and self.PREVIEW_RUNNING:
+            self.start_live_measure()
+        elif not checked:
+            self.stop_live_measure()
+
+    def start_live_measure(self):
+        if self.live_worker.isRunning():
+            return
+        self.live_stats = ''
+        self.live_worker.set_window(self.preview_pos)
+        self.live_worker.set_source(self.frame_preview if self.frame_preview.running else None)
+        self.live_worker.start()
+
+    def stop_live_measure(self):
+        if self.live_worker.isRunning():
+            self.live_worker.stop()
+            self.live_worker.wait()
+
+    def toggle_focus_assist(self, visible):
+        if visible and self.PREVIEW_RUNNING:
+            self.start_focus_assist()
+        elif not visible:
+            self.stop_focus_assist()
+
+    def start_focus_assist(self):
+        if self.focus_worker.isRunning():
+            return
+        self.focus_panel.clear()
+        in_window = self.frame_preview.running
+        self.focus_worker.set_source(self.frame_preview if in_window else None)
+        self.frame_preview.set_roi(self.focus_worker.roi if in_window else None)
+        self.focus_worker.start()
+
+    def stop_focus_assist(self):
+        if self.focus_worker.isRunning():
+            self.focus_worker.stop()
+            self.focus_worker.wait()
+        self.frame_preview.set_roi(None)
+
+    def set_focus_roi(self, roi):
+        # sharpness values of different regions do not compare
+        self.focus_worker.set_roi(roi)
+        if self.frame_preview.roi is not None:
+            self.frame_preview.set_roi(roi)
+        self.focus_panel.reset_peak()
+
+    def show_live_result(self, result):
+        if result is None:
+            text = 'No droplet'
+        else:
+            text = f'L {result.left_angle:.1f}°  R {result.right_angle:.1f}°'
+        self.angle_label.setText(f'{text}  {self.live_stats}')
+
+    def show_live_stats(self, stats):
+        self.live_stats = f"({stats['fps']:.0f} fps, {stats['skipped']} skipped)"
+
+    def show_preview_stats(self, stats):
+        self.preview_stats_label.setText(f"Preview {stats['fps']:.0f} fps, {stats['dropped']} dropped")
+
+    def show_measurement_error(self, message):
+        self.angle_label.setText('-')
+        msg = QtWidgets.QMessageBox()
+        msg.setIcon(QtWidgets.QMessageBox.Critical)
+        msg.setText(f'Measurement failed: {message}')
+        msg.setWindowTitle("Error")
+        msg.exec_()
+
     def set_statusbar(self):
         path = Path(self.pic_directory, f"{self.pic_name}_{{timestamp}}.{self.pic_format}")
         self.pic_dir_line_edit.setStatusTip(f'{path}')
@@ -384,60 +988,77 @@ class UI(QtWidgets.QMainWindow):
 
     def save_profile(self):
 
+        calibration = self.current_settings.get('calibration')
         self.current_settings = {'brightness': self.brightness_spinbox.value(),
                                  'sharpness': self.sharpness_spinbox.value(),
                                  'contrast': self.contrast_spinbox.value(),
                                  'saturation': self.saturation_spinbox.value(),
                                  'iso': self.iso_combobox.currentIndex(),
                                  'directory': f'{self.pic_directory}',
+                                 'quality': self.quality,
                                  'filename': self.pic_name,
-                                 'pic_format': self.pic_format_combobox.currentIndex()}
+                                 'pic_format': self.pic_format_combobox.currentIndex(),
+                                 'calibration': calibration}
         profile_name = self.profile_name_line_edit.text()
-        if profile_name == 'default':
+        if not profile_name:
             msg = QtWidgets.QMessageBox()
             msg.setIcon(QtWidgets.QMessageBox.Critical)
-            msg.setText('Can not overwrite default profile')
+            msg.setText('No profile name set.')
             msg.setWindowTitle("Error")
             msg.exec_()
             return
-        if not profile_name:
+        try:
+            position = self.profile_store.save(profile_name, self.current_settings)
+        except (ProfileError, OSError) as error:
             msg = QtWidgets.QMessageBox()
             msg.setIcon(QtWidgets.QMessageBox.Critical)
-            msg.setText('No profile name set.')
+            msg.setText(f'{error}')
             msg.setWindowTitle("Error")
             msg.exec_()
             return
-        path = Path(self.paths['profiles'], f'{profile_name}.json')
-        with open(path, 'w') as save_file:
-            json.dump(self.current_settings, save_file)
-            chown(path, 1000, 1000)
-        self.set_profile_combobox()
+        if position is not None:
+            self.profile_name_combobox.insertItem(position, profile_name)
+        self.set_profile_tooltip(profile_name)
 
     def set_profile_combobox(self):
         self.profile_name_combobox.clear()
-        files = sorted(self.paths['profiles'].glob('*.json'), key=lambda path: path.stem.upper())
-        for file in files:
-            self.profile_name_combobox.addItem(file.stem, file)
+        self.profile_name_combobox.addItems(self.profile_store.names)
+        for name in self.profile_store.names:
+            self.set_profile_tooltip(name)
+
+    def set_profile_tooltip(self, name):
+        index = self.profile_name_combobox.findText(name)
+        directory = self.profile_store.profiles[name]['directory']
+        tooltip = f'Directory not found: {directory}' if name in self.profile_store.missing else directory
+        self.profile_name_combobox.setItemData(index, tooltip, QtCore.Qt.ToolTipRole)
 
     def load_profile(self):
-        path = self.profile_name_combobox.currentData()
-        try:
-            with open(path, 'r') as load_file:
-                self.current_settings = json.load(load_file)
-        except TypeError:
+        name = self.profile_name_combobox.currentText()
+        if name not in self.profile_store:
             msg = QtWidgets.QMessageBox()
             msg.setIcon(QtWidgets.QMessageBox.Critical)
             msg.setText('No profile selected.')
             msg.setWindowTitle("Error")
             msg.exec_()
             return
-        self.profile_name_line_edit.setText(path.stem)
+        self.current_settings = self.profile_store.get(name)
+        if not self.profile_store.directory_available(name):
+            # e.g. an unplugged USB stick, keep capturing into the current directory
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Warning)
+            msg.setText(f"The directory of the profile {name} does not exist:\n{self.current_settings['directory']}\n"
+                        f'Pictures are saved in {self.pic_directory} instead.')
+            msg.setWindowTitle("Warning")
+            msg.exec_()
+            self.current_settings['directory'] = f'{self.pic_directory}'
+        self.profile_name_line_edit.setText(name)
+        self.current_profile = name
         self.set_values()
 
     def delete_profile(self):
 
         profile = self.profile_name_combobox.currentText()
-        if profile == 'default':
+        if profile == DEFAULT_PROFILE:
             msg = QtWidgets.QMessageBox()
             msg.setIcon(QtWidgets.QMessageBox.Critical)
             msg.setText('Can not delete default profile')
@@ -451,61 +1072,91 @@ class UI(QtWidgets.QMainWindow):
             msg.setWindowTitle("Error")
             msg.exec_()
             return
-        path = Path(self.paths['profiles'], f'{profile}.json')
         qm = QtWidgets.QMessageBox()
 
         ret = qm.question(self, 'Warning', f'Are you sure you want to delete the profile: '
                                            f'{profile}', qm.Yes | qm.No)
 
         if ret == qm.Yes:
-            if path.is_file():
-                path.unlink()
-                self.FILE_DELETED.emit()
-            else:
+            try:
+                position = self.profile_store.delete(profile)
+            except (ProfileError, OSError) as error:
                 msg = QtWidgets.QMessageBox()
                 msg.setIcon(QtWidgets.QMessageBox.Critical)
-                msg.setText('No profile selected.')
+                msg.setText(f'{error}')
                 msg.setWindowTitle("Error")
                 msg.exec_()
                 return
+            self.profile_name_combobox.removeItem(position)
+            self.FILE_DELETED.emit()
         else:
             return
 
     def eventFilter(self, a0: 'QtCore.QObject', a1: 'QtCore.QEvent') -> bool:
+        if a0 is self.picture_label:
+            if a1.type() == QtCore.QEvent.MouseButtonDblClick:
+                self.toggle_zoom(a1.pos())
+                return True
+            return False
+        if self.cam is None or self.frame_preview.running:
+            # the in-window preview moves and hides with the window
+            return False
         if a1.type() == QtCore.QEvent.WindowDeactivate:
+            self.stop_live_measure()
+            self.stop_focus_assist()
             self.cam.stop_preview()
             self.PREVIEW_RUNNING = False
             self.preview_button.setChecked(False)
         if a1.type() == QtCore.QEvent.WindowStateChange:
+            self.stop_live_measure()
+            self.stop_focus_assist()
             self.cam.stop_preview()
             self.PREVIEW_RUNNING = False
             self.preview_button.setChecked(False)
         return False
 
     def closeEvent(self, a0):
+        if self.camera_opener is not None:
+            self.camera_opener.wait()
+        self.stop_live_measure()
+        self.stop_focus_assist()
+        self.frame_preview.stop()
+        # finish writing captures that are still in the pipeline
+        self.pipeline.close(wait=True)
+        self.image_loader.stop()
+        self.image_loader.wait()
+        self.thumbnail_loader.stop()
+        self.thumbnail_loader.wait()
+        self.picture_index.close()
+        self.catalogue.close()
+        logging.getLogger().removeHandler(self.log_handler)
+        if self.service is not None:
+            self.cam.close()
         sys.stdout = sys.__stdout__
         sys.stderr = sys.__stderr__
 
     def move_preview_x(self, value):
-        if self.cam.preview:
+        if self.cam is not None and self.cam.preview:
             self.X_OFFSET = value
             preview_pos = (self.preview_pos[0] + value,
                            self.preview_pos[1],
                            self.preview_pos[2],
                            self.preview_pos[3])
             self.cam.preview.window = preview_pos
+            self.live_worker.set_window(preview_pos)
         else:
             self.X_OFFSET = 0
             self.x_offset_slider.setValue(0)
 
     def move_preview_y(self, value):
-        if self.cam.preview:
+        if self.cam is not None and self.cam.preview:
             self.Y_OFFSET = value
             preview_pos = (self.preview_pos[0],
                            self.preview_pos[1] + value,
                            self.preview_pos[2],
                            self.preview_pos[3])
             self.cam.preview.window = preview_pos
+            self.live_worker.set_window(preview_pos)
         else:
             self.Y_OFFSET = 0
             self.y_offset_slider.setValue(0)
@@ -517,24 +1168,26 @@ class UI(QtWidgets.QMainWindow):
         self.quality_label.setEnabled(flag)
 
     def set_brightness(self, value):
-        self.cam.brightness = value
+        self.settings_controller.set('brightness', value)
 
     def set_sharpness(self, value):
-        self.cam.sharpness = value
+        self.settings_controller.set('sharpness', value)
 
     def set_contrast(self, value):
-        self.cam.contrast = value
+        self.settings_controller.set('contrast', value)
 
     def set_saturation(self, value):
-        self.cam.saturation = value
+        self.settings_controller.set('saturation', value)
 
     def set_iso(self, index):
-        self.cam.iso = self.iso_combobox.itemData(index)
+        self.settings_controller.set('iso', self.iso_combobox.itemData(index))
 
     def set_quality(self, value):
         self.quality = value
 
     def preview(self):
+        if self.cam is None:
+            return
 
         # possible way to resize window and set preview window accordingly
         self.preview_pos = (self.preview_frame.geometry().x() + self.X_OFFSET,
@@ -551,18 +1204,47 @@ class UI(QtWidgets.QMainWindow):
     def start_preview(self):
         self.preview_status_info.setText('ON')
         self.preview_status_info.setPalette(self.green)
-        self.x_offset_slider.setValue(self.X_OFFSET)
-        self.y_offset_slider.setValue(self.Y_OFFSET)
-        self.cam.start_preview(fullscreen=False, window=self.preview_pos)
+        in_window = self.frame_preview_action.isChecked()
+        for slider in (self.x_offset_slider, self.y_offset_slider):
+            slider.setEnabled(not in_window)
+        if in_window:
+            self.frame_preview.show()
+            self.frame_preview.raise_()
+            self.frame_preview.start(self.cam)
+            self.preview_stats_label.setText('')
+            self.preview_stats_label.show()
+        else:
+            self.x_offset_slider.setValue(self.X_OFFSET)
+            self.y_offset_slider.setValue(self.Y_OFFSET)
+            self.cam.start_preview(fullscreen=False, window=self.preview_pos)
         self.PREVIEW_RUNNING = True
+        if self.live_button.isChecked():
+            self.start_live_measure()
+        if self.focus_panel.isVisible():
+            self.start_focus_assist()
 
     def stop_preview(self):
         self.preview_status_info.setText('OFF')
         self.preview_status_info.setPalette(self.red)
-        self.cam.stop_preview()
+        self.stop_live_measure()
+        self.stop_focus_assist()
+        if self.frame_preview.running:
+            self.frame_preview.stop()
+            self.frame_preview.hide()
+            self.preview_stats_label.hide()
+        elif self.cam is not None:
+            self.cam.stop_preview()
         self.PREVIEW_RUNNING = False
 
+    def switch_preview(self):
+        # a running preview continues the other way
+        if self.PREVIEW_RUNNING:
+            self.stop_preview()
+            self.start_preview()
+
     def toggle_preview(self):
+        if self.cam is None:
+            return
         if self.PREVIEW_RUNNING:
             self.preview_button.setChecked(False)
             self.stop_preview()
@@ -571,20 +1253,107 @@ class UI(QtWidgets.QMainWindow):
             self.start_preview()
 
     def take_pic(self):
+        if self.cam is None or self.burst_worker.isRunning():
+            return
         self.groupbox_settings.setDisabled(True)
         settings = {'directory': self.pic_directory,
                     'name': self.pic_name,
                     'format': self.pic_format,
-                    'quality': self.quality}
+                    'quality': self.quality,
+                    'profile': self.current_profile,
+                    'session': self.session,
+                    'triggered': time.perf_counter(),
+                    'focus': self.focus_worker.latest()}
         self.CAMERA_SETTINGS.emit(settings)
 
         self.take_pic_button.setDisabled(True)
+        self.burst_button.setDisabled(True)
         self.worker.start()
-        self.worker.finished.connect(self.evt_worker_finished)
+
+    def take_burst(self):
+        if self.cam is None or self.worker.isRunning() or self.burst_worker.isRunning():
+            return
+        mode = BURST_MODES[self.burst_stack_combobox.currentIndex()]
+        stack = mode if mode in STACK_MODES else None
+        message = None
+        if stack and self.pic_format not in ENCODED_FORMATS and self.pic_format not in RAW_FORMATS:
+            message = f'Stacked pictures cannot be saved as {self.pic_format}'
+        elif stack and stack != 'mean' and self.burst_frames_spinbox.value() > FrameStack.MAX_STORED_FRAMES:
+            message = (f'{stack.capitalize()} stacking keeps every frame in memory, '
+                       f'use at most {FrameStack.MAX_STORED_FRAMES} frames')
+        if message:
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Critical)
+            msg.setText(message)
+            msg.setWindowTitle("Error")
+            msg.exec_()
+            return
+        self.groupbox_settings.setDisabled(True)
+        settings = {'directory': self.pic_directory,
+                    'name': self.pic_name,
+                    'format': self.pic_format,
+                    'quality': self.quality,
+                    'profile': self.current_profile,
+                    'session': self.session,
+                    'frames': self.burst_frames_spinbox.value(),
+                    'interval': self.burst_interval_spinbox.value() / 1000,
+                    'stack': stack,
+                    'sequence': mode == 'sequence',
+                    'focus': self.focus_worker.latest()}
+        self.BURST_SETTINGS.emit(settings)
+
+        self.take_pic_button.setDisabled(True)
+        self.burst_button.setDisabled(True)
+        self.burst_status_label.setText('-')
+        self.burst_worker.start()
+
+    def set_burst_status(self, stats):
+        if stats.get('frames') is not None:
+            self.burst_status_label.setText(f"{stats['frames']} frames in {Path(stats['path']).name}")
+            return
+        if stats.get('combine'):
+            self.burst_status_label.setText(f"{stats['captured']} frames, {stats['mode']} "
+                                            f"in {stats['combine'] * 1000:.0f} ms")
+            return
+        self.burst_status_label.setText(f"{stats['achieved_fps']:.1f} / {stats['requested_fps']:.1f} fps, "
+                                        f"{stats['dropped']} dropped")
+
+    def capture_saved(self, timings):
+        # called on a pipeline thread, the file is written already whether or not it can be catalogued
+        try:
+            self.catalogue.record_capture(timings['path'], timings['metadata'], timings)
+        except sqlite3.Error as error:
+            logging.warning(f'Could not catalogue {timings["path"].name}: {error}')
+        self.PIPELINE_DONE.emit(timings)
+
+    def set_pipeline_status(self, timings):
+        self.pipeline_status_label.setText(f"Saved {timings['path'].name}: "
+                                           f"encode {timings['encode'] * 1000:.0f} ms, "
+                                           f"write {timings['write'] * 1000:.0f} ms, "
+                                           f"queue {timings['queue_depth']}")
+        profile = timings['metadata'].get('profile')
+        if profile and self.gallery_profile_combobox.findText(profile) < 0:
+            self.gallery_profile_combobox.addItem(profile)
+
+    def show_settle_time(self, timings):
+        if timings['settled']:
+            self.statusBar().showMessage(f"Exposure settled in {timings['settle']:.2f} s "
+                                         f"({timings['settle_frames']} frames)", 5000)
+        elif timings['settle_frames']:
+            self.statusBar().showMessage(f"Exposure did not settle within {timings['settle']:.1f} s, "
+                                         f"captured anyway", 5000)
+
+    def show_capture_error(self, message):
+        msg = QtWidgets.QMessageBox()
+        msg.setIcon(QtWidgets.QMessageBox.Critical)
+        msg.setText(f'Capture failed: {message}')
+        msg.setWindowTitle("Error")
+        msg.exec_()
 
     def evt_worker_finished(self):
         self.groupbox_settings.setDisabled(False)
         self.take_pic_button.setDisabled(False)
+        self.burst_button.setDisabled(False)
 
     def set_timestamp(self, timestamp):
         self.timestamp = timestamp
@@ -597,22 +1366,93 @@ class UI(QtWidgets.QMainWindow):
     def resize_window(self):
         self.showMaximized()
 
+    def apply_camera_settings(self, settings, title):
+        # widgets are updated with their signals blocked, the camera gets all changed values in one batch
+        start = time.perf_counter()
+        for name in CAMERA_SETTINGS[:4]:
+            for widget in (getattr(self, f'{name}_slider'), getattr(self, f'{name}_spinbox')):
+                with QtCore.QSignalBlocker(widget):
+                    widget.setValue(settings[name])
+        with QtCore.QSignalBlocker(self.iso_combobox):
+            self.iso_combobox.setCurrentIndex(settings['iso'])
+        camera_settings = {name: settings[name] for name in CAMERA_SETTINGS[:4]}
+        camera_settings['iso'] = self.iso_combobox.itemData(settings['iso'])
+        applied = self.settings_controller.apply(camera_settings)
+        if applied is None:
+            waiting_for = 'the running capture' if self.cam is not None else 'the camera is open'
+            self.statusBar().showMessage(f'{title} will be applied after {waiting_for}', 5000)
+            return
+        METRICS.record('profile.apply', time.perf_counter() - start)
+        self.statusBar().showMessage(f'{title} applied in {(time.perf_counter() - start) * 1000:.1f} ms, '
+                                     f'{len(applied[0])} camera settings changed', 5000)
+
     def reset_values(self):
-        self.brightness_spinbox.setValue(self.default_settings['brightness'])
-        self.sharpness_spinbox.setValue(self.default_settings['sharpness'])
-        self.contrast_spinbox.setValue(self.default_settings['contrast'])
-        self.saturation_spinbox.setValue(self.default_settings['saturation'])
-        self.iso_combobox.setCurrentIndex(0)
+        self.apply_camera_settings({**self.default_settings, 'iso': 0}, 'Default settings')
         self.quality_spinbox.setValue(self.default_settings['quality'])
 
     def set_values(self):
-        self.brightness_spinbox.setValue(self.current_settings['brightness'])
-        self.sharpness_spinbox.setValue(self.current_settings['sharpness'])
-        self.contrast_spinbox.setValue(self.current_settings['contrast'])
-        self.saturation_spinbox.setValue(self.current_settings['saturation'])
-        self.iso_combobox.setCurrentIndex(self.current_settings['iso'])
+        self.apply_camera_settings(self.current_settings, f'Profile {self.profile_name_line_edit.text()}')
+        self.quality_spinbox.setValue(self.current_settings['quality'])
         _dir = Path(self.current_settings['directory'])
         _dir_str = Path('..', _dir.parent.name, _dir.stem)
         self.pic_dir_line_edit.setText(f"{_dir_str}")
+        if _dir != self.pic_directory:
+            self.pic_directory = _dir
+            self.set_statusbar()
+            self.open_gallery(self.pic_directory)
         self.pic_name_line_edit.setText(self.current_settings['filename']),
         self.pic_format_combobox.setCurrentIndex(self.current_settings['pic_format'])
+        self.set_calibration(self.current_settings['calibration'])
+
+    def set_calibration(self, data):
+        # displayed pictures, the in-window preview and all measurements use the calibration of the loaded profile
+        try:
+            self.calibration = calibration_from_dict(data)
+        except CalibrationError as error:
+            logging.warning(f'{error}')
+            self.calibration = None
+        self.image_loader.set_calibration(self.calibration, self.paths['profiles'])
+        self.frame_preview.set_calibration(self.calibration, self.paths['profiles'])
+        self.live_worker.calibration = self.calibration
+        if self.displayed_picture is not None:
+            self.show_picture_file(self.displayed_picture)
+
+    def calibrate_profile(self):
+        if self.displayed_picture is None or self.current_profile not in self.profile_store:
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Critical)
+            msg.setText('No picture loaded.' if self.displayed_picture is None else 'No profile selected.')
+            msg.setWindowTitle("Error")
+            msg.exec_()
+            return
+        if self.current_profile == DEFAULT_PROFILE:
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Critical)
+            msg.setText('Can not calibrate the default profile, save the settings as a profile first.')
+            msg.setWindowTitle("Error")
+            msg.exec_()
+            return
+        pitch, accepted = QtWidgets.QInputDialog.getDouble(self, 'Calibration', 'Distance of neighbouring dots (mm):',
+                                                           1.0, 0.01, 100.0, 3)
+        if not accepted:
+            return
+        try:
+            with METRICS.span('calibration'):
+                calibration = calibrate(load_grayscale(self.displayed_picture), pitch)
+                # the table for full resolution pictures is ready before the first one is shown
+                load_remap_table(calibration, calibration.resolution, self.paths['profiles'])
+            settings = {**self.profile_store.get(self.current_profile), 'calibration': calibration._asdict()}
+            self.profile_store.save(self.current_profile, settings)
+        except (CalibrationError, ProfileError, OSError) as error:
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Critical)
+            msg.setText(f'Calibration failed: {error}')
+            msg.setWindowTitle("Error")
+            msg.exec_()
+            return
+        self.current_settings['calibration'] = settings['calibration']
+        self.set_calibration(settings['calibration'])
+        self.statusBar().showMessage(f'Profile {self.current_profile} calibrated: '
+                                     f'{calibration.pixel_size * 1e6:.2f} µm/pixel, k1 {calibration.k1:.4f}, '
+                                     f'k2 {calibration.k2:.4f} ({calibration.dots} dots, '
+                                     f'{calibration.rms:.2f} pixels rms)', 10000)
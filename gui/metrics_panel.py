@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from PyQt5 import QtCore, QtWidgets
+
+from monitoring.metrics import METRICS, QUANTILES
+from storage.ownership import chown_pi
+
+COLUMNS = ('Stage', 'Count', *(f'p{q * 100:g}' for q in QUANTILES), 'Max')
+
+
+class MetricsPanel(QtWidgets.QDockWidget):
+    # Stage timings of this session next to the log. The table is only refreshed while the panel is visible,
+    # the numbers can be exported for the rig monitoring (JSON or Prometheus text format).
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, parent, log_widget, metrics=METRICS):
+        super().__init__('Metrics and log', parent)
+        self.metrics = metrics
+        self.setObjectName('metrics_dock')
+        self.table = QtWidgets.QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        self.export_json_button = QtWidgets.QPushButton('Export JSON')
+        self.export_prometheus_button = QtWidgets.QPushButton('Export Prometheus')
+        self.reset_button = QtWidgets.QPushButton('Reset')
+        buttons = QtWidgets.QHBoxLayout()
+        for button in (self.export_json_button, self.export_prometheus_button, self.reset_button):
+            buttons.addWidget(button)
+        buttons.addStretch()
+        metrics_tab = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(metrics_tab)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        self.tabs = QtWidgets.QTabWidget()
+        self.tabs.addTab(metrics_tab, 'Metrics')
+        self.tabs.addTab(log_widget, 'Log')
+        self.setWidget(self.tabs)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.REFRESH_INTERVAL)
+
+        # connections
+        self.timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.set_refreshing)
+        self.export_json_button.clicked.connect(lambda: self.export('JSON (*.json)', self.metrics.to_json))
+        self.export_prometheus_button.clicked.connect(lambda: self.export('Prometheus (*.prom)',
+                                                                          self.metrics.to_prometheus))
+        self.reset_button.clicked.connect(self.reset)
+
+    def set_refreshing(self, visible):
+        if visible:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        snapshot = self.metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (stage, summary) in enumerate(snapshot.items()):
+            values = (stage, f'{summary["count"]}',
+                      *(f'{summary[f"p{q * 100:g}"] * 1000:.1f} ms' for q in QUANTILES),
+                      f'{summary["max"] * 1000:.1f} ms')
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def export(self, name_filter, render):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export metrics', '', name_filter)
+        if not path:
+            return
+        try:
+            Path(path).write_text(render())
+            chown_pi(path)
+        except OSError as error:
+            msg = QtWidgets.QMessageBox()
+            msg.setIcon(QtWidgets.QMessageBox.Critical)
+            msg.setText(f'Could not export the metrics: {error}')
+            msg.setWindowTitle("Error")
+            msg.exec_()
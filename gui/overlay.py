@@ -0,0 +1,45 @@
+import math
+
+from PyQt5 import QtCore, QtGui
+
+
+def tangent_lines(result, length):
+    # tangents start at the contact points and enclose the contact angle with the baseline inside the drop
+    (x0, y0), (x1, y1) = result.baseline
+    alpha = math.atan2(y1 - y0, x1 - x0)
+    along, up = (math.cos(alpha), math.sin(alpha)), (math.sin(alpha), -math.cos(alpha))
+    lines = []
+    for (x, y), angle, sign in ((result.left_contact, result.left_angle, 1),
+                                (result.right_contact, result.right_angle, -1)):
+        theta = math.radians(angle)
+        dx = sign * math.cos(theta) * along[0] + math.sin(theta) * up[0]
+        dy = sign * math.cos(theta) * along[1] + math.sin(theta) * up[1]
+        lines.append(QtCore.QLineF(x, y, x + dx * length, y + dy * length))
+    return lines
+
+
+def draw_measurement(painter, result, scale=1.0):
+    # result coordinates are image pixels, scale maps them onto the paint device
+    painter.save()
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    painter.scale(scale, scale)
+    width = max(1.0, 2 / scale)
+    (x0, y0), (x1, y1) = result.baseline
+    painter.setPen(QtGui.QPen(QtCore.Qt.yellow, width))
+    painter.drawLine(QtCore.QLineF(x0, y0, x1, y1))
+    painter.setPen(QtGui.QPen(QtCore.Qt.green, width))
+    painter.drawPolyline(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in result.contour]))
+    contact_width = math.hypot(result.right_contact[0] - result.left_contact[0],
+                               result.right_contact[1] - result.left_contact[1])
+    painter.setPen(QtGui.QPen(QtCore.Qt.red, width))
+    for line in tangent_lines(result, max(20.0, 0.4 * contact_width)):
+        painter.drawLine(line)
+    font = painter.font()
+    font.setPointSizeF(14 / scale)
+    painter.setFont(font)
+    for (x, y), angle, flags in ((result.left_contact, result.left_angle, QtCore.Qt.AlignRight),
+                                 (result.right_contact, result.right_angle, QtCore.Qt.AlignLeft)):
+        box = QtCore.QRectF(x - 200 / scale if flags == QtCore.Qt.AlignRight else x, y - 40 / scale,
+                            200 / scale, 30 / scale)
+        painter.drawText(box, flags | QtCore.Qt.AlignVCenter, f'{angle:.1f}°')
+    painter.restore()
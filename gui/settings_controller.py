@@ -0,0 +1,50 @@
+import time
+
+from PyQt5 import QtCore
+
+
+class SettingsController(QtCore.QObject):
+    # Collects slider and spin box changes and writes the newest values at most every INTERVAL ms, dragging a
+    # slider no longer sends every single tick to the camera. Profiles are written at once with apply().
+    # The GUI thread never waits for a running capture, the values are written after it instead. Until the
+    # camera is open (attach), all changes are kept pending.
+    APPLIED = QtCore.pyqtSignal(dict, float)
+    INTERVAL = 60
+
+    def __init__(self, camera_settings=None):
+        super().__init__()
+        self.camera_settings = camera_settings
+        self.pending = {}
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.INTERVAL)
+        self.timer.timeout.connect(self.flush)
+
+    def attach(self, camera_settings):
+        self.camera_settings = camera_settings
+        return self.flush()
+
+    def set(self, name, value):
+        self.pending[name] = value
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def apply(self, settings):
+        # pending slider values are superseded by the batch
+        self.timer.stop()
+        self.pending.update(settings)
+        return self.flush()
+
+    def flush(self):
+        # (written settings, seconds), None while a capture is running or the camera is not open yet
+        if self.camera_settings is None:
+            return None
+        start = time.perf_counter()
+        changes = self.camera_settings.apply(self.pending, blocking=False)
+        if changes is None:
+            self.timer.start()
+            return None
+        seconds = time.perf_counter() - start
+        self.pending = {}
+        self.APPLIED.emit(changes, seconds)
+        return changes, seconds
@@ -0,0 +1,25 @@
+import sys
+import time
+
+
+class StartupProfile:
+    # Wall time of the startup phases for --profile-startup. mark() closes the phase that ran since the previous
+    # mark, add() records phases that ran in the background (e.g. opening the camera) next to them.
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last, False))
+        self.last = now
+
+    def add(self, phase, seconds):
+        self.phases.append((phase, seconds, True))
+
+    def report(self, file=sys.stderr):
+        print('Startup profile', file=file)
+        for phase, seconds, background in self.phases:
+            print(f'  {phase:<32} {seconds * 1000:8.1f} ms{"  (background)" if background else ""}', file=file)
+        print(f'  {"total":<32} {(time.perf_counter() - self.start) * 1000:8.1f} ms', file=file)
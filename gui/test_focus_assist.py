@@ -0,0 +1,32 @@
+import time
+
+from PyQt5 import QtCore
+
+from gui.focus_assist import FocusAssistThread
+
+
+def test_stop_right_after_start(qapp, cam):
+    # stop() may come before the thread is scheduled, the window waits for it when the panel is closed
+    worker = FocusAssistThread(cam)
+    for _ in range(20):
+        worker.start()
+        worker.stop()
+        assert worker.wait(5000)
+    assert worker.latest() is None
+
+
+def test_measures_until_stopped(qapp, cam):
+    worker = FocusAssistThread(cam)
+    stats = []
+    # there is no event loop to deliver queued signals
+    worker.STATS.connect(stats.append, QtCore.Qt.DirectConnection)
+    worker.start()
+    try:
+        deadline = time.perf_counter() + 5
+        while not stats and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert worker.isRunning() and worker.latest() is not None
+    finally:
+        worker.stop()
+        assert worker.wait(5000)
+    assert 0 <= stats[0]['mean'] <= 255
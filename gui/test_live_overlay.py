@@ -0,0 +1,10 @@
+from gui.live_overlay import LiveMeasureThread
+
+
+def test_stop_right_after_start(qapp, cam):
+    # stop() may come before the thread is scheduled, the window waits for it when the measurement is switched off
+    worker = LiveMeasureThread(cam)
+    for _ in range(20):
+        worker.start()
+        worker.stop()
+        assert worker.wait(5000)
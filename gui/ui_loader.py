@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# Qt Designer files are compiled into Python modules ahead of time, parsing the XML at every start is slow
+# on the Pi. Compile after editing a .ui file, run from the repository root:
+#   python -m gui.ui_loader [name ...]
+
+import hashlib
+import importlib
+import io
+import sys
+from pathlib import Path
+
+UI_DIRECTORY = Path(__file__).resolve().parent.parent / 'ui'
+
+
+def ui_hash(source):
+    return hashlib.sha1(source.read_bytes()).hexdigest()
+
+
+def compiled_path(name):
+    return Path(__file__).with_name(f'ui_{name}.py')
+
+
+def compile_ui(name):
+    from PyQt5 import uic
+    source = Path(UI_DIRECTORY, f'{name}.ui')
+    code = io.StringIO()
+    uic.compileUi(f'{source}', code)
+    with open(compiled_path(name), 'w') as output:
+        # the header names the .ui file, relative so the module does not depend on the checkout location
+        output.write(code.getvalue().replace(f'{source}', f'{source.relative_to(UI_DIRECTORY.parent)}', 1))
+        # a module compiled from an older version of the .ui file is ignored by load_ui
+        output.write(f"\nSOURCE_HASH = '{ui_hash(source)}'\n")
+    return compiled_path(name)
+
+
+def load_ui(window, name):
+    # True when the compiled module was used, False when the .ui file had to be parsed
+    source = Path(UI_DIRECTORY, f'{name}.ui')
+    try:
+        module = importlib.import_module(f'gui.ui_{name}')
+    except ImportError:
+        module = None
+    if module is not None and getattr(module, 'SOURCE_HASH', None) == ui_hash(source):
+        form = next(value for key, value in vars(module).items() if key.startswith('Ui_'))()
+        form.setupUi(window)
+        # like uic.loadUi, every named widget becomes an attribute of the window
+        for attribute, widget in vars(form).items():
+            setattr(window, attribute, widget)
+        return True
+    from PyQt5 import uic
+    uic.loadUi(f'{source}', window)
+    return False
+
+
+if __name__ == '__main__':
+    for ui_name in sys.argv[1:] or ['main_window']:
+        print(compile_ui(ui_name))
@@ -0,0 +1,1107 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'ui/main_window.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.setEnabled(True)
+        MainWindow.resize(2034, 1094)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(MainWindow.sizePolicy().hasHeightForWidth())
+        MainWindow.setSizePolicy(sizePolicy)
+        MainWindow.setAutoFillBackground(False)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.settings_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.settings_groupbox.setGeometry(QtCore.QRect(10, 40, 611, 431))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.settings_groupbox.sizePolicy().hasHeightForWidth())
+        self.settings_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.settings_groupbox.setFont(font)
+        self.settings_groupbox.setAutoFillBackground(True)
+        self.settings_groupbox.setObjectName("settings_groupbox")
+        self.layoutWidget = QtWidgets.QWidget(self.settings_groupbox)
+        self.layoutWidget.setGeometry(QtCore.QRect(10, 30, 591, 251))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.layoutWidget.sizePolicy().hasHeightForWidth())
+        self.layoutWidget.setSizePolicy(sizePolicy)
+        self.layoutWidget.setAutoFillBackground(True)
+        self.layoutWidget.setObjectName("layoutWidget")
+        self.gridLayout = QtWidgets.QGridLayout(self.layoutWidget)
+        self.gridLayout.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
+        self.gridLayout.setContentsMargins(6, 0, 0, 0)
+        self.gridLayout.setObjectName("gridLayout")
+        self.contrast_slider = QtWidgets.QSlider(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.contrast_slider.sizePolicy().hasHeightForWidth())
+        self.contrast_slider.setSizePolicy(sizePolicy)
+        self.contrast_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.contrast_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.contrast_slider.setAutoFillBackground(True)
+        self.contrast_slider.setMinimum(-100)
+        self.contrast_slider.setMaximum(100)
+        self.contrast_slider.setPageStep(1)
+        self.contrast_slider.setProperty("value", 0)
+        self.contrast_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.contrast_slider.setTickPosition(QtWidgets.QSlider.TicksBothSides)
+        self.contrast_slider.setTickInterval(20)
+        self.contrast_slider.setObjectName("contrast_slider")
+        self.gridLayout.addWidget(self.contrast_slider, 2, 3, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(1, 1, QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem, 3, 2, 1, 1)
+        self.brightness_slider = QtWidgets.QSlider(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.brightness_slider.sizePolicy().hasHeightForWidth())
+        self.brightness_slider.setSizePolicy(sizePolicy)
+        self.brightness_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.brightness_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.brightness_slider.setAutoFillBackground(True)
+        self.brightness_slider.setMaximum(100)
+        self.brightness_slider.setPageStep(1)
+        self.brightness_slider.setProperty("value", 50)
+        self.brightness_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.brightness_slider.setTickPosition(QtWidgets.QSlider.TicksBothSides)
+        self.brightness_slider.setTickInterval(10)
+        self.brightness_slider.setObjectName("brightness_slider")
+        self.gridLayout.addWidget(self.brightness_slider, 0, 3, 1, 1)
+        spacerItem1 = QtWidgets.QSpacerItem(1, 1, QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem1, 0, 2, 1, 1)
+        self.iso_label = QtWidgets.QLabel(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.iso_label.sizePolicy().hasHeightForWidth())
+        self.iso_label.setSizePolicy(sizePolicy)
+        self.iso_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.iso_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.iso_label.setFont(font)
+        self.iso_label.setAutoFillBackground(True)
+        self.iso_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.iso_label.setObjectName("iso_label")
+        self.gridLayout.addWidget(self.iso_label, 4, 0, 1, 1)
+        self.contrast_label = QtWidgets.QLabel(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.contrast_label.sizePolicy().hasHeightForWidth())
+        self.contrast_label.setSizePolicy(sizePolicy)
+        self.contrast_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.contrast_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.contrast_label.setFont(font)
+        self.contrast_label.setAutoFillBackground(True)
+        self.contrast_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.contrast_label.setObjectName("contrast_label")
+        self.gridLayout.addWidget(self.contrast_label, 2, 0, 1, 1)
+        self.sharpness_slider = QtWidgets.QSlider(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.sharpness_slider.sizePolicy().hasHeightForWidth())
+        self.sharpness_slider.setSizePolicy(sizePolicy)
+        self.sharpness_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.sharpness_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.sharpness_slider.setAutoFillBackground(True)
+        self.sharpness_slider.setMinimum(-100)
+        self.sharpness_slider.setMaximum(100)
+        self.sharpness_slider.setPageStep(1)
+        self.sharpness_slider.setProperty("value", 0)
+        self.sharpness_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.sharpness_slider.setTickPosition(QtWidgets.QSlider.TicksBothSides)
+        self.sharpness_slider.setTickInterval(20)
+        self.sharpness_slider.setObjectName("sharpness_slider")
+        self.gridLayout.addWidget(self.sharpness_slider, 1, 3, 1, 1)
+        self.saturation_slider = QtWidgets.QSlider(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.saturation_slider.sizePolicy().hasHeightForWidth())
+        self.saturation_slider.setSizePolicy(sizePolicy)
+        self.saturation_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.saturation_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.saturation_slider.setAutoFillBackground(True)
+        self.saturation_slider.setMinimum(-100)
+        self.saturation_slider.setMaximum(100)
+        self.saturation_slider.setPageStep(1)
+        self.saturation_slider.setProperty("value", 0)
+        self.saturation_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.saturation_slider.setTickPosition(QtWidgets.QSlider.TicksBothSides)
+        self.saturation_slider.setTickInterval(20)
+        self.saturation_slider.setObjectName("saturation_slider")
+        self.gridLayout.addWidget(self.saturation_slider, 3, 3, 1, 1)
+        self.brightness_spinbox = QtWidgets.QSpinBox(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.brightness_spinbox.sizePolicy().hasHeightForWidth())
+        self.brightness_spinbox.setSizePolicy(sizePolicy)
+        self.brightness_spinbox.setMinimumSize(QtCore.QSize(110, 37))
+        self.brightness_spinbox.setMaximumSize(QtCore.QSize(110, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.brightness_spinbox.setFont(font)
+        self.brightness_spinbox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.brightness_spinbox.setAutoFillBackground(True)
+        self.brightness_spinbox.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.brightness_spinbox.setMaximum(100)
+        self.brightness_spinbox.setProperty("value", 50)
+        self.brightness_spinbox.setObjectName("brightness_spinbox")
+        self.gridLayout.addWidget(self.brightness_spinbox, 0, 1, 1, 1)
+        self.reset_button = QtWidgets.QPushButton(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.reset_button.sizePolicy().hasHeightForWidth())
+        self.reset_button.setSizePolicy(sizePolicy)
+        self.reset_button.setMinimumSize(QtCore.QSize(320, 37))
+        self.reset_button.setMaximumSize(QtCore.QSize(320, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.reset_button.setFont(font)
+        self.reset_button.setAutoFillBackground(True)
+        self.reset_button.setObjectName("reset_button")
+        self.gridLayout.addWidget(self.reset_button, 4, 3, 1, 1)
+        self.iso_combobox = QtWidgets.QComboBox(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.iso_combobox.sizePolicy().hasHeightForWidth())
+        self.iso_combobox.setSizePolicy(sizePolicy)
+        self.iso_combobox.setMinimumSize(QtCore.QSize(110, 37))
+        self.iso_combobox.setMaximumSize(QtCore.QSize(110, 37))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        font.setStrikeOut(False)
+        font.setKerning(True)
+        self.iso_combobox.setFont(font)
+        self.iso_combobox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.iso_combobox.setAutoFillBackground(True)
+        self.iso_combobox.setSizeAdjustPolicy(QtWidgets.QComboBox.AdjustToContents)
+        self.iso_combobox.setObjectName("iso_combobox")
+        self.gridLayout.addWidget(self.iso_combobox, 4, 1, 1, 1)
+        spacerItem2 = QtWidgets.QSpacerItem(1, 1, QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem2, 1, 2, 1, 1)
+        spacerItem3 = QtWidgets.QSpacerItem(1, 1, QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem3, 4, 2, 1, 1)
+        self.brightness_label = QtWidgets.QLabel(self.layoutWidget)
+        self.brightness_label.setEnabled(True)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.brightness_label.sizePolicy().hasHeightForWidth())
+        self.brightness_label.setSizePolicy(sizePolicy)
+        self.brightness_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.brightness_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.brightness_label.setFont(font)
+        self.brightness_label.setAutoFillBackground(True)
+        self.brightness_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.brightness_label.setObjectName("brightness_label")
+        self.gridLayout.addWidget(self.brightness_label, 0, 0, 1, 1)
+        self.saturation_label = QtWidgets.QLabel(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.saturation_label.sizePolicy().hasHeightForWidth())
+        self.saturation_label.setSizePolicy(sizePolicy)
+        self.saturation_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.saturation_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.saturation_label.setFont(font)
+        self.saturation_label.setAutoFillBackground(True)
+        self.saturation_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.saturation_label.setObjectName("saturation_label")
+        self.gridLayout.addWidget(self.saturation_label, 3, 0, 1, 1)
+        self.sharpness_spinbox = QtWidgets.QSpinBox(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.sharpness_spinbox.sizePolicy().hasHeightForWidth())
+        self.sharpness_spinbox.setSizePolicy(sizePolicy)
+        self.sharpness_spinbox.setMinimumSize(QtCore.QSize(110, 37))
+        self.sharpness_spinbox.setMaximumSize(QtCore.QSize(110, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.sharpness_spinbox.setFont(font)
+        self.sharpness_spinbox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.sharpness_spinbox.setAutoFillBackground(True)
+        self.sharpness_spinbox.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.sharpness_spinbox.setProperty("showGroupSeparator", False)
+        self.sharpness_spinbox.setMinimum(-100)
+        self.sharpness_spinbox.setMaximum(100)
+        self.sharpness_spinbox.setObjectName("sharpness_spinbox")
+        self.gridLayout.addWidget(self.sharpness_spinbox, 1, 1, 1, 1)
+        spacerItem4 = QtWidgets.QSpacerItem(1, 1, QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem4, 2, 2, 1, 1)
+        self.saturation_spinbox = QtWidgets.QSpinBox(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.saturation_spinbox.sizePolicy().hasHeightForWidth())
+        self.saturation_spinbox.setSizePolicy(sizePolicy)
+        self.saturation_spinbox.setMinimumSize(QtCore.QSize(110, 37))
+        self.saturation_spinbox.setMaximumSize(QtCore.QSize(110, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.saturation_spinbox.setFont(font)
+        self.saturation_spinbox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.saturation_spinbox.setAutoFillBackground(True)
+        self.saturation_spinbox.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.saturation_spinbox.setMinimum(-100)
+        self.saturation_spinbox.setMaximum(100)
+        self.saturation_spinbox.setProperty("value", 0)
+        self.saturation_spinbox.setObjectName("saturation_spinbox")
+        self.gridLayout.addWidget(self.saturation_spinbox, 3, 1, 1, 1)
+        self.sharpness_label = QtWidgets.QLabel(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.sharpness_label.sizePolicy().hasHeightForWidth())
+        self.sharpness_label.setSizePolicy(sizePolicy)
+        self.sharpness_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.sharpness_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.sharpness_label.setFont(font)
+        self.sharpness_label.setAutoFillBackground(True)
+        self.sharpness_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.sharpness_label.setObjectName("sharpness_label")
+        self.gridLayout.addWidget(self.sharpness_label, 1, 0, 1, 1)
+        self.contrast_spinbox = QtWidgets.QSpinBox(self.layoutWidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.contrast_spinbox.sizePolicy().hasHeightForWidth())
+        self.contrast_spinbox.setSizePolicy(sizePolicy)
+        self.contrast_spinbox.setMinimumSize(QtCore.QSize(110, 37))
+        self.contrast_spinbox.setMaximumSize(QtCore.QSize(110, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.contrast_spinbox.setFont(font)
+        self.contrast_spinbox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.contrast_spinbox.setAutoFillBackground(True)
+        self.contrast_spinbox.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.contrast_spinbox.setMinimum(-100)
+        self.contrast_spinbox.setMaximum(100)
+        self.contrast_spinbox.setProperty("value", 0)
+        self.contrast_spinbox.setObjectName("contrast_spinbox")
+        self.gridLayout.addWidget(self.contrast_spinbox, 2, 1, 1, 1)
+        self.layoutWidget1 = QtWidgets.QWidget(self.settings_groupbox)
+        self.layoutWidget1.setGeometry(QtCore.QRect(10, 280, 591, 91))
+        self.layoutWidget1.setAutoFillBackground(True)
+        self.layoutWidget1.setObjectName("layoutWidget1")
+        self.gridLayout_3 = QtWidgets.QGridLayout(self.layoutWidget1)
+        self.gridLayout_3.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.pic_name_label = QtWidgets.QLabel(self.layoutWidget1)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_name_label.sizePolicy().hasHeightForWidth())
+        self.pic_name_label.setSizePolicy(sizePolicy)
+        self.pic_name_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.pic_name_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pic_name_label.setFont(font)
+        self.pic_name_label.setAutoFillBackground(True)
+        self.pic_name_label.setObjectName("pic_name_label")
+        self.gridLayout_3.addWidget(self.pic_name_label, 1, 0, 1, 1)
+        self.pic_name_line_edit = QtWidgets.QLineEdit(self.layoutWidget1)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_name_line_edit.sizePolicy().hasHeightForWidth())
+        self.pic_name_line_edit.setSizePolicy(sizePolicy)
+        self.pic_name_line_edit.setMinimumSize(QtCore.QSize(280, 37))
+        self.pic_name_line_edit.setMaximumSize(QtCore.QSize(280, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pic_name_line_edit.setFont(font)
+        self.pic_name_line_edit.setAutoFillBackground(True)
+        self.pic_name_line_edit.setObjectName("pic_name_line_edit")
+        self.gridLayout_3.addWidget(self.pic_name_line_edit, 1, 1, 1, 1)
+        self.pic_dir_button = QtWidgets.QPushButton(self.layoutWidget1)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_dir_button.sizePolicy().hasHeightForWidth())
+        self.pic_dir_button.setSizePolicy(sizePolicy)
+        self.pic_dir_button.setMinimumSize(QtCore.QSize(150, 37))
+        self.pic_dir_button.setMaximumSize(QtCore.QSize(150, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pic_dir_button.setFont(font)
+        self.pic_dir_button.setAutoFillBackground(True)
+        self.pic_dir_button.setObjectName("pic_dir_button")
+        self.gridLayout_3.addWidget(self.pic_dir_button, 0, 2, 1, 1)
+        self.pic_dir_line_edit = QtWidgets.QLineEdit(self.layoutWidget1)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_dir_line_edit.sizePolicy().hasHeightForWidth())
+        self.pic_dir_line_edit.setSizePolicy(sizePolicy)
+        self.pic_dir_line_edit.setMinimumSize(QtCore.QSize(280, 37))
+        self.pic_dir_line_edit.setMaximumSize(QtCore.QSize(280, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pic_dir_line_edit.setFont(font)
+        self.pic_dir_line_edit.setWhatsThis("")
+        self.pic_dir_line_edit.setAutoFillBackground(True)
+        self.pic_dir_line_edit.setText("")
+        self.pic_dir_line_edit.setReadOnly(True)
+        self.pic_dir_line_edit.setObjectName("pic_dir_line_edit")
+        self.gridLayout_3.addWidget(self.pic_dir_line_edit, 0, 1, 1, 1)
+        self.pic_dir_label = QtWidgets.QLabel(self.layoutWidget1)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_dir_label.sizePolicy().hasHeightForWidth())
+        self.pic_dir_label.setSizePolicy(sizePolicy)
+        self.pic_dir_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.pic_dir_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pic_dir_label.setFont(font)
+        self.pic_dir_label.setAutoFillBackground(True)
+        self.pic_dir_label.setObjectName("pic_dir_label")
+        self.gridLayout_3.addWidget(self.pic_dir_label, 0, 0, 1, 1)
+        self.pic_format_combobox = QtWidgets.QComboBox(self.layoutWidget1)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_format_combobox.sizePolicy().hasHeightForWidth())
+        self.pic_format_combobox.setSizePolicy(sizePolicy)
+        self.pic_format_combobox.setMinimumSize(QtCore.QSize(150, 37))
+        self.pic_format_combobox.setMaximumSize(QtCore.QSize(150, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        font.setStrikeOut(False)
+        font.setKerning(True)
+        self.pic_format_combobox.setFont(font)
+        self.pic_format_combobox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.pic_format_combobox.setAutoFillBackground(True)
+        self.pic_format_combobox.setObjectName("pic_format_combobox")
+        self.gridLayout_3.addWidget(self.pic_format_combobox, 1, 2, 1, 1)
+        self.layoutWidget2 = QtWidgets.QWidget(self.settings_groupbox)
+        self.layoutWidget2.setGeometry(QtCore.QRect(10, 370, 591, 51))
+        self.layoutWidget2.setAutoFillBackground(True)
+        self.layoutWidget2.setObjectName("layoutWidget2")
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(self.layoutWidget2)
+        self.horizontalLayout_3.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.quality_label = QtWidgets.QLabel(self.layoutWidget2)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.quality_label.sizePolicy().hasHeightForWidth())
+        self.quality_label.setSizePolicy(sizePolicy)
+        self.quality_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.quality_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.quality_label.setFont(font)
+        self.quality_label.setAutoFillBackground(True)
+        self.quality_label.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.quality_label.setObjectName("quality_label")
+        self.horizontalLayout_3.addWidget(self.quality_label)
+        self.quality_spinbox = QtWidgets.QSpinBox(self.layoutWidget2)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.quality_spinbox.sizePolicy().hasHeightForWidth())
+        self.quality_spinbox.setSizePolicy(sizePolicy)
+        self.quality_spinbox.setMinimumSize(QtCore.QSize(110, 37))
+        self.quality_spinbox.setMaximumSize(QtCore.QSize(110, 37))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.quality_spinbox.setFont(font)
+        self.quality_spinbox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.quality_spinbox.setAutoFillBackground(True)
+        self.quality_spinbox.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.quality_spinbox.setMinimum(0)
+        self.quality_spinbox.setMaximum(100)
+        self.quality_spinbox.setProperty("value", 75)
+        self.quality_spinbox.setObjectName("quality_spinbox")
+        self.horizontalLayout_3.addWidget(self.quality_spinbox)
+        self.quality_slider = QtWidgets.QSlider(self.layoutWidget2)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.quality_slider.sizePolicy().hasHeightForWidth())
+        self.quality_slider.setSizePolicy(sizePolicy)
+        self.quality_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.quality_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.quality_slider.setAutoFillBackground(True)
+        self.quality_slider.setMinimum(0)
+        self.quality_slider.setMaximum(100)
+        self.quality_slider.setPageStep(1)
+        self.quality_slider.setProperty("value", 75)
+        self.quality_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.quality_slider.setTickPosition(QtWidgets.QSlider.TicksBothSides)
+        self.quality_slider.setTickInterval(20)
+        self.quality_slider.setObjectName("quality_slider")
+        self.horizontalLayout_3.addWidget(self.quality_slider)
+        self.layoutWidget3 = QtWidgets.QWidget(self.centralwidget)
+        self.layoutWidget3.setGeometry(QtCore.QRect(0, 0, 2, 2))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.layoutWidget3.sizePolicy().hasHeightForWidth())
+        self.layoutWidget3.setSizePolicy(sizePolicy)
+        self.layoutWidget3.setAutoFillBackground(True)
+        self.layoutWidget3.setObjectName("layoutWidget3")
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.layoutWidget3)
+        self.verticalLayout.setContentsMargins(0, 0, 0, 0)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.preview_frame = QtWidgets.QFrame(self.centralwidget)
+        self.preview_frame.setGeometry(QtCore.QRect(630, 70, 1280, 720))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.preview_frame.sizePolicy().hasHeightForWidth())
+        self.preview_frame.setSizePolicy(sizePolicy)
+        self.preview_frame.setMinimumSize(QtCore.QSize(1280, 720))
+        self.preview_frame.setMaximumSize(QtCore.QSize(1280, 720))
+        self.preview_frame.setWhatsThis("")
+        self.preview_frame.setAutoFillBackground(True)
+        self.preview_frame.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.preview_frame.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.preview_frame.setObjectName("preview_frame")
+        self.picture_label = QtWidgets.QLabel(self.preview_frame)
+        self.picture_label.setGeometry(QtCore.QRect(0, 0, 1280, 720))
+        self.picture_label.setAutoFillBackground(True)
+        self.picture_label.setText("")
+        self.picture_label.setObjectName("picture_label")
+        self.picture_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.picture_groupbox.setGeometry(QtCore.QRect(10, 480, 611, 131))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.picture_groupbox.sizePolicy().hasHeightForWidth())
+        self.picture_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.picture_groupbox.setFont(font)
+        self.picture_groupbox.setFocusPolicy(QtCore.Qt.StrongFocus)
+        self.picture_groupbox.setAutoFillBackground(True)
+        self.picture_groupbox.setObjectName("picture_groupbox")
+        self.layoutWidget_2 = QtWidgets.QWidget(self.picture_groupbox)
+        self.layoutWidget_2.setGeometry(QtCore.QRect(10, 40, 591, 82))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.layoutWidget_2.sizePolicy().hasHeightForWidth())
+        self.layoutWidget_2.setSizePolicy(sizePolicy)
+        self.layoutWidget_2.setAutoFillBackground(True)
+        self.layoutWidget_2.setObjectName("layoutWidget_2")
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout(self.layoutWidget_2)
+        self.horizontalLayout_2.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
+        self.horizontalLayout_2.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.preview_button = QtWidgets.QPushButton(self.layoutWidget_2)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.preview_button.sizePolicy().hasHeightForWidth())
+        self.preview_button.setSizePolicy(sizePolicy)
+        self.preview_button.setMinimumSize(QtCore.QSize(191, 80))
+        self.preview_button.setMaximumSize(QtCore.QSize(193, 80))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.preview_button.setFont(font)
+        self.preview_button.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.preview_button.setAutoFillBackground(True)
+        self.preview_button.setObjectName("preview_button")
+        self.horizontalLayout_2.addWidget(self.preview_button)
+        self.pic_button = QtWidgets.QPushButton(self.layoutWidget_2)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pic_button.sizePolicy().hasHeightForWidth())
+        self.pic_button.setSizePolicy(sizePolicy)
+        self.pic_button.setMinimumSize(QtCore.QSize(191, 80))
+        self.pic_button.setMaximumSize(QtCore.QSize(193, 80))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.pic_button.setFont(font)
+        self.pic_button.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.pic_button.setAutoFillBackground(True)
+        self.pic_button.setObjectName("pic_button")
+        self.horizontalLayout_2.addWidget(self.pic_button)
+        self.load_pic_button = QtWidgets.QPushButton(self.layoutWidget_2)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.load_pic_button.sizePolicy().hasHeightForWidth())
+        self.load_pic_button.setSizePolicy(sizePolicy)
+        self.load_pic_button.setMinimumSize(QtCore.QSize(191, 80))
+        self.load_pic_button.setMaximumSize(QtCore.QSize(193, 80))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.load_pic_button.setFont(font)
+        self.load_pic_button.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.load_pic_button.setAutoFillBackground(True)
+        self.load_pic_button.setObjectName("load_pic_button")
+        self.horizontalLayout_2.addWidget(self.load_pic_button)
+        self.profile_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.profile_groupbox.setGeometry(QtCore.QRect(10, 630, 611, 161))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.profile_groupbox.sizePolicy().hasHeightForWidth())
+        self.profile_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.profile_groupbox.setFont(font)
+        self.profile_groupbox.setAutoFillBackground(True)
+        self.profile_groupbox.setObjectName("profile_groupbox")
+        self.layoutWidget4 = QtWidgets.QWidget(self.profile_groupbox)
+        self.layoutWidget4.setGeometry(QtCore.QRect(10, 30, 591, 125))
+        self.layoutWidget4.setAutoFillBackground(True)
+        self.layoutWidget4.setObjectName("layoutWidget4")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.layoutWidget4)
+        self.gridLayout_2.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
+        self.gridLayout_2.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.save_profile_button = QtWidgets.QPushButton(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.save_profile_button.sizePolicy().hasHeightForWidth())
+        self.save_profile_button.setSizePolicy(sizePolicy)
+        self.save_profile_button.setMinimumSize(QtCore.QSize(150, 37))
+        self.save_profile_button.setMaximumSize(QtCore.QSize(150, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.save_profile_button.setFont(font)
+        self.save_profile_button.setAutoFillBackground(True)
+        self.save_profile_button.setObjectName("save_profile_button")
+        self.gridLayout_2.addWidget(self.save_profile_button, 0, 2, 1, 1)
+        self.load_profile_combobox = QtWidgets.QComboBox(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.load_profile_combobox.sizePolicy().hasHeightForWidth())
+        self.load_profile_combobox.setSizePolicy(sizePolicy)
+        self.load_profile_combobox.setMinimumSize(QtCore.QSize(280, 37))
+        self.load_profile_combobox.setMaximumSize(QtCore.QSize(285, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        font.setStrikeOut(False)
+        font.setKerning(True)
+        self.load_profile_combobox.setFont(font)
+        self.load_profile_combobox.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.load_profile_combobox.setAutoFillBackground(True)
+        self.load_profile_combobox.setInsertPolicy(QtWidgets.QComboBox.InsertAlphabetically)
+        self.load_profile_combobox.setObjectName("load_profile_combobox")
+        self.gridLayout_2.addWidget(self.load_profile_combobox, 1, 1, 1, 1)
+        self.delete_profile_button = QtWidgets.QPushButton(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.delete_profile_button.sizePolicy().hasHeightForWidth())
+        self.delete_profile_button.setSizePolicy(sizePolicy)
+        self.delete_profile_button.setMinimumSize(QtCore.QSize(150, 37))
+        self.delete_profile_button.setMaximumSize(QtCore.QSize(150, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.delete_profile_button.setFont(font)
+        self.delete_profile_button.setAutoFillBackground(True)
+        self.delete_profile_button.setObjectName("delete_profile_button")
+        self.gridLayout_2.addWidget(self.delete_profile_button, 2, 2, 1, 1)
+        self.profile_name_save_label = QtWidgets.QLabel(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.profile_name_save_label.sizePolicy().hasHeightForWidth())
+        self.profile_name_save_label.setSizePolicy(sizePolicy)
+        self.profile_name_save_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.profile_name_save_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.profile_name_save_label.setFont(font)
+        self.profile_name_save_label.setAutoFillBackground(True)
+        self.profile_name_save_label.setObjectName("profile_name_save_label")
+        self.gridLayout_2.addWidget(self.profile_name_save_label, 0, 0, 1, 1)
+        self.profile_name_load_label = QtWidgets.QLabel(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.profile_name_load_label.sizePolicy().hasHeightForWidth())
+        self.profile_name_load_label.setSizePolicy(sizePolicy)
+        self.profile_name_load_label.setMinimumSize(QtCore.QSize(135, 37))
+        self.profile_name_load_label.setMaximumSize(QtCore.QSize(135, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.profile_name_load_label.setFont(font)
+        self.profile_name_load_label.setAutoFillBackground(True)
+        self.profile_name_load_label.setObjectName("profile_name_load_label")
+        self.gridLayout_2.addWidget(self.profile_name_load_label, 1, 0, 1, 1)
+        self.load_profile_button = QtWidgets.QPushButton(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.load_profile_button.sizePolicy().hasHeightForWidth())
+        self.load_profile_button.setSizePolicy(sizePolicy)
+        self.load_profile_button.setMinimumSize(QtCore.QSize(150, 37))
+        self.load_profile_button.setMaximumSize(QtCore.QSize(150, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.load_profile_button.setFont(font)
+        self.load_profile_button.setAutoFillBackground(True)
+        self.load_profile_button.setObjectName("load_profile_button")
+        self.gridLayout_2.addWidget(self.load_profile_button, 1, 2, 1, 1)
+        self.profile_name_line_edit = QtWidgets.QLineEdit(self.layoutWidget4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.profile_name_line_edit.sizePolicy().hasHeightForWidth())
+        self.profile_name_line_edit.setSizePolicy(sizePolicy)
+        self.profile_name_line_edit.setMinimumSize(QtCore.QSize(280, 37))
+        self.profile_name_line_edit.setMaximumSize(QtCore.QSize(285, 37))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.profile_name_line_edit.setFont(font)
+        self.profile_name_line_edit.setAutoFillBackground(True)
+        self.profile_name_line_edit.setText("")
+        self.profile_name_line_edit.setObjectName("profile_name_line_edit")
+        self.gridLayout_2.addWidget(self.profile_name_line_edit, 0, 1, 1, 1)
+        self.preview_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.preview_groupbox.setGeometry(QtCore.QRect(10, 800, 611, 121))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.preview_groupbox.sizePolicy().hasHeightForWidth())
+        self.preview_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.preview_groupbox.setFont(font)
+        self.preview_groupbox.setAutoFillBackground(True)
+        self.preview_groupbox.setObjectName("preview_groupbox")
+        self.layoutWidget5 = QtWidgets.QWidget(self.preview_groupbox)
+        self.layoutWidget5.setGeometry(QtCore.QRect(10, 30, 591, 82))
+        self.layoutWidget5.setAutoFillBackground(True)
+        self.layoutWidget5.setObjectName("layoutWidget5")
+        self.gridLayout_4 = QtWidgets.QGridLayout(self.layoutWidget5)
+        self.gridLayout_4.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_4.setObjectName("gridLayout_4")
+        self.label = QtWidgets.QLabel(self.layoutWidget5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(135)
+        sizePolicy.setVerticalStretch(37)
+        sizePolicy.setHeightForWidth(self.label.sizePolicy().hasHeightForWidth())
+        self.label.setSizePolicy(sizePolicy)
+        self.label.setMinimumSize(QtCore.QSize(135, 37))
+        self.label.setAutoFillBackground(True)
+        self.label.setObjectName("label")
+        self.gridLayout_4.addWidget(self.label, 0, 0, 1, 1)
+        self.x_offset_slider = QtWidgets.QSlider(self.layoutWidget5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.x_offset_slider.sizePolicy().hasHeightForWidth())
+        self.x_offset_slider.setSizePolicy(sizePolicy)
+        self.x_offset_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.x_offset_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.x_offset_slider.setAutoFillBackground(True)
+        self.x_offset_slider.setMinimum(-100)
+        self.x_offset_slider.setMaximum(100)
+        self.x_offset_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.x_offset_slider.setObjectName("x_offset_slider")
+        self.gridLayout_4.addWidget(self.x_offset_slider, 0, 1, 1, 1)
+        self.label_2 = QtWidgets.QLabel(self.layoutWidget5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(135)
+        sizePolicy.setVerticalStretch(37)
+        sizePolicy.setHeightForWidth(self.label_2.sizePolicy().hasHeightForWidth())
+        self.label_2.setSizePolicy(sizePolicy)
+        self.label_2.setMinimumSize(QtCore.QSize(135, 37))
+        self.label_2.setAutoFillBackground(True)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout_4.addWidget(self.label_2, 1, 0, 1, 1)
+        self.y_offset_slider = QtWidgets.QSlider(self.layoutWidget5)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.y_offset_slider.sizePolicy().hasHeightForWidth())
+        self.y_offset_slider.setSizePolicy(sizePolicy)
+        self.y_offset_slider.setMinimumSize(QtCore.QSize(320, 37))
+        self.y_offset_slider.setMaximumSize(QtCore.QSize(320, 37))
+        self.y_offset_slider.setAutoFillBackground(True)
+        self.y_offset_slider.setMinimum(-100)
+        self.y_offset_slider.setMaximum(100)
+        self.y_offset_slider.setOrientation(QtCore.Qt.Horizontal)
+        self.y_offset_slider.setObjectName("y_offset_slider")
+        self.gridLayout_4.addWidget(self.y_offset_slider, 1, 1, 1, 1)
+        self.burst_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.burst_groupbox.setGeometry(QtCore.QRect(980, 800, 611, 121))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.burst_groupbox.sizePolicy().hasHeightForWidth())
+        self.burst_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.burst_groupbox.setFont(font)
+        self.burst_groupbox.setAutoFillBackground(True)
+        self.burst_groupbox.setObjectName("burst_groupbox")
+        self.layoutWidget6 = QtWidgets.QWidget(self.burst_groupbox)
+        self.layoutWidget6.setGeometry(QtCore.QRect(10, 30, 591, 82))
+        self.layoutWidget6.setAutoFillBackground(True)
+        self.layoutWidget6.setObjectName("layoutWidget6")
+        self.gridLayout_5 = QtWidgets.QGridLayout(self.layoutWidget6)
+        self.gridLayout_5.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_5.setObjectName("gridLayout_5")
+        self.burst_frames_label = QtWidgets.QLabel(self.layoutWidget6)
+        self.burst_frames_label.setAutoFillBackground(True)
+        self.burst_frames_label.setObjectName("burst_frames_label")
+        self.gridLayout_5.addWidget(self.burst_frames_label, 0, 0, 1, 1)
+        self.burst_frames_spinbox = QtWidgets.QSpinBox(self.layoutWidget6)
+        self.burst_frames_spinbox.setMinimumSize(QtCore.QSize(120, 37))
+        self.burst_frames_spinbox.setAutoFillBackground(True)
+        self.burst_frames_spinbox.setMinimum(1)
+        self.burst_frames_spinbox.setMaximum(10000)
+        self.burst_frames_spinbox.setProperty("value", 10)
+        self.burst_frames_spinbox.setObjectName("burst_frames_spinbox")
+        self.gridLayout_5.addWidget(self.burst_frames_spinbox, 0, 1, 1, 1)
+        self.burst_interval_label = QtWidgets.QLabel(self.layoutWidget6)
+        self.burst_interval_label.setAutoFillBackground(True)
+        self.burst_interval_label.setObjectName("burst_interval_label")
+        self.gridLayout_5.addWidget(self.burst_interval_label, 0, 2, 1, 1)
+        self.burst_interval_spinbox = QtWidgets.QSpinBox(self.layoutWidget6)
+        self.burst_interval_spinbox.setMinimumSize(QtCore.QSize(120, 37))
+        self.burst_interval_spinbox.setAutoFillBackground(True)
+        self.burst_interval_spinbox.setMinimum(0)
+        self.burst_interval_spinbox.setMaximum(60000)
+        self.burst_interval_spinbox.setProperty("value", 0)
+        self.burst_interval_spinbox.setObjectName("burst_interval_spinbox")
+        self.gridLayout_5.addWidget(self.burst_interval_spinbox, 0, 3, 1, 1)
+        self.burst_button = QtWidgets.QPushButton(self.layoutWidget6)
+        self.burst_button.setMinimumSize(QtCore.QSize(135, 37))
+        self.burst_button.setAutoFillBackground(True)
+        self.burst_button.setObjectName("burst_button")
+        self.gridLayout_5.addWidget(self.burst_button, 1, 0, 1, 1)
+        self.burst_stack_combobox = QtWidgets.QComboBox(self.layoutWidget6)
+        self.burst_stack_combobox.setMinimumSize(QtCore.QSize(120, 37))
+        self.burst_stack_combobox.setAutoFillBackground(True)
+        self.burst_stack_combobox.setObjectName("burst_stack_combobox")
+        self.burst_stack_combobox.addItem("")
+        self.burst_stack_combobox.addItem("")
+        self.burst_stack_combobox.addItem("")
+        self.burst_stack_combobox.addItem("")
+        self.burst_stack_combobox.addItem("")
+        self.gridLayout_5.addWidget(self.burst_stack_combobox, 1, 1, 1, 1)
+        self.burst_status_label = QtWidgets.QLabel(self.layoutWidget6)
+        self.burst_status_label.setAutoFillBackground(True)
+        self.burst_status_label.setObjectName("burst_status_label")
+        self.gridLayout_5.addWidget(self.burst_status_label, 1, 2, 1, 2)
+        self.analysis_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.analysis_groupbox.setGeometry(QtCore.QRect(1600, 800, 311, 121))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.analysis_groupbox.sizePolicy().hasHeightForWidth())
+        self.analysis_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.analysis_groupbox.setFont(font)
+        self.analysis_groupbox.setAutoFillBackground(True)
+        self.analysis_groupbox.setObjectName("analysis_groupbox")
+        self.layoutWidget7 = QtWidgets.QWidget(self.analysis_groupbox)
+        self.layoutWidget7.setGeometry(QtCore.QRect(10, 30, 291, 82))
+        self.layoutWidget7.setAutoFillBackground(True)
+        self.layoutWidget7.setObjectName("layoutWidget7")
+        self.gridLayout_6 = QtWidgets.QGridLayout(self.layoutWidget7)
+        self.gridLayout_6.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_6.setObjectName("gridLayout_6")
+        self.measure_button = QtWidgets.QPushButton(self.layoutWidget7)
+        self.measure_button.setAutoFillBackground(True)
+        self.measure_button.setMinimumSize(QtCore.QSize(135, 37))
+        self.measure_button.setObjectName("measure_button")
+        self.gridLayout_6.addWidget(self.measure_button, 0, 0, 1, 1)
+        self.live_button = QtWidgets.QPushButton(self.layoutWidget7)
+        self.live_button.setAutoFillBackground(True)
+        self.live_button.setMinimumSize(QtCore.QSize(135, 37))
+        self.live_button.setCheckable(True)
+        self.live_button.setObjectName("live_button")
+        self.gridLayout_6.addWidget(self.live_button, 0, 1, 1, 1)
+        self.angle_label = QtWidgets.QLabel(self.layoutWidget7)
+        self.angle_label.setAutoFillBackground(True)
+        self.angle_label.setObjectName("angle_label")
+        self.gridLayout_6.addWidget(self.angle_label, 1, 0, 1, 2)
+        self.gallery_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.gallery_groupbox.setGeometry(QtCore.QRect(10, 925, 1901, 125))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.gallery_groupbox.sizePolicy().hasHeightForWidth())
+        self.gallery_groupbox.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        font.setBold(True)
+        font.setWeight(75)
+        self.gallery_groupbox.setFont(font)
+        self.gallery_groupbox.setAutoFillBackground(True)
+        self.gallery_groupbox.setObjectName("gallery_groupbox")
+        self.layoutWidget8 = QtWidgets.QWidget(self.gallery_groupbox)
+        self.layoutWidget8.setGeometry(QtCore.QRect(10, 30, 1881, 86))
+        self.layoutWidget8.setAutoFillBackground(True)
+        self.layoutWidget8.setObjectName("layoutWidget8")
+        self.gridLayout_7 = QtWidgets.QGridLayout(self.layoutWidget8)
+        self.gridLayout_7.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_7.setObjectName("gridLayout_7")
+        self.gallery_filter_line_edit = QtWidgets.QLineEdit(self.layoutWidget8)
+        self.gallery_filter_line_edit.setAutoFillBackground(True)
+        self.gallery_filter_line_edit.setMinimumSize(QtCore.QSize(280, 37))
+        self.gallery_filter_line_edit.setObjectName("gallery_filter_line_edit")
+        self.gridLayout_7.addWidget(self.gallery_filter_line_edit, 0, 0, 1, 1)
+        self.gallery_format_combobox = QtWidgets.QComboBox(self.layoutWidget8)
+        self.gallery_format_combobox.setAutoFillBackground(True)
+        self.gallery_format_combobox.setMinimumSize(QtCore.QSize(150, 37))
+        self.gallery_format_combobox.setObjectName("gallery_format_combobox")
+        self.gridLayout_7.addWidget(self.gallery_format_combobox, 0, 1, 1, 1)
+        self.gallery_sort_combobox = QtWidgets.QComboBox(self.layoutWidget8)
+        self.gallery_sort_combobox.setAutoFillBackground(True)
+        self.gallery_sort_combobox.setMinimumSize(QtCore.QSize(280, 37))
+        self.gallery_sort_combobox.setObjectName("gallery_sort_combobox")
+        self.gridLayout_7.addWidget(self.gallery_sort_combobox, 1, 0, 1, 1)
+        self.gallery_count_label = QtWidgets.QLabel(self.layoutWidget8)
+        self.gallery_count_label.setAutoFillBackground(True)
+        self.gallery_count_label.setMinimumSize(QtCore.QSize(150, 37))
+        self.gallery_count_label.setObjectName("gallery_count_label")
+        self.gridLayout_7.addWidget(self.gallery_count_label, 1, 1, 1, 1)
+        self.gallery_profile_combobox = QtWidgets.QComboBox(self.layoutWidget8)
+        self.gallery_profile_combobox.setAutoFillBackground(True)
+        self.gallery_profile_combobox.setMinimumSize(QtCore.QSize(180, 37))
+        self.gallery_profile_combobox.setObjectName("gallery_profile_combobox")
+        self.gridLayout_7.addWidget(self.gallery_profile_combobox, 0, 2, 1, 1)
+        self.gallery_list_view = QtWidgets.QListView(self.layoutWidget8)
+        self.gallery_list_view.setAutoFillBackground(True)
+        self.gallery_list_view.setMinimumSize(QtCore.QSize(1210, 80))
+        self.gallery_list_view.setObjectName("gallery_list_view")
+        self.gridLayout_7.addWidget(self.gallery_list_view, 0, 3, 2, 1)
+        self.widget = QtWidgets.QWidget(self.centralwidget)
+        self.widget.setGeometry(QtCore.QRect(620, 830, 346, 81))
+        self.widget.setObjectName("widget")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.widget)
+        self.horizontalLayout.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.preview_status = QtWidgets.QLabel(self.widget)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(26)
+        font.setBold(True)
+        font.setWeight(75)
+        self.preview_status.setFont(font)
+        self.preview_status.setAutoFillBackground(True)
+        self.preview_status.setObjectName("preview_status")
+        self.horizontalLayout.addWidget(self.preview_status)
+        self.preview_status_info = QtWidgets.QLabel(self.widget)
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(26)
+        font.setBold(True)
+        font.setWeight(75)
+        self.preview_status_info.setFont(font)
+        self.preview_status_info.setAutoFillBackground(True)
+        self.preview_status_info.setAlignment(QtCore.Qt.AlignCenter)
+        self.preview_status_info.setObjectName("preview_status_info")
+        self.horizontalLayout.addWidget(self.preview_status_info)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setEnabled(False)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 2034, 21))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuHelp = QtWidgets.QMenu(self.menubar)
+        self.menuHelp.setObjectName("menuHelp")
+        MainWindow.setMenuBar(self.menubar)
+        self.actionExit = QtWidgets.QAction(MainWindow)
+        self.actionExit.setObjectName("actionExit")
+        self.actionLoad = QtWidgets.QAction(MainWindow)
+        self.actionLoad.setObjectName("actionLoad")
+        self.actionSave = QtWidgets.QAction(MainWindow)
+        self.actionSave.setObjectName("actionSave")
+        self.actionAbout = QtWidgets.QAction(MainWindow)
+        self.actionAbout.setObjectName("actionAbout")
+        self.actionContact = QtWidgets.QAction(MainWindow)
+        self.actionContact.setObjectName("actionContact")
+        self.actionLoad_picture = QtWidgets.QAction(MainWindow)
+        self.actionLoad_picture.setObjectName("actionLoad_picture")
+        self.menuFile.addAction(self.actionExit)
+        self.menuHelp.addAction(self.actionAbout)
+        self.menuHelp.addAction(self.actionContact)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuHelp.menuAction())
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "Contact Angle System"))
+        self.settings_groupbox.setTitle(_translate("MainWindow", "Settings"))
+        self.iso_label.setText(_translate("MainWindow", "ISO:"))
+        self.contrast_label.setText(_translate("MainWindow", "Contrast:"))
+        self.reset_button.setText(_translate("MainWindow", "Reset Values"))
+        self.brightness_label.setText(_translate("MainWindow", "Brightness:"))
+        self.saturation_label.setText(_translate("MainWindow", "Saturation:"))
+        self.sharpness_label.setText(_translate("MainWindow", "Sharpness:"))
+        self.pic_name_label.setText(_translate("MainWindow", "Filename:"))
+        self.pic_name_line_edit.setToolTip(_translate("MainWindow", "<html><head/><body><p>Set the filename for the picture.</p><p>A timestamp will be appended at the end.</p></body></html>"))
+        self.pic_dir_button.setText(_translate("MainWindow", "Open Directory"))
+        self.pic_dir_line_edit.setToolTip(_translate("MainWindow", "Set the save directory for the pictures"))
+        self.pic_dir_label.setText(_translate("MainWindow", "Directory:"))
+        self.quality_label.setText(_translate("MainWindow", "Quality:"))
+        self.preview_frame.setToolTip(_translate("MainWindow", "Set the save directory for the pictures"))
+        self.picture_groupbox.setTitle(_translate("MainWindow", "Picture"))
+        self.preview_button.setText(_translate("MainWindow", "&Preview"))
+        self.pic_button.setText(_translate("MainWindow", "&Take Picture"))
+        self.load_pic_button.setText(_translate("MainWindow", "&Load Picture"))
+        self.profile_groupbox.setTitle(_translate("MainWindow", "Profile"))
+        self.save_profile_button.setText(_translate("MainWindow", "Save Settings"))
+        self.delete_profile_button.setText(_translate("MainWindow", "Delete Profile"))
+        self.profile_name_save_label.setText(_translate("MainWindow", "Save Profile:"))
+        self.profile_name_load_label.setText(_translate("MainWindow", "Load Profile:"))
+        self.load_profile_button.setText(_translate("MainWindow", "Load Settings"))
+        self.preview_groupbox.setTitle(_translate("MainWindow", "Preview Offsets"))
+        self.label.setText(_translate("MainWindow", "X-Offset"))
+        self.label_2.setText(_translate("MainWindow", "Y-Offset"))
+        self.burst_groupbox.setTitle(_translate("MainWindow", "Burst"))
+        self.burst_frames_label.setText(_translate("MainWindow", "Frames"))
+        self.burst_frames_spinbox.setToolTip(_translate("MainWindow", "Number of frames per burst"))
+        self.burst_interval_label.setText(_translate("MainWindow", "Interval [ms]"))
+        self.burst_interval_spinbox.setToolTip(_translate("MainWindow", "Time between two frames, \"Max\" captures as fast as the sensor allows"))
+        self.burst_interval_spinbox.setSpecialValueText(_translate("MainWindow", "Max"))
+        self.burst_button.setText(_translate("MainWindow", "Burst"))
+        self.burst_stack_combobox.setToolTip(_translate("MainWindow", "Files: save every frame of the burst.\n"
+"Sequence: save all frames into one sequence file (faster on USB sticks).\n"
+"Mean, Median, Sigma: stack the frames into one low noise picture,\n"
+"Median and Sigma (clipping) also remove outliers like reflections in single frames"))
+        self.burst_stack_combobox.setItemText(0, _translate("MainWindow", "Files"))
+        self.burst_stack_combobox.setItemText(1, _translate("MainWindow", "Sequence"))
+        self.burst_stack_combobox.setItemText(2, _translate("MainWindow", "Mean"))
+        self.burst_stack_combobox.setItemText(3, _translate("MainWindow", "Median"))
+        self.burst_stack_combobox.setItemText(4, _translate("MainWindow", "Sigma"))
+        self.burst_status_label.setText(_translate("MainWindow", "-"))
+        self.analysis_groupbox.setTitle(_translate("MainWindow", "Analysis"))
+        self.measure_button.setText(_translate("MainWindow", "Measure"))
+        self.live_button.setText(_translate("MainWindow", "Live"))
+        self.live_button.setToolTip(_translate("MainWindow", "Measures continuously on the camera preview"))
+        self.angle_label.setText(_translate("MainWindow", "-"))
+        self.gallery_groupbox.setTitle(_translate("MainWindow", "Gallery"))
+        self.gallery_filter_line_edit.setPlaceholderText(_translate("MainWindow", "Name prefix"))
+        self.gallery_count_label.setText(_translate("MainWindow", "0 pictures"))
+        self.preview_status.setText(_translate("MainWindow", "PREVIEW:"))
+        self.preview_status_info.setText(_translate("MainWindow", "OFF"))
+        self.menuFile.setTitle(_translate("MainWindow", "&File"))
+        self.menuHelp.setTitle(_translate("MainWindow", "&Help"))
+        self.actionExit.setText(_translate("MainWindow", "E&xit"))
+        self.actionExit.setShortcut(_translate("MainWindow", "Ctrl+Q"))
+        self.actionLoad.setText(_translate("MainWindow", "&Load picture"))
+        self.actionSave.setText(_translate("MainWindow", "&Save profile"))
+        self.actionSave.setShortcut(_translate("MainWindow", "Ctrl+S"))
+        self.actionAbout.setText(_translate("MainWindow", "&About"))
+        self.actionContact.setText(_translate("MainWindow", "&Contact"))
+        self.actionLoad_picture.setText(_translate("MainWindow", "Load picture"))
+
+SOURCE_HASH = '716964885f316a9f1c80f35fabdb5c178ac968ec'
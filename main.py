@@ -1,16 +1,55 @@
 #!/usr/bin/env python
 
-from gui.loadui import UI
-from PyQt5 import QtWidgets
-import sys
-# from picamera import PiCamera
+import time
+
+START = time.perf_counter()
+
+import argparse  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+from PyQt5 import QtCore, QtWidgets  # noqa: E402
+
+from camera.backend import CAMERA_BACKENDS  # noqa: E402
+from gui.loadui import UI  # noqa: E402
+from gui.startup import StartupProfile  # noqa: E402
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Contact Angle System')
+    parser.add_argument('--camera', choices=CAMERA_BACKENDS, default='picamera',
+                        help='camera backend, "simulated" replays the pictures directory')
+    parser.add_argument('--connect', type=Path, nargs='?', const=True, metavar='SOCKET',
+                        help='use the camera of a running capture service, optionally listening on SOCKET')
+    parser.add_argument('--profile-startup', action='store_true', help='print how long each startup phase took')
+    # everything argparse does not know is left for Qt (-style, -platform, ...)
+    return parser.parse_known_args(argv[1:])
 
 
 def main():
-    app = QtWidgets.QApplication(sys.argv)
+    startup = StartupProfile(START)
+    startup.mark('imports')
+    args, qt_args = parse_args(sys.argv)
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
     app.setStyle('fusion')
-    ui_window = UI()
+    startup.mark('QApplication')
+    if args.connect:
+        # only needed in client mode
+        from camera.control import DEFAULT_SOCKET, RemoteCamera, ServiceClient
+        client = ServiceClient(DEFAULT_SOCKET if args.connect is True else args.connect)
+        ui_window = UI(cam=RemoteCamera(client), service=client, startup=startup)
+    else:
+        ui_window = UI(camera_backend=args.camera, startup=startup)
     ui_window.showMaximized()
+    startup.mark('show')
+    if args.profile_startup:
+        # the window is painted in the first event loop turn, the camera may still be opening then
+        QtCore.QTimer.singleShot(0, lambda: startup.mark('first paint'))
+        if ui_window.cam is None:
+            ui_window.CAMERA_READY.connect(startup.report)
+            ui_window.camera_opener.FAILED.connect(lambda: startup.report())
+        else:
+            QtCore.QTimer.singleShot(0, startup.report)
     app.exec_()
 
 
@@ -0,0 +1,116 @@
+import bisect
+import functools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket bounds in seconds, 8 per doubling (9 % wide) from 10 us to about 20 min: quantiles are estimated
+# to within a few percent while recording stays a bisect and an increment.
+LOWEST = 1e-5
+BUCKETS_PER_DOUBLING = 8
+BUCKET_BOUNDS = [LOWEST * 2 ** (index / BUCKETS_PER_DOUBLING) for index in range(27 * BUCKETS_PER_DOUBLING)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # geometric centre of the bucket, the exact extremes where they are known
+                lower = BUCKET_BOUNDS[index - 1] if index else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(max(math.sqrt(lower * upper) if lower else upper / 2, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        summary = {'count': self.count,
+                   'sum': self.sum,
+                   'mean': self.sum / self.count if self.count else None,
+                   'min': self.min if self.count else None,
+                   'max': self.max if self.count else None}
+        for q in QUANTILES:
+            summary[f'p{q * 100:g}'] = self.quantile(q)
+        return summary
+
+
+class MetricsRegistry:
+    # Timing histograms by stage name ("capture.encode", "image.load.preview", ...), recorded from any thread.
+    # Only counters are kept, never the individual samples, so memory does not grow with the run time.
+    def __init__(self):
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        # decorator, every call is a span
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.started = time.time()
+
+    def to_json(self):
+        return json.dumps({'started': self.started, 'exported': time.time(), 'stages': self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix='contact_angle'):
+        # text exposition format, one summary with the stage as label
+        name = f'{prefix}_stage_seconds'
+        lines = [f'# HELP {name} Duration of the capture, loading and analysis stages.',
+                 f'# TYPE {name} summary']
+        for stage, summary in self.snapshot().items():
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q:g}"}} {summary[f"p{q * 100:g}"]:.6g}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {summary["sum"]:.6g}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {summary["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+# shared by all modules of a process, like the logging module's root logger
+METRICS = MetricsRegistry()
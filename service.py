@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+from camera.backend import CAMERA_BACKENDS, open_camera
+from camera.control import DEFAULT_HTTP_HOST, DEFAULT_SOCKET, HTTPServer, SocketServer, serve
+from camera.service import CaptureService
+
+BASE_DIRECTORY = Path('/home/pi/Desktop/ContactAngleSystem')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Headless capture service, keeps the camera open and takes '
+                                                 'commands over a Unix socket and optionally HTTP')
+    parser.add_argument('--camera', choices=CAMERA_BACKENDS, default='picamera',
+                        help='camera backend, "simulated" replays the pictures directory')
+    parser.add_argument('--socket', type=Path, default=DEFAULT_SOCKET, help=f'default: {DEFAULT_SOCKET}')
+    parser.add_argument('--http', type=int, metavar='PORT', help='also listen for HTTP on localhost:PORT')
+    parser.add_argument('--http-host', default=DEFAULT_HTTP_HOST,
+                        help=f'address for HTTP, other hosts are not authenticated (default: {DEFAULT_HTTP_HOST})')
+    parser.add_argument('--base-directory', type=Path, default=BASE_DIRECTORY,
+                        help=f'profiles, pictures and catalogue (default: {BASE_DIRECTORY})')
+    parser.add_argument('--pictures-directory', type=Path,
+                        help='clients can only save pictures below this directory, e.g. the mount point of USB '
+                             'sticks (default: pictures in the base directory)')
+    parser.add_argument('--profile', help='profile to load at startup')
+    parser.add_argument('--still-port', action='store_true',
+                        help='capture through the still port: full quality, but every capture switches the '
+                             'sensor mode (hundreds of ms instead of at most one frame)')
+    return parser.parse_args(argv[1:])
+
+
+def main():
+    args = parse_args(sys.argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    service = CaptureService(open_camera(args.camera), args.base_directory, use_video_port=not args.still_port,
+                             pictures_directory=args.pictures_directory)
+    if args.profile:
+        service.load_profile(args.profile)
+    servers = [SocketServer(args.socket, service)]
+    if args.http:
+        if args.http_host != DEFAULT_HTTP_HOST:
+            logging.warning(f'HTTP on {args.http_host} lets other machines control the camera without a password')
+        servers.append(HTTPServer(args.http, service, args.http_host))
+    for server in servers:
+        serve(server)
+    logging.info(f'Capture service listening on {args.socket}' + (f' and port {args.http}' if args.http else ''))
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    stopped.wait()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    # captures that are still in the pipeline are written before the camera is closed
+    service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from storage.naming import parse_capture_name
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS captures (path TEXT PRIMARY KEY, name TEXT, timestamp REAL, format TEXT,
+                                     profile TEXT, session TEXT, settings TEXT,
+                                     brightness INTEGER, sharpness INTEGER, contrast INTEGER, saturation INTEGER,
+                                     iso INTEGER, quality INTEGER, size INTEGER,
+                                     settle REAL, capture REAL, encode REAL, write REAL, total REAL);
+CREATE INDEX IF NOT EXISTS captures_timestamp ON captures (timestamp);
+CREATE INDEX IF NOT EXISTS captures_profile ON captures (profile, timestamp);
+CREATE INDEX IF NOT EXISTS captures_session ON captures (session, timestamp);
+CREATE TABLE IF NOT EXISTS measurements (path TEXT PRIMARY KEY, left_angle REAL, right_angle REAL, angle REAL,
+                                         confidence REAL, measured REAL);
+CREATE INDEX IF NOT EXISTS measurements_angle ON measurements (angle);
+CREATE TABLE IF NOT EXISTS focus (path TEXT PRIMARY KEY, sharpness REAL, mean REAL, clipped_dark REAL,
+                                  clipped_bright REAL, roi TEXT);
+'''
+
+SETTING_COLUMNS = ('brightness', 'sharpness', 'contrast', 'saturation', 'iso', 'quality')
+TIMING_COLUMNS = ('settle', 'capture', 'encode', 'write', 'total')
+FOCUS_COLUMNS = ('sharpness', 'mean', 'clipped_dark', 'clipped_bright')
+
+
+class CaptureCatalogue:
+    # Every capture with the settings it was taken with, the profile and GUI session it belongs to, its size
+    # and how long it took; measurements of captures and the focus assistant's numbers at the time of the capture
+    # are stored next to them. The settings used for filtering have their own indexed columns, the complete
+    # settings are kept as JSON.
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # written from the pipeline threads and read from the GUI thread
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f'{self.path}', timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+
+    def record_capture(self, path, metadata=None, timings=None):
+        # timings measured on the camera side travel in the metadata, the pipeline adds its own
+        metadata = metadata or {}
+        timings = {**metadata.get('timings', {}), **(timings or {})}
+        settings = {**metadata.get('camera', {}), **metadata.get('settings', {})}
+        parsed = parse_capture_name(path)
+        name, timestamp = parsed if parsed else (Path(path).stem, datetime.now())
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            size = None
+        row = (f'{path}', name, timestamp.timestamp(), Path(path).suffix[1:].lower(),
+               metadata.get('profile'), metadata.get('session'), json.dumps(settings),
+               *(settings.get(column) for column in SETTING_COLUMNS), size,
+               *(timings.get(column) for column in TIMING_COLUMNS))
+        focus = metadata.get('focus')
+        with self._lock:
+            self._db.execute(f'INSERT OR REPLACE INTO captures VALUES ({", ".join("?" * len(row))})', row)
+            if focus:
+                self._db.execute('INSERT OR REPLACE INTO focus VALUES (?, ?, ?, ?, ?, ?)',
+                                 (f'{path}', *(focus.get(column) for column in FOCUS_COLUMNS),
+                                  json.dumps(focus.get('roi'))))
+
+    def record_measurement(self, path, result):
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO measurements VALUES (?, ?, ?, ?, ?, ?)',
+                             (f'{path}', result.left_angle, result.right_angle, result.angle, result.confidence,
+                              time.time()))
+
+    def profiles(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute('SELECT DISTINCT profile FROM captures '
+                                                       'WHERE profile IS NOT NULL ORDER BY profile')]
+
+    def sessions(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute('SELECT DISTINCT session FROM captures '
+                                                       'WHERE session IS NOT NULL ORDER BY session DESC')]
+
+    def query(self, limit=None, **filters):
+        # captures as dicts (measurement and focus_ columns are None where there are none), newest first
+        columns = ('captures.*, measurements.left_angle, measurements.right_angle, measurements.angle, '
+                   'measurements.confidence, ' +
+                   ', '.join(f'focus.{column} AS focus_{column}' for column in FOCUS_COLUMNS))
+        with self._lock:
+            cursor = self._db.execute(*self._select(columns, limit, **filters))
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor]
+
+    def paths(self, **filters):
+        with self._lock:
+            return {row[0] for row in self._db.execute(*self._select('captures.path', None, **filters))}
+
+    @staticmethod
+    def _select(columns, limit, profile=None, session=None, since=None, until=None, min_angle=None,
+                max_angle=None, measured=None, **settings):
+        # Keyword arguments named like a setting column filter on that setting, e.g. iso=100
+        unknown = set(settings) - set(SETTING_COLUMNS)
+        if unknown:
+            raise ValueError(f'Unknown filters: {", ".join(sorted(unknown))}')
+        conditions, values = [], []
+        for column, operator, value in (('captures.profile', '=', profile),
+                                        ('captures.session', '=', session),
+                                        ('captures.timestamp', '>=', since and since.timestamp()),
+                                        ('captures.timestamp', '<', until and until.timestamp()),
+                                        ('measurements.angle', '>=', min_angle),
+                                        ('measurements.angle', '<=', max_angle),
+                                        *((f'captures.{name}', '=', value) for name, value in settings.items())):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                values.append(value)
+        if measured is not None:
+            conditions.append(f'measurements.path IS {"NOT " if measured else ""}NULL')
+        sql = f'SELECT {columns} FROM captures LEFT JOIN measurements USING (path) LEFT JOIN focus USING (path)'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY captures.timestamp DESC'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        return sql, values
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,32 @@
+from datetime import datetime
+from pathlib import Path
+
+# Captures are saved as <filename>_<timestamp>.<format>, burst frames add microseconds to the timestamp
+TIMESTAMP_FORMAT = '%Y_%m_%dT%H_%M_%S'
+BURST_TIMESTAMP_FORMAT = '%Y_%m_%dT%H_%M_%S_%f'
+
+
+def capture_timestamp(now, previous=None):
+    # single captures can follow each other within a second, the later ones get microseconds so none is overwritten
+    timestamp = now.strftime(TIMESTAMP_FORMAT)
+    if previous is not None and previous.startswith(timestamp):
+        return now.strftime(BURST_TIMESTAMP_FORMAT)
+    return timestamp
+
+
+def capture_path(directory, name, timestamp, fmt):
+    return Path(directory, f'{name}_{timestamp}.{fmt}')
+
+
+def parse_capture_name(path):
+    # (name, timestamp) of a capture file name, None for files that do not follow the naming scheme
+    stem = Path(path).stem
+    for timestamp_format, parts in ((BURST_TIMESTAMP_FORMAT, 6), (TIMESTAMP_FORMAT, 5)):
+        pieces = stem.rsplit('_', parts)
+        if len(pieces) != parts + 1:
+            continue
+        try:
+            return pieces[0], datetime.strptime('_'.join(pieces[1:]), timestamp_format)
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,13 @@
+from os import chown
+
+# The GUI is started as root through CAS.sh, but everything it writes should belong to the pi user.
+PI_UID = 1000
+PI_GID = 1000
+
+
+def chown_pi(path):
+    try:
+        chown(path, PI_UID, PI_GID)
+    except PermissionError:
+        # not running as root (benchmarks, development machines), the files already belong to the current user
+        pass
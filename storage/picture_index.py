@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from storage.naming import parse_capture_name
+
+PICTURE_SUFFIXES = ('.jpeg', '.jpg', '.png', '.bmp', '.gif', '.yuv', '.rgb', '.rgba', '.bgr', '.bgra', '.seq')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pictures (path TEXT PRIMARY KEY, directory TEXT, name TEXT, timestamp REAL,
+                                     format TEXT, size INTEGER, mtime_ns INTEGER, thumbnail BLOB);
+CREATE INDEX IF NOT EXISTS pictures_directory ON pictures (directory);
+CREATE TABLE IF NOT EXISTS directories (path TEXT PRIMARY KEY, mtime_ns INTEGER);
+'''
+
+Picture = namedtuple('Picture', ['path', 'name', 'timestamp', 'format', 'size', 'mtime_ns'])
+
+
+def picture_entry(entry):
+    # index record of a directory entry, the timestamp comes from the capture name where there is one
+    stat = entry.stat()
+    path = Path(entry.path)
+    parsed = parse_capture_name(path)
+    name, timestamp = parsed if parsed else (path.stem, datetime.fromtimestamp(stat.st_mtime))
+    return Picture(f'{path}', name, timestamp.timestamp(), path.suffix[1:].lower(), stat.st_size, stat.st_mtime_ns)
+
+
+class PictureIndex:
+    # Pictures per directory, persisted between runs. A directory whose modification time did not change since
+    # the last run is not listed at all; otherwise new files are added and files whose modification time or size
+    # changed (overwritten pictures, growing sequence files) are updated and lose their thumbnail.
+    # The pictures of the open directory are held in memory, sorting and filtering never touch the disk.
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.directory = None
+        self.pictures = {}
+        # thumbnails are written from the loader thread
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f'{self.path}', timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+
+    def open_directory(self, directory):
+        self.directory = f'{Path(directory)}'
+        with self._lock:
+            rows = self._db.execute('SELECT path, name, timestamp, format, size, mtime_ns FROM pictures '
+                                    'WHERE directory = ?', (self.directory,)).fetchall()
+            known = self._db.execute('SELECT mtime_ns FROM directories WHERE path = ?', (self.directory,)).fetchone()
+        self.pictures = {row[0]: Picture(*row) for row in rows}
+        try:
+            modified = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            modified = None
+        if known is None or known[0] != modified:
+            self.sync()
+
+    def sync(self):
+        # (added, removed, changed) since the last sync, called whenever the directory changed
+        try:
+            with os.scandir(self.directory) as entries:
+                on_disk = {entry.path: entry for entry in entries
+                           if entry.name.lower().endswith(PICTURE_SUFFIXES) and entry.is_file()}
+            modified = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            on_disk, modified = {}, None
+        added, changed = [], []
+        for path, entry in on_disk.items():
+            known = self.pictures.get(path)
+            try:
+                if known is None:
+                    added.append(picture_entry(entry))
+                else:
+                    stat = entry.stat()
+                    if (stat.st_mtime_ns, stat.st_size) != (known.mtime_ns, known.size):
+                        changed.append(picture_entry(entry))
+            except OSError:
+                # removed again in the meantime
+                continue
+        removed = list(self.pictures.keys() - on_disk.keys())
+        for path in removed:
+            del self.pictures[path]
+        for picture in added + changed:
+            self.pictures[picture.path] = picture
+        with self._lock:
+            self._db.execute('BEGIN')
+            self._db.executemany('DELETE FROM pictures WHERE path = ?', ((path,) for path in removed))
+            # the thumbnail of a changed picture is made again
+            self._db.executemany('INSERT OR REPLACE INTO pictures VALUES (?, ?, ?, ?, ?, ?, ?, NULL)',
+                                 ((picture.path, self.directory, *picture[1:]) for picture in added + changed))
+            self._db.execute('INSERT OR REPLACE INTO directories VALUES (?, ?)', (self.directory, modified))
+            self._db.execute('COMMIT')
+        return added, removed, changed
+
+    def thumbnail(self, path):
+        with self._lock:
+            row = self._db.execute('SELECT thumbnail FROM pictures WHERE path = ?', (f'{path}',)).fetchone()
+        return row[0] if row else None
+
+    def set_thumbnail(self, path, data):
+        with self._lock:
+            self._db.execute('UPDATE pictures SET thumbnail = ? WHERE path = ?', (data, f'{path}'))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,120 @@
+import bisect
+import json
+import logging
+import os
+from pathlib import Path
+
+from monitoring.metrics import METRICS
+from storage.ownership import chown_pi
+
+# version 0 are the plain settings dicts written before profiles had a version
+SCHEMA_VERSION = 1
+DEFAULT_PROFILE = 'default'
+# iso and pic_format are positions in ISO_VALUES and PICTURE_FORMATS, the directory depends on the installation.
+# calibration is the pixel size and lens distortion of the setup (analysis.calibration.Calibration as a dict)
+DEFAULT_SETTINGS = {'brightness': 50,
+                    'sharpness': 0,
+                    'contrast': 0,
+                    'saturation': 0,
+                    'iso': 0,
+                    'quality': 75,
+                    'directory': '',
+                    'filename': 'foo',
+                    'pic_format': 0,
+                    'calibration': None}
+
+
+class ProfileError(Exception):
+    pass
+
+
+def migrate(data, defaults):
+    version = data.pop('version', 0)
+    if version > SCHEMA_VERSION:
+        raise ProfileError(f'Profile version {version} is newer than this program ({SCHEMA_VERSION})')
+    # settings added after a profile was written get their default values
+    return {**defaults, **{key: value for key, value in data.items() if key in defaults}}
+
+
+def write_atomic(path, data):
+    # readers see either the old or the new file, never a half written one
+    temporary = path.with_name(f'.{path.name}.tmp')
+    with open(temporary, 'w') as profile_file:
+        json.dump(data, profile_file)
+        profile_file.flush()
+        os.fsync(profile_file.fileno())
+    os.replace(temporary, path)
+    chown_pi(path)
+
+
+class ProfileStore:
+    # All profiles are read once into memory and kept sorted, saving and deleting update the files and the
+    # index one profile at a time. The default profile lives in memory only and can not be changed.
+    def __init__(self, directory, defaults):
+        self.directory = Path(directory)
+        self.defaults = dict(defaults)
+        self.profiles = {}
+        self.names = []
+        self.missing = set()
+        self.load()
+
+    @METRICS.timed('profile.load_all')
+    def load(self):
+        self.profiles = {DEFAULT_PROFILE: dict(self.defaults)}
+        for path in self.directory.glob('*.json'):
+            if path.stem == DEFAULT_PROFILE:
+                continue
+            try:
+                with open(path, 'r') as profile_file:
+                    self.profiles[path.stem] = migrate(json.load(profile_file), self.defaults)
+            except (OSError, ValueError, ProfileError) as error:
+                logging.warning(f'Skipping profile {path.name}: {error}')
+        self.names = sorted(self.profiles, key=str.upper)
+        # every directory is checked once, many profiles share the same one
+        available = {}
+        for name, settings in self.profiles.items():
+            directory = settings['directory']
+            if directory not in available:
+                available[directory] = Path(directory).is_dir()
+        self.missing = {name for name, settings in self.profiles.items() if not available[settings['directory']]}
+
+    def __contains__(self, name):
+        return name in self.profiles
+
+    def get(self, name):
+        return dict(self.profiles[name])
+
+    def directory_available(self, name):
+        # profiles may point at removable drives that are not plugged in, checked again on every call
+        available = Path(self.profiles[name]['directory']).is_dir()
+        (self.missing.discard if available else self.missing.add)(name)
+        return available
+
+    @METRICS.timed('profile.save')
+    def save(self, name, settings):
+        # index of the profile in names when it is new, None when an existing profile was overwritten
+        if name == DEFAULT_PROFILE:
+            raise ProfileError('Can not overwrite default profile')
+        settings = {key: settings.get(key, value) for key, value in self.defaults.items()}
+        write_atomic(Path(self.directory, f'{name}.json'), {'version': SCHEMA_VERSION, **settings})
+        new = name not in self.profiles
+        self.profiles[name] = settings
+        self.directory_available(name)
+        if not new:
+            return None
+        position = bisect.bisect([profile.upper() for profile in self.names], name.upper())
+        self.names.insert(position, name)
+        return position
+
+    def delete(self, name):
+        # index the profile had in names
+        if name == DEFAULT_PROFILE:
+            raise ProfileError('Can not delete default profile')
+        if name not in self.profiles:
+            raise ProfileError('No profile selected.')
+        Path(self.directory, f'{name}.json').unlink(missing_ok=True)
+        del self.profiles[name]
+        self.missing.discard(name)
+        position = self.names.index(name)
+        del self.names[position]
+        return position
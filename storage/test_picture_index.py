@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from storage.picture_index import PictureIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = PictureIndex(tmp_path / 'cache' / 'pictures.sqlite')
+    yield index
+    index.close()
+
+
+def test_sync_added_and_removed(tmp_path, index):
+    (tmp_path / 'drop.png').write_bytes(b'png')
+    (tmp_path / 'notes.txt').write_text('not a picture')
+    index.open_directory(tmp_path)
+    assert list(index.pictures) == [f'{tmp_path / "drop.png"}']
+    (tmp_path / 'drop.png').unlink()
+    (tmp_path / 'burst.seq').write_bytes(b'seq')
+    added, removed, changed = index.sync()
+    assert [picture.path for picture in added] == [f'{tmp_path / "burst.seq"}']
+    assert removed == [f'{tmp_path / "drop.png"}'] and changed == []
+
+
+def test_sync_changed_files(tmp_path, index):
+    # an overwritten picture and a growing sequence file keep their names, their thumbnails are made again
+    picture, sequence = tmp_path / 'drop.png', tmp_path / 'burst.seq'
+    picture.write_bytes(b'png')
+    sequence.write_bytes(b'frame')
+    index.open_directory(tmp_path)
+    for path in (picture, sequence):
+        index.set_thumbnail(path, b'thumbnail')
+    assert index.sync() == ([], [], [])
+    picture.write_bytes(b'png')
+    os.utime(picture, ns=(0, 10 ** 9))
+    with open(sequence, 'ab') as sequence_file:
+        sequence_file.write(b'frame')
+    added, removed, changed = index.sync()
+    assert added == [] and removed == []
+    assert sorted(picture.path for picture in changed) == sorted([f'{picture}', f'{sequence}'])
+    assert index.pictures[f'{picture}'].mtime_ns == 10 ** 9
+    assert index.pictures[f'{sequence}'].size == 10
+    assert index.thumbnail(picture) is None and index.thumbnail(sequence) is None
+
+
+def test_index_persists(tmp_path, index):
+    (tmp_path / 'drop.png').write_bytes(b'png')
+    index.open_directory(tmp_path)
+    index.set_thumbnail(tmp_path / 'drop.png', b'thumbnail')
+    reopened = PictureIndex(index.path)
+    try:
+        reopened.open_directory(tmp_path)
+        assert reopened.pictures == index.pictures
+        assert reopened.thumbnail(tmp_path / 'drop.png') == b'thumbnail'
+    finally:
+        reopened.close()
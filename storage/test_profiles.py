@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from storage.profiles import DEFAULT_PROFILE, DEFAULT_SETTINGS, SCHEMA_VERSION, ProfileError, ProfileStore
+
+
+def write(directory, name, data):
+    (directory / f'{name}.json').write_text(json.dumps(data))
+
+
+def test_migrate_unversioned_profile(tmp_path):
+    # profiles written before settings were added get the defaults, settings no longer known are dropped
+    write(tmp_path, 'old', {'brightness': 60, 'quality': 90, 'directory': str(tmp_path), 'filename': 'bar',
+                            'pic_format': 1, 'obsolete': True})
+    settings = ProfileStore(tmp_path, DEFAULT_SETTINGS).get('old')
+    assert settings == {**DEFAULT_SETTINGS, 'brightness': 60, 'quality': 90, 'directory': str(tmp_path),
+                        'filename': 'bar', 'pic_format': 1}
+
+
+def test_newer_profile_is_skipped(tmp_path):
+    write(tmp_path, 'new', {'version': SCHEMA_VERSION + 1, **DEFAULT_SETTINGS})
+    write(tmp_path, 'broken', {'version': SCHEMA_VERSION})
+    (tmp_path / 'corrupt.json').write_text('{')
+    store = ProfileStore(tmp_path, DEFAULT_SETTINGS)
+    assert 'new' not in store and 'corrupt' not in store
+    assert store.names == ['broken', DEFAULT_PROFILE]
+
+
+def test_save_restores_quality(tmp_path):
+    store = ProfileStore(tmp_path, DEFAULT_SETTINGS)
+    assert store.save('Sample', {**DEFAULT_SETTINGS, 'quality': 42, 'directory': str(tmp_path)}) == 1
+    assert store.save('Sample', {**DEFAULT_SETTINGS, 'quality': 55, 'directory': str(tmp_path)}) is None
+    saved = json.loads((tmp_path / 'Sample.json').read_text())
+    assert saved['version'] == SCHEMA_VERSION
+    reloaded = ProfileStore(tmp_path, DEFAULT_SETTINGS)
+    assert reloaded.get('Sample')['quality'] == 55
+    assert reloaded.names == [DEFAULT_PROFILE, 'Sample']
+
+
+def test_missing_directory(tmp_path):
+    store = ProfileStore(tmp_path, DEFAULT_SETTINGS)
+    store.save('usb', {**DEFAULT_SETTINGS, 'directory': str(tmp_path / 'unplugged')})
+    assert not store.directory_available('usb')
+    assert 'usb' in store.missing
+    (tmp_path / 'unplugged').mkdir()
+    assert store.directory_available('usb')
+    assert 'usb' not in store.missing
+
+
+def test_default_profile_is_read_only(tmp_path):
+    store = ProfileStore(tmp_path, DEFAULT_SETTINGS)
+    with pytest.raises(ProfileError):
+        store.save(DEFAULT_PROFILE, DEFAULT_SETTINGS)
+    with pytest.raises(ProfileError):
+        store.delete(DEFAULT_PROFILE)